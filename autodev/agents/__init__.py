@@ -1,13 +1,21 @@
 # autodev/agents/__init__.py
 
-from .user_interface import UserInterfaceAgent
-from .project_manager import ProjectManagerAgent
-from .task_decomposer import TaskDecomposerAgent
-from .solution_architect import SolutionArchitectAgent
-from .developer import DeveloperAgent
-from .testing import TestingAgent
-from .integration import IntegrationAgent
-from .deployment import DeploymentAgent
+import importlib
+import threading
+from typing import Any, Dict, Iterator, Mapping
+
+# Agent classes are imported on first use; each module pulls in the LLM
+# service stack, which is slow to load and not needed for e.g. ``--help``.
+_AGENT_MODULES = {
+    "UserInterfaceAgent": ".user_interface",
+    "ProjectManagerAgent": ".project_manager",
+    "TaskDecomposerAgent": ".task_decomposer",
+    "SolutionArchitectAgent": ".solution_architect",
+    "DeveloperAgent": ".developer",
+    "TestingAgent": ".testing",
+    "IntegrationAgent": ".integration",
+    "DeploymentAgent": ".deployment",
+}
 
 __all__ = [
     "UserInterfaceAgent",
@@ -18,4 +26,58 @@ __all__ = [
     "TestingAgent",
     "IntegrationAgent",
     "DeploymentAgent",
+    "LazyAgentMap",
 ]
+
+
+def __getattr__(name):
+    if name not in _AGENT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_AGENT_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class LazyAgentMap(Mapping):
+    """Agent name -> agent instance, importing and constructing each agent on first lookup.
+
+    Membership tests and iteration only use the names, so routing checks
+    never build an agent. Lookups are thread-safe.
+    """
+
+    def __init__(self, names=None):
+        self._names = list(names or _AGENT_MODULES)
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self._names:
+            raise KeyError(name)
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = __getattr__(name)()
+                self._agents[name] = agent
+        return agent
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load_all(self) -> "LazyAgentMap":
+        """Construct every agent now, e.g. before a server takes its first job."""
+        for name in self._names:
+            self[name]
+        return self
@@ -1,14 +1,28 @@
 # autodev/agents/developer.py
 
+import asyncio
 import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 from autodev.core.agent import Agent
+from autodev.core.checkpoint import RunJournal
+from autodev.core.task_graph import TaskGraph, normalize_dependencies, run_graph, run_graph_async
+from autodev.core.tracing import span
 from autodev.core.types import Result
+from autodev.core.utils import get_max_concurrency, sort_by_task_id
 from autodev.prompts.agent_prompts import get_prompt
-from autodev.services.llm_service import call_llm
+from autodev.prompts.registry import render_prompt
+from autodev.services.llm_service import (
+    acall_llm,
+    astream_llm_to_file,
+    call_llm,
+    stream_llm_to_file,
+)
+from autodev.services.blob_store import BlobStore, file_ref
+from autodev.services.llm_stream import StreamedFile, strip_code_fences
 from autodev.services.git_manager import GitManagerService
+from autodev.services.manifest import BuildManifest
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +32,188 @@ class DeveloperAgent(Agent):
             name="DeveloperAgent",
             instructions=get_prompt("developer_agent"),
             functions=[self.implement_tasks],
+            async_functions=[self.aimplement_tasks],
         )
 
-    def implement_tasks(self, context_variables: Dict[str, Any]) -> Result:
-        tasks = context_variables.get("tasks", [])
-        programming_language = context_variables.get("programming_language", "python")
+    def build_prompt(
+        self, task: Dict[str, Any], programming_language: str, prerequisites: str = ""
+    ) -> str:
+        return render_prompt(
+            "developer_agent",
+            programming_language=programming_language,
+            file_path=task.get('file_path', ''),
+            description=task.get('description', ''),
+            prerequisites=prerequisites,
+        )
+
+    @staticmethod
+    def prerequisite_code(
+        tasks: List[Dict[str, Any]], prerequisites: Dict[Any, Optional[str]], store: BlobStore
+    ) -> str:
+        """The generated code of a task's direct prerequisites, one block per file.
+
+        ``prerequisites`` maps task ids to blob references, loaded here on demand.
+        """
+        paths = {task.get('task_id'): task.get('file_path', '') for task in tasks}
+        blocks = []
+        for task_id, code_ref in prerequisites.items():
+            code = store.read(code_ref) if code_ref else None
+            if code:
+                blocks.append(f"--- {paths.get(task_id) or task_id} ---\n{code}")
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def clean_code(code: str) -> str:
+        code_clean = strip_code_fences(code)
+        if not code_clean:
+            raise ValueError("LLM returned no code")
+        return code_clean
+
+    @staticmethod
+    def manifest_key(task: Dict[str, Any]) -> str:
+        return f"code:{task.get('task_id')}:{task.get('file_path', '')}"
+
+    def fingerprint(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        architecture: str,
+        prerequisites: Optional[Dict[Any, Optional[str]]] = None,
+    ) -> str:
+        """What the task's code is built from.
+
+        ``prerequisites`` maps the ids of the tasks it depends on to their
+        code blob references; the references are content hashes, so a
+        dependent task is regenerated whenever a prerequisite's code changes.
+        """
+        refs = sorted((str(task_id), code_ref or "") for task_id, code_ref in (prerequisites or {}).items())
+        return BuildManifest.fingerprint(self.build_prompt(task, programming_language), architecture, refs)
+
+    def reuse_code(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        architecture: str,
+        manifest: Optional[BuildManifest],
+        journal: Optional[Tuple[RunJournal, str]] = None,
+        prerequisite_refs: Optional[Dict[Any, Optional[str]]] = None,
+        store: Optional[BlobStore] = None,
+    ) -> Optional[str]:
+        if journal is not None and store is not None:
+            entry = journal[0].completed_task(journal[1], self.name, self.manifest_key(task))
+            code_ref = entry.get("code_ref") if entry else None
+            if code_ref and store.exists(code_ref):
+                logger.info(f"Task {task.get('task_id')} already generated in run {journal[1]}; resuming.")
+                return store.read(code_ref)
+        if manifest is None:
+            return None
+        code = manifest.reuse(
+            self.manifest_key(task),
+            self.fingerprint(task, programming_language, architecture, prerequisite_refs),
+        )
+        if code is not None:
+            logger.info(f"Task {task.get('task_id')} is unchanged; reusing {task.get('file_path', '')}.")
+        return code
+
+    def journal_code(
+        self,
+        task: Dict[str, Any],
+        code: Union[str, StreamedFile],
+        journal: Optional[Tuple[RunJournal, str]],
+        store: Optional[BlobStore] = None,
+    ) -> Union[str, StreamedFile]:
+        """Record the finished task in the run journal by its blob reference, not its code."""
+        if journal is not None and store is not None:
+            payload = {"code_ref": self.store_code(store, code)}
+            journal[0].record_task(journal[1], self.name, self.manifest_key(task), payload)
+        return code
+
+    def generate_code(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        architecture: str = "",
+        manifest: Optional[BuildManifest] = None,
+        journal: Optional[Tuple[RunJournal, str]] = None,
+        stream_dir: Optional[str] = None,
+        prerequisites: str = "",
+        prerequisite_refs: Optional[Dict[Any, Optional[str]]] = None,
+        store: Optional[BlobStore] = None,
+    ) -> Union[str, StreamedFile]:
+        """Generate code for ``task``.
+
+        ``prerequisites`` is the code of the tasks it depends on, which is
+        included in the prompt, and ``prerequisite_refs`` its blob references,
+        which decide whether a manifest entry is still current. With
+        ``stream_dir`` set the completion is streamed straight into the
+        task's file under that directory and a StreamedFile is returned
+        instead of the code. Journaled results are kept in ``store``.
+        """
+        code = self.reuse_code(
+            task, programming_language, architecture, manifest, journal, prerequisite_refs, store
+        )
+        if code is not None:
+            return code
+        logger.info(f"Implementing task {task.get('task_id')}: {task.get('description', '')}")
+        prompt = self.build_prompt(task, programming_language, prerequisites)
+        if stream_dir is not None:
+            streamed = stream_llm_to_file(
+                prompt, os.path.join(stream_dir, task.get('file_path', '')), agent="developer_agent"
+            )
+            return self.journal_code(task, self.log_streamed(streamed), journal, store)
+        code = self.clean_code(call_llm(prompt, agent="developer_agent"))
+        return self.journal_code(task, code, journal, store)
+
+    async def agenerate_code(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        architecture: str = "",
+        manifest: Optional[BuildManifest] = None,
+        journal: Optional[Tuple[RunJournal, str]] = None,
+        stream_dir: Optional[str] = None,
+        prerequisites: str = "",
+        prerequisite_refs: Optional[Dict[Any, Optional[str]]] = None,
+        store: Optional[BlobStore] = None,
+    ) -> Union[str, StreamedFile]:
+        code = self.reuse_code(
+            task, programming_language, architecture, manifest, journal, prerequisite_refs, store
+        )
+        if code is not None:
+            return code
+        logger.info(f"Implementing task {task.get('task_id')}: {task.get('description', '')}")
+        prompt = self.build_prompt(task, programming_language, prerequisites)
+        if stream_dir is not None:
+            streamed = await astream_llm_to_file(
+                prompt, os.path.join(stream_dir, task.get('file_path', '')), agent="developer_agent"
+            )
+            return self.journal_code(task, self.log_streamed(streamed), journal, store)
+        code = self.clean_code(await acall_llm(prompt, agent="developer_agent"))
+        return self.journal_code(task, code, journal, store)
+
+    @staticmethod
+    def store_code(store: BlobStore, code: Union[str, StreamedFile]) -> str:
+        """Move generated code out of memory into ``store`` and return its reference."""
+        if isinstance(code, StreamedFile):
+            return store.put_file(code.path)
+        return store.put(code)
+
+    @staticmethod
+    def log_streamed(streamed: StreamedFile) -> StreamedFile:
+        logger.debug(
+            f"Streamed {streamed.size} bytes to {streamed.path} "
+            f"(first chunk after {streamed.first_chunk_seconds}s)"
+        )
+        return streamed
+
+    def prepare(
+        self, context_variables: Dict[str, Any]
+    ) -> Tuple[str, GitManagerService, BuildManifest]:
         output_dir = context_variables.get("output_dir", os.path.join(os.getcwd(), "output"))
         project_name = context_variables.get("project_name", "project")
         project_dir = os.path.join(output_dir, project_name)
 
-        git_manager = GitManagerService(repo_path=project_dir)
+        git_manager = GitManagerService.for_repo(project_dir)
 
         # Ensure project directory exists
         os.makedirs(project_dir, exist_ok=True)
@@ -36,61 +222,136 @@ class DeveloperAgent(Agent):
             git_manager.pull()
         except Exception as e:
             logger.error(f"Git pull failed: {e}")
+        return project_dir, git_manager, BuildManifest(project_dir)
 
-        logger.info(f"Starting implementation of {len(tasks)} tasks.")
-        implemented_tasks = []
+    def implement_tasks(self, context_variables: Dict[str, Any]) -> Result:
+        tasks = normalize_dependencies(sort_by_task_id(context_variables.get("tasks", [])))
+        programming_language = context_variables.get("programming_language", "python")
+        architecture = context_variables.get("architecture", "")
+        project_dir, git_manager, manifest = self.prepare(context_variables)
+        reusable = None if context_variables.get("force_regenerate") else manifest
+        journal = RunJournal.from_context(context_variables)
+        stream_dir = project_dir if context_variables.get("stream_to_disk") else None
 
-        for task in tasks:
-            task_id = task.get('task_id')
-            description = task.get('description', '')
-            file_path = task.get('file_path', '')
-            logger.info(f"Implementing task {task_id}: {description}")
+        max_concurrency = get_max_concurrency(context_variables)
+        logger.info(
+            f"Starting implementation of {TaskGraph(tasks).describe()} "
+            f"(max {max_concurrency} concurrent)."
+        )
+        store = BlobStore.for_project(project_dir)
+        results = run_graph(
+            lambda task, prerequisites: self.store_code(store, self.generate_code(
+                task, programming_language, architecture, reusable, journal, stream_dir,
+                self.prerequisite_code(tasks, prerequisites, store), prerequisites, store,
+            )),
+            tasks,
+            max_concurrency,
+        )
+        return self.save_results(context_variables, project_dir, git_manager, results, manifest)
 
-            prompt = f"""
-{get_prompt('developer_agent')}
+    async def aimplement_tasks(self, context_variables: Dict[str, Any]) -> Result:
+        tasks = normalize_dependencies(sort_by_task_id(context_variables.get("tasks", [])))
+        programming_language = context_variables.get("programming_language", "python")
+        architecture = context_variables.get("architecture", "")
+        project_dir, git_manager, manifest = await asyncio.to_thread(self.prepare, context_variables)
+        reusable = None if context_variables.get("force_regenerate") else manifest
+        journal = RunJournal.from_context(context_variables)
+        stream_dir = project_dir if context_variables.get("stream_to_disk") else None
 
-Programming Language: {programming_language}
+        max_concurrency = get_max_concurrency(context_variables)
+        logger.info(
+            f"Starting async implementation of {TaskGraph(tasks).describe()} "
+            f"(max {max_concurrency} concurrent)."
+        )
+        store = BlobStore.for_project(project_dir)
 
-Task Description:
-\"\"\"{description}\"\"\"
+        async def generate(task, prerequisites):
+            code = await self.agenerate_code(
+                task, programming_language, architecture, reusable, journal, stream_dir,
+                self.prerequisite_code(tasks, prerequisites, store), prerequisites, store,
+            )
+            return self.store_code(store, code)
 
-Instructions:
-- Write code in {programming_language} to implement the task in the file: {file_path}.
-- Include documentation as docstrings or comments within the code.
-- Do not include any comments, explanations, or code block markers like ``` or '''.
-- Return only the code.
+        results = await run_graph_async(generate, tasks, max_concurrency)
+        return await asyncio.to_thread(
+            self.save_results, context_variables, project_dir, git_manager, results, manifest
+        )
 
-"""
+    def save_results(
+        self,
+        context_variables: Dict[str, Any],
+        project_dir: str,
+        git_manager: GitManagerService,
+        results: List[Tuple[Dict[str, Any], Optional[str], Optional[BaseException]]],
+        manifest: BuildManifest,
+    ) -> Result:
+        programming_language = context_variables.get("programming_language", "python")
+        architecture = context_variables.get("architecture", "")
+        store = BlobStore.for_project(project_dir)
+        implemented_tasks = []
+        failed_tasks = []
+        pending_commits = []
+        code_refs = {task.get('task_id'): code_ref for task, code_ref, error in results if error is None}
 
-            code = call_llm(prompt)
-            code_clean = code.strip('`').strip()
-            logger.debug(f"Generated code for task {task_id}:\n{code_clean}")
+        # Results arrive in task_id order, so writes and commits do too. Each
+        # task's code is loaded from the blob store only while it is written.
+        for task, code_ref, error in results:
+            task_id = task.get('task_id')
+            description = task.get('description', '')
+            file_path = task.get('file_path', '')
+            if error is not None:
+                logger.error(f"Failed to implement task {task_id}: {error}")
+                failed_tasks.append({"task_id": task_id, "error": str(error)})
+                continue
+            fingerprint = self.fingerprint(
+                task, programming_language, architecture,
+                {dep_id: code_refs.get(dep_id) for dep_id in task.get('depends_on') or []},
+            )
 
             implemented_tasks.append({
                 "task_id": task_id,
                 "description": description,
                 "file_path": file_path,
-                "code": code_clean,
+                "code_ref": code_ref,
             })
 
-            # Save the code to the specified file
+            code_clean = store.read(code_ref)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Generated code for task {task_id}:\n{code_clean}")
+            if manifest.is_current(self.manifest_key(task), fingerprint, code_clean):
+                continue
+
+            # Save the code to the specified file, unless it was streamed there already
             file_full_path = os.path.join(project_dir, file_path)
             os.makedirs(os.path.dirname(file_full_path), exist_ok=True)
 
-            try:
-                with open(file_full_path, "w", encoding='utf-8') as code_file:
-                    code_file.write(code_clean)
-                logger.info(f"Saved code for task {task_id} to {file_full_path}")
-            except Exception as e:
-                logger.error(f"Failed to save code for task {task_id}: {e}")
-                continue
+            if file_ref(file_full_path) != code_ref:
+                try:
+                    with span("write", "file", path=file_full_path), \
+                            open(file_full_path, "w", encoding='utf-8') as code_file:
+                        code_file.write(code_clean)
+                    logger.info(f"Saved code for task {task_id} to {file_full_path}")
+                except Exception as e:
+                    logger.error(f"Failed to save code for task {task_id}: {e}")
+                    continue
 
-            # Add and commit the changes
-            try:
-                git_manager.add(file_path)
-                git_manager.commit(f"Implemented task {task_id}: {description}")
-            except Exception as e:
-                logger.error(f"Git operations failed for task {task_id}: {e}")
+            manifest.record(self.manifest_key(task), fingerprint, file_path, code_clean)
+            pending_commits.append((f"Implemented task {task_id}: {description}", [file_path]))
+
+        # Commit all written files in one batch, one commit per task unless squashed
+        try:
+            git_manager.commit_batch(
+                pending_commits,
+                per_commit=context_variables.get("git_commit_mode", "per_task") != "squash",
+                squash_message=f"Implemented {len(pending_commits)} tasks",
+            )
+        except Exception as e:
+            logger.error(f"Git operations failed: {e}")
+
+        try:
+            manifest.save()
+        except OSError as e:
+            logger.error(f"Failed to save build manifest: {e}")
 
         # Push changes to remote (if remote is set)
         try:
@@ -98,12 +359,15 @@ Instructions:
         except Exception as e:
             logger.error(f"Git push failed: {e}")
 
+        if failed_tasks:
+            logger.warning(f"{len(failed_tasks)} of {len(results)} tasks failed to implement.")
         logger.info("All tasks implemented.")
         context_variables["project_dir"] = project_dir
         return Result(
             value="Tasks implemented.",
             context_variables={
                 "implemented_tasks": implemented_tasks,
+                "failed_tasks": failed_tasks,
                 "project_dir": project_dir,
             },
             agent="TestingAgent",
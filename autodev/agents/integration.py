@@ -24,7 +24,7 @@ class IntegrationAgent(Agent):
             "project_dir", os.path.join(os.getcwd(), "output", "project")
         )
 
-        git_manager = GitManagerService(repo_path=project_dir)
+        git_manager = GitManagerService.for_repo(project_dir)
         # Pull latest changes
         git_manager.pull()
 
@@ -1,19 +1,52 @@
 # autodev/agents/solution_architect.py
 
 import os
-import re
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Set
 
 from autodev.core.agent import Agent
+from autodev.core.task_graph import TaskGraph, normalize_dependencies
+from autodev.core.tracing import span
 from autodev.core.types import Result
 from autodev.prompts.agent_prompts import get_prompt
-from autodev.services.llm_service import call_llm
+from autodev.prompts.registry import render_prompt
+from autodev.services.json_stream import JSONStreamParser, MissingJSONError
+from autodev.services.llm_service import LLMRequestError, stream_llm
 from autodev.services.git_manager import GitManagerService
 
 logger = logging.getLogger(__name__)
 
+EXTENSION_MAPPING = {
+    "javascript": ".js",
+    "java": ".java",
+    "python": ".py",
+    "c#": ".cs",
+    "c++": ".cpp",
+    "ruby": ".rb",
+    "php": ".php",
+    "go": ".go",
+    "typescript": ".ts",
+    "kotlin": ".kt",
+    "swift": ".swift",
+    # Add more mappings as needed
+}
+
+COMMENT_SYNTAX = {
+    "javascript": "//",
+    "java": "//",
+    "python": "#",
+    "c#": "//",
+    "c++": "//",
+    "ruby": "#",
+    "php": "//",
+    "go": "//",
+    "typescript": "//",
+    "kotlin": "//",
+    "swift": "//",
+    # Add more mappings as needed
+}
+
 class SolutionArchitectAgent(Agent):
     def __init__(self):
         super().__init__(
@@ -22,15 +55,67 @@ class SolutionArchitectAgent(Agent):
             functions=[self.architect_solution],
         )
 
-    def extract_json_from_response(self, response: str) -> str:
-        """Extract the JSON object from the LLM response."""
+    @staticmethod
+    def keep_dependencies(
+        updated_tasks: List[Dict[str, Any]], tasks: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Carry ``depends_on`` over from the decomposed tasks where the architect left it out."""
+        original = {task.get("task_id"): task.get("depends_on") for task in tasks}
+        return [
+            task if "depends_on" in task else dict(task, depends_on=original.get(task.get("task_id")) or [])
+            for task in updated_tasks
+        ]
+
+    @staticmethod
+    def with_extension(file_path: str, file_extension: str) -> str:
+        base, ext = os.path.splitext(file_path)
+        return file_path if ext.lower() == file_extension else f"{base}{file_extension}"
+
+    @staticmethod
+    def create_placeholder(project_dir: str, file_path: str, comment_prefix: str) -> None:
+        full_file_path = os.path.join(project_dir, file_path)
+        if full_file_path.endswith(os.sep):
+            logger.warning(f"Skipping directory path in file_structure: {file_path}")
+            return
+        os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
+        if os.path.isdir(full_file_path):
+            logger.warning(f"Expected a file but found a directory: {full_file_path}. Skipping...")
+            return
+        if os.path.isfile(full_file_path):
+            # Keep artifacts from earlier runs so unchanged tasks can be reused.
+            logger.info(f"File already exists: {full_file_path}")
+            return
         try:
-            json_match = re.search(r"\{.*\}", response, re.DOTALL)
-            if json_match:
-                return json_match.group(0)
+            with span("write", "file", path=full_file_path), \
+                    open(full_file_path, "w", encoding="utf-8") as dummy_file:
+                dummy_file.write(f"{comment_prefix} This is a placeholder file.\n")
+            logger.info(f"Created file: {full_file_path}")
         except Exception as e:
-            logger.error(f"Error extracting JSON from response: {e}")
-        return ""
+            logger.error(f"Failed to create file {full_file_path}: {e}")
+
+    def stream_architecture(
+        self, prompt: str, project_dir: str, raw: List[str], scaffolded: Set[str]
+    ) -> Dict[str, Any]:
+        """Parse the architect's streamed JSON object, scaffolding task files while it is written.
+
+        Once ``programming_language`` has been streamed, the placeholder file
+        of each task is created as soon as the task object closes, instead
+        of after the whole plan; their paths are added to ``scaffolded``.
+        The chunks are collected in ``raw`` for error reporting.
+        """
+        parser = JSONStreamParser(items="tasks")
+        for chunk in stream_llm(prompt, agent="solution_architect_agent", cache_result=True):
+            raw.append(chunk)
+            for task in parser.feed(chunk):
+                language = str(parser.members.get("programming_language", "")).lower()
+                file_extension = EXTENSION_MAPPING.get(language)
+                if not file_extension or not isinstance(task, dict) or not task.get("file_path"):
+                    continue
+                file_path = self.with_extension(task["file_path"], file_extension)
+                if file_path not in scaffolded:
+                    scaffolded.add(file_path)
+                    self.create_placeholder(project_dir, file_path, COMMENT_SYNTAX.get(language, "#"))
+        return parser.finish()
 
     def architect_solution(self, context_variables: Dict[str, Any]) -> Result:
         tasks = context_variables.get("tasks", [])
@@ -39,146 +124,73 @@ class SolutionArchitectAgent(Agent):
         output_dir = context_variables.get("output_dir", os.path.join(os.getcwd(), "output"))
         project_dir = os.path.join(output_dir, project_name)
 
-        git_manager = GitManagerService(repo_path=project_dir)
+        git_manager = GitManagerService.for_repo(project_dir)
         git_manager.init_repo()
 
-        prompt = f"""
-{get_prompt('solution_architect_agent')}
-
-Project Description:
-\"\"\"{project_description}\"\"\"
-
-Initial Coding Tasks:
-{tasks}
-
-Instructions:
-- Analyze the project description and initial coding tasks.
-- Decide on the best technology stack, including programming language, frameworks, and libraries.
-- Provide a high-level system architecture focused solely on code components (e.g., modules, classes, functions).
-- Include the chosen programming language and frameworks in the architecture description.
-- Define the folder structure of the project and specify **file paths with appropriate file extensions** where each task will be implemented.
-- Ensure that the file structure and file names reflect the conventions of the chosen technology stack.
-- Create dummy files in the repository to represent these files (e.g., empty `.js` files for JavaScript, `.java` for Java).
-- Assign each task to a specific file path.
-- Return the architecture, programming_language, updated tasks, and file assignments as a JSON object with keys "architecture", "programming_language", "tasks", and "file_structure".
-- Do not include any comments, explanations, or non-code considerations.
-- Do not include any code block markers like ```.
-
-Output Format:
-{{
-    "architecture": "Description of the system architecture focused on code components, including programming language and frameworks.",
-    "programming_language": "Programming language used (e.g., 'JavaScript', 'Java')",
-    "tasks": [
-        {{"task_id": 1, "description": "Detailed coding task description", "file_path": "path/to/file.ext"}},
-        {{"task_id": 2, "description": "Detailed coding task description", "file_path": "path/to/another_file.ext"}}
-    ],
-    "file_structure": [
-        "path/to/file.ext",
-        "path/to/another_file.ext"
-    ]
-}}
-"""
-
-        response = call_llm(prompt)
+        prompt = render_prompt(
+            "solution_architect_agent", project_description=project_description, tasks=tasks
+        )
+        raw: List[str] = []
+        scaffolded: Set[str] = set()
         try:
-            logger.debug(f"LLM raw response:\n{response}")
-            response_clean = response.strip()
-            json_str = self.extract_json_from_response(response_clean)
-            if json_str:
-                result_data = json.loads(json_str)
-                logger.debug(f"Parsed LLM response: {result_data}")
-                architecture = result_data.get("architecture", "")
-                programming_language = result_data.get("programming_language", "").lower()
-                updated_tasks = result_data.get("tasks", tasks)
-                file_structure = result_data.get("file_structure", [])
-
-                context_variables["architecture"] = architecture
-                context_variables["programming_language"] = programming_language
-                context_variables["tasks"] = updated_tasks
-
-                extension_mapping = {
-                    "javascript": ".js",
-                    "java": ".java",
-                    "python": ".py",
-                    "c#": ".cs",
-                    "c++": ".cpp",
-                    "ruby": ".rb",
-                    "php": ".php",
-                    "go": ".go",
-                    "typescript": ".ts",
-                    "kotlin": ".kt",
-                    "swift": ".swift",
-                    # Add more mappings as needed
-                }
-
-                file_extension = extension_mapping.get(programming_language)
-                if not file_extension:
-                    logger.error(f"Unsupported programming language: {programming_language}")
-                    return Result(
-                        value="Failed to define solution architecture due to unsupported programming language.",
-                        agent="ProjectManagerAgent",
-                    )
-
-                comment_syntax = {
-                    "javascript": "//",
-                    "java": "//",
-                    "python": "#",
-                    "c#": "//",
-                    "c++": "//",
-                    "ruby": "#",
-                    "php": "//",
-                    "go": "//",
-                    "typescript": "//",
-                    "kotlin": "//",
-                    "swift": "//",
-                    # Add more mappings as needed
-                }
-                comment_prefix = comment_syntax.get(programming_language, "#")
-
-                for task in updated_tasks:
-                    file_path = task.get("file_path", "")
-                    base, ext = os.path.splitext(file_path)
-                    if ext.lower() != file_extension:
-                        file_path = f"{base}{file_extension}"
-                        task["file_path"] = file_path
-                    if file_path not in file_structure:
-                        file_structure.append(file_path)
-
-                for file_path in file_structure:
-                    full_file_path = os.path.join(project_dir, file_path)
-                    if full_file_path.endswith(os.sep):
-                        logger.warning(f"Skipping directory path in file_structure: {file_path}")
-                        continue
-                    os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
-                    if os.path.isdir(full_file_path):
-                        logger.warning(f"Expected a file but found a directory: {full_file_path}. Skipping...")
-                        continue
-                    try:
-                        with open(full_file_path, "w", encoding="utf-8") as dummy_file:
-                            dummy_file.write(f"{comment_prefix} This is a placeholder file.\n")
-                        logger.info(f"Created file: {full_file_path}")
-                    except Exception as e:
-                        logger.error(f"Failed to create file {full_file_path}: {e}")
-
-                git_manager.add(".")
-                git_manager.commit("Initial commit with folder structure and dummy files")
-
-                logger.info("Solution architecture defined, coding tasks updated, and folder structure created.")
-                return Result(
-                    value="Solution architecture defined, tasks updated, and folder structure created.",
-                    context_variables=context_variables,
-                    agent="ProjectManagerAgent",
-                )
-            else:
-                logger.error("No JSON object found in LLM response.")
-                logger.error(f"LLM response was:\n{response_clean}")
+            result_data = self.stream_architecture(prompt, project_dir, raw, scaffolded)
+            logger.debug(f"Parsed LLM response: {result_data}")
+            architecture = result_data.get("architecture", "")
+            programming_language = result_data.get("programming_language", "").lower()
+            updated_tasks = normalize_dependencies(
+                self.keep_dependencies(result_data.get("tasks", tasks), tasks)
+            )
+            logger.info(f"Task plan: {TaskGraph(updated_tasks).describe()}.")
+            file_structure = result_data.get("file_structure", [])
+
+            context_variables["architecture"] = architecture
+            context_variables["programming_language"] = programming_language
+            context_variables["tasks"] = updated_tasks
+
+            file_extension = EXTENSION_MAPPING.get(programming_language)
+            if not file_extension:
+                logger.error(f"Unsupported programming language: {programming_language}")
                 return Result(
-                    value="Failed to define solution architecture due to JSON error.",
+                    value="Failed to define solution architecture due to unsupported programming language.",
                     agent="ProjectManagerAgent",
                 )
+            comment_prefix = COMMENT_SYNTAX.get(programming_language, "#")
+
+            for task in updated_tasks:
+                file_path = self.with_extension(task.get("file_path", ""), file_extension)
+                task["file_path"] = file_path
+                if file_path not in file_structure:
+                    file_structure.append(file_path)
+
+            for file_path in file_structure:
+                if file_path not in scaffolded:
+                    self.create_placeholder(project_dir, file_path, comment_prefix)
+
+            git_manager.add(".")
+            git_manager.commit("Initial commit with folder structure and dummy files")
+
+            logger.info("Solution architecture defined, coding tasks updated, and folder structure created.")
+            return Result(
+                value="Solution architecture defined, tasks updated, and folder structure created.",
+                context_variables=context_variables,
+                agent="ProjectManagerAgent",
+            )
+        except LLMRequestError as e:
+            logger.error(f"LLM request failed: {e}")
+            return Result(
+                value="Failed to define solution architecture due to an LLM error.",
+                agent="ProjectManagerAgent",
+            )
+        except MissingJSONError:
+            logger.error("No JSON object found in LLM response.")
+            logger.error(f"LLM response was:\n{''.join(raw)}")
+            return Result(
+                value="Failed to define solution architecture due to JSON error.",
+                agent="ProjectManagerAgent",
+            )
         except json.JSONDecodeError as e:
             logger.error(f"JSON decode error: {e}")
-            logger.error(f"LLM response was:\n{response_clean}")
+            logger.error(f"LLM response was:\n{''.join(raw)}")
             return Result(
                 value="Failed to define solution architecture due to JSON error.",
                 agent="ProjectManagerAgent",
@@ -1,13 +1,26 @@
 # autodev/agents/testing.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import logging
 import os
 from autodev.core.agent import Agent
+from autodev.core.checkpoint import RunJournal
+from autodev.core.tracing import span
 from autodev.core.types import Result
+from autodev.core.utils import (
+    get_max_concurrency,
+    run_bounded,
+    run_bounded_async,
+    sort_by_task_id,
+)
 from autodev.prompts.agent_prompts import get_prompt
-from autodev.services.llm_service import call_llm
+from autodev.prompts.registry import render_prompt
+from autodev.services.blob_store import BlobStore
+from autodev.services.llm_service import acall_llm, call_llm
+from autodev.services.llm_stream import strip_code_fences
 from autodev.services.git_manager import GitManagerService
+from autodev.services.manifest import BuildManifest
 
 logger = logging.getLogger(__name__)
 
@@ -17,69 +30,239 @@ class TestingAgent(Agent):
             name="TestingAgent",
             instructions=get_prompt("testing_agent"),
             functions=[self.test_tasks],
+            async_functions=[self.atest_tasks],
         )
 
-    def test_tasks(self, context_variables: Dict[str, Any]) -> Result:
-        implemented_tasks = context_variables.get("implemented_tasks", [])
-        programming_language = context_variables.get(
-            "programming_language", "python"
-        ).lower()
+    def build_prompt(self, task: Dict[str, Any], programming_language: str) -> str:
+        return render_prompt(
+            "testing_agent", programming_language=programming_language, code=task['code']
+        )
+
+    @staticmethod
+    def clean_tests(tests: str) -> str:
+        tests_clean = strip_code_fences(tests)
+        if not tests_clean:
+            raise ValueError("LLM returned no tests")
+        return tests_clean
+
+    @staticmethod
+    def resolve_code(
+        task: Dict[str, Any], project_dir: str, store: Optional[BlobStore] = None
+    ) -> Dict[str, Any]:
+        """Return ``task`` with its code loaded from the blob store, or from its file."""
+        if task.get("code") is not None:
+            return task
+        if task.get("code_ref") and store is not None:
+            return dict(task, code=store.read(task["code_ref"]))
+        with open(os.path.join(project_dir, task["file_path"]), "r", encoding="utf-8") as code_file:
+            return dict(task, code=code_file.read())
+
+    @staticmethod
+    def test_file_path(task: Dict[str, Any]) -> str:
+        test_file_name = f"test_{os.path.basename(task['file_path'])}"
+        return os.path.join(os.path.dirname(task["file_path"]), test_file_name)
+
+    @staticmethod
+    def manifest_key(task: Dict[str, Any]) -> str:
+        return f"tests:{task['task_id']}:{task['file_path']}"
+
+    def fingerprint(self, task: Dict[str, Any], programming_language: str) -> str:
+        return BuildManifest.fingerprint(self.build_prompt(task, programming_language))
+
+    def reuse_tests(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        manifest: Optional[BuildManifest],
+        journal: Optional[Tuple[RunJournal, str]] = None,
+        store: Optional[BlobStore] = None,
+    ) -> Optional[str]:
+        if journal is not None and store is not None:
+            entry = journal[0].completed_task(journal[1], self.name, self.manifest_key(task))
+            tests_ref = entry.get("tests_ref") if entry else None
+            if tests_ref and store.exists(tests_ref):
+                logger.info(f"Tests for task {task['task_id']} already generated in run {journal[1]}; resuming.")
+                return store.read(tests_ref)
+        if manifest is None:
+            return None
+        tests = manifest.reuse(self.manifest_key(task), self.fingerprint(task, programming_language))
+        if tests is not None:
+            logger.info(f"Code for task {task['task_id']} is unchanged; reusing its tests.")
+        return tests
+
+    def journal_tests(
+        self,
+        task: Dict[str, Any],
+        tests: str,
+        journal: Optional[Tuple[RunJournal, str]],
+        store: Optional[BlobStore] = None,
+    ) -> str:
+        """Record the finished task in the run journal by its blob reference, not its tests."""
+        if journal is not None and store is not None:
+            payload = {"tests_ref": store.put(tests)}
+            journal[0].record_task(journal[1], self.name, self.manifest_key(task), payload)
+        return tests
+
+    def generate_tests(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        manifest: Optional[BuildManifest] = None,
+        journal: Optional[Tuple[RunJournal, str]] = None,
+        store: Optional[BlobStore] = None,
+    ) -> str:
+        tests = self.reuse_tests(task, programming_language, manifest, journal, store)
+        if tests is not None:
+            return tests
+        logger.info(f"Testing task {task['task_id']}: {task['description']}")
+        prompt = self.build_prompt(task, programming_language)
+        tests = self.clean_tests(call_llm(prompt, agent="testing_agent"))
+        return self.journal_tests(task, tests, journal, store)
+
+    async def agenerate_tests(
+        self,
+        task: Dict[str, Any],
+        programming_language: str,
+        manifest: Optional[BuildManifest] = None,
+        journal: Optional[Tuple[RunJournal, str]] = None,
+        store: Optional[BlobStore] = None,
+    ) -> str:
+        tests = self.reuse_tests(task, programming_language, manifest, journal, store)
+        if tests is not None:
+            return tests
+        logger.info(f"Testing task {task['task_id']}: {task['description']}")
+        prompt = self.build_prompt(task, programming_language)
+        tests = self.clean_tests(await acall_llm(prompt, agent="testing_agent"))
+        return self.journal_tests(task, tests, journal, store)
+
+    def prepare(
+        self, context_variables: Dict[str, Any]
+    ) -> Tuple[str, GitManagerService, BuildManifest]:
         project_dir = context_variables.get(
             "project_dir", os.path.join(os.getcwd(), "output", "project")
         )
 
-        git_manager = GitManagerService(repo_path=project_dir)
+        git_manager = GitManagerService.for_repo(project_dir)
         # Pull latest changes
         git_manager.pull()
+        return project_dir, git_manager, BuildManifest(project_dir)
+
+    def test_tasks(self, context_variables: Dict[str, Any]) -> Result:
+        implemented_tasks = sort_by_task_id(context_variables.get("implemented_tasks", []))
+        programming_language = context_variables.get(
+            "programming_language", "python"
+        ).lower()
+        project_dir, git_manager, manifest = self.prepare(context_variables)
+        reusable = None if context_variables.get("force_regenerate") else manifest
+        journal = RunJournal.from_context(context_variables)
+
+        max_concurrency = get_max_concurrency(context_variables)
+        logger.info(
+            f"Starting testing of {len(implemented_tasks)} tasks "
+            f"(max {max_concurrency} concurrent)."
+        )
+        store = BlobStore.for_project(project_dir)
+        results = run_bounded(
+            lambda task: store.put(self.generate_tests(
+                self.resolve_code(task, project_dir, store), programming_language, reusable, journal, store
+            )),
+            implemented_tasks,
+            max_concurrency,
+        )
+        return self.save_results(context_variables, project_dir, git_manager, results, manifest)
+
+    async def atest_tasks(self, context_variables: Dict[str, Any]) -> Result:
+        implemented_tasks = sort_by_task_id(context_variables.get("implemented_tasks", []))
+        programming_language = context_variables.get(
+            "programming_language", "python"
+        ).lower()
+        project_dir, git_manager, manifest = await asyncio.to_thread(self.prepare, context_variables)
+        reusable = None if context_variables.get("force_regenerate") else manifest
+        journal = RunJournal.from_context(context_variables)
+
+        max_concurrency = get_max_concurrency(context_variables)
+        logger.info(
+            f"Starting async testing of {len(implemented_tasks)} tasks "
+            f"(max {max_concurrency} concurrent)."
+        )
+        store = BlobStore.for_project(project_dir)
+
+        async def generate(task):
+            tests = await self.agenerate_tests(
+                self.resolve_code(task, project_dir, store), programming_language, reusable, journal, store
+            )
+            return store.put(tests)
+
+        results = await run_bounded_async(generate, implemented_tasks, max_concurrency)
+        return await asyncio.to_thread(
+            self.save_results, context_variables, project_dir, git_manager, results, manifest
+        )
 
-        logger.info(f"Starting testing of {len(implemented_tasks)} tasks.")
+    def save_results(
+        self,
+        context_variables: Dict[str, Any],
+        project_dir: str,
+        git_manager: GitManagerService,
+        results: List[Tuple[Dict[str, Any], Optional[str], Optional[BaseException]]],
+        manifest: BuildManifest,
+    ) -> Result:
+        programming_language = context_variables.get("programming_language", "python").lower()
+        store = BlobStore.for_project(project_dir)
         tested_tasks = []
-        for task in implemented_tasks:
-            logger.info(f"Testing task {task['task_id']}: {task['description']}")
-            prompt = f"""
-{get_prompt('testing_agent')}
-
-Programming Language: {programming_language}
-
-Code:
-\"\"\"{task['code']}\"\"\"
-
-Instructions:
-- Write unit tests in {programming_language} for the provided code.
-- Return only the test code.
-- Do not include any comments, explanations, or code block markers like ```.
-
-"""
-            tests = call_llm(prompt)
-            # Remove code block markers if present
-            tests_clean = tests.strip()
-            if tests_clean.startswith("```") and tests_clean.endswith("```"):
-                tests_clean = "\n".join(tests_clean.strip("```").split("\n")[1:])
-                tests_clean = tests_clean.strip()
-            logger.debug(f"Generated tests for task {task['task_id']}:\n{tests_clean}")
+        failed_tests = []
+        pending_commits = []
+
+        # Results arrive in task_id order, so writes and commits do too. Code
+        # and tests are loaded from the blob store one task at a time.
+        for task, tests_ref, error in results:
+            if error is not None:
+                logger.error(f"Failed to generate tests for task {task['task_id']}: {error}")
+                failed_tests.append({"task_id": task["task_id"], "error": str(error)})
+                continue
+            tests_clean = store.read(tests_ref)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Generated tests for task {task['task_id']}:\n{tests_clean}")
             tested_tasks.append(
                 {
                     "task_id": task["task_id"],
                     "description": task["description"],
                     "file_path": task["file_path"],
-                    "code": task["code"],
-                    "tests": tests_clean,
+                    "code_ref": task.get("code_ref"),
+                    "tests_ref": tests_ref,
                 }
             )
 
-            # Save the tests to a test file
-            test_file_name = f"test_{os.path.basename(task['file_path'])}"
-            test_file_path = os.path.join(
-                project_dir, os.path.dirname(task["file_path"]), test_file_name
+            fingerprint = self.fingerprint(
+                self.resolve_code(task, project_dir, store), programming_language
             )
+            if manifest.is_current(self.manifest_key(task), fingerprint, tests_clean):
+                continue
+
+            # Save the tests to a test file
+            test_file_path = os.path.join(project_dir, self.test_file_path(task))
             os.makedirs(os.path.dirname(test_file_path), exist_ok=True)
-            with open(test_file_path, "w") as test_file:
+            with span("write", "file", path=test_file_path), \
+                    open(test_file_path, "w", encoding="utf-8") as test_file:
                 test_file.write(tests_clean)
             logger.info(f"Saved tests for task {task['task_id']} to {test_file_path}")
 
-            # Add and commit the tests
-            git_manager.add(test_file_path)
-            git_manager.commit(f"Added tests for task {task['task_id']}")
+            manifest.record(self.manifest_key(task), fingerprint, test_file_path, tests_clean)
+            pending_commits.append((f"Added tests for task {task['task_id']}", [test_file_path]))
+
+        # Commit all test files in one batch, one commit per task unless squashed
+        try:
+            git_manager.commit_batch(
+                pending_commits,
+                per_commit=context_variables.get("git_commit_mode", "per_task") != "squash",
+                squash_message=f"Added tests for {len(pending_commits)} tasks",
+            )
+        except Exception as e:
+            logger.error(f"Git operations failed: {e}")
+
+        try:
+            manifest.save()
+        except OSError as e:
+            logger.error(f"Failed to save build manifest: {e}")
 
         # Push changes to remote (if remote is set)
         try:
@@ -87,9 +270,13 @@ Instructions:
         except Exception as e:
             logger.error(f"Git push failed: {e}")
 
+        if failed_tests:
+            logger.warning(
+                f"Test generation failed for {len(failed_tests)} of {len(results)} tasks."
+            )
         logger.info("All tasks tested.")
         return Result(
             value="Tasks tested.",
-            context_variables={"tested_tasks": tested_tasks},
+            context_variables={"tested_tasks": tested_tasks, "failed_tests": failed_tests},
             agent="IntegrationAgent",
         )
@@ -14,10 +14,11 @@ class UserInterfaceAgent(Agent):
         )
 
     def get_user_input(self, context_variables: Dict[str, Any]) -> Result:
-        project_description = input("Enter the project description: ")
-        project_name = input("Enter the project name (for GitHub repository): ")
-        context_variables["project_description"] = project_description
-        context_variables["project_name"] = project_name
+        # Batch runs and resumed runs already carry the project; only prompt for what is missing.
+        if not context_variables.get("project_description"):
+            context_variables["project_description"] = input("Enter the project description: ")
+        if not context_variables.get("project_name"):
+            context_variables["project_name"] = input("Enter the project name (for GitHub repository): ")
         return Result(
             value="Project description and name received.",
             context_variables=context_variables,
@@ -1,6 +1,8 @@
 from .agent import Agent
+from .context import ContextDiff, ContextSnapshot, ContextStore
 from .swarm import Swarm
+from .tracing import span, start_tracing, stop_tracing
 from .types import AgentContext, Message, Project, Response, Result, Task
 from .utils import debug_print
 
-__all__ = ["Agent", "Swarm", "Result", "Task", "Project", "Message", "AgentContext"]
+__all__ = ["Agent", "ContextStore", "Swarm", "Result", "Task", "Project", "Message", "AgentContext"]
@@ -1,6 +1,7 @@
 # autodev/core/agent.py
 
-from typing import Callable, Any, Dict, Optional, List
+import inspect
+from typing import Callable, Any, Awaitable, Dict, Optional, List
 import logging
 from .types import Result
 
@@ -12,13 +13,26 @@ class Agent:
         name: str,
         instructions: str,
         functions: Optional[List[Callable[[Dict[str, Any]], Result]]] = None,
+        async_functions: Optional[List[Callable[[Dict[str, Any]], Awaitable[Result]]]] = None,
     ):
         self.name = name
         self.instructions = instructions
         self.functions = functions or []
+        # Agents opt into native async execution by supplying coroutine
+        # functions; otherwise aexecute runs the sync functions in a thread.
+        self.async_functions = async_functions or []
+
+    def _no_actions(self, context_variables: Dict[str, Any]) -> Result:
+        logger.warning(f"No actions performed by agent '{self.name}'.")
+        return Result(
+            value=f"{self.name} has no actions to perform.",
+            agent=None,
+            context_variables=context_variables,
+        )
 
     def execute(self, context_variables: Dict[str, Any]) -> Result:
         logger.info(f"Agent '{self.name}' is executing.")
+        error = None
         for function in self.functions:
             try:
                 result = function(context_variables)
@@ -27,10 +41,34 @@ class Agent:
                     return result
             except Exception as e:
                 logger.error(f"Error in function '{function.__name__}': {e}")
+                error = e
                 continue
-        logger.warning(f"No actions performed by agent '{self.name}'.")
-        return Result(
-            value=f"{self.name} has no actions to perform.",
-            agent=None,
-            context_variables=context_variables,
-        )
+        if error is not None:
+            # Surface the failure so the swarm records the hop as failed, not finished.
+            raise error
+        return self._no_actions(context_variables)
+
+    async def aexecute(self, context_variables: Dict[str, Any]) -> Result:
+        # Imported here so that importing the agents at startup does not load
+        # asyncio (see tests/test_startup.py); when a coroutine runs it is
+        # already in sys.modules and this is just a lookup.
+        import asyncio
+
+        logger.info(f"Agent '{self.name}' is executing (async).")
+        error = None
+        for function in self.async_functions or self.functions:
+            try:
+                if inspect.iscoroutinefunction(function):
+                    result = await function(context_variables)
+                else:
+                    result = await asyncio.to_thread(function, context_variables)
+                if result:
+                    logger.info(f"Function '{function.__name__}' executed successfully.")
+                    return result
+            except Exception as e:
+                logger.error(f"Error in function '{function.__name__}': {e}")
+                error = e
+                continue
+        if error is not None:
+            raise error
+        return self._no_actions(context_variables)
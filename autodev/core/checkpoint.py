@@ -0,0 +1,171 @@
+# autodev/core/checkpoint.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .context import ContextDiff
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = os.path.join(".autodev", "runs.sqlite3")
+
+
+class RunJournal:
+    """SQLite store of per-hop checkpoints and per-task results for pipeline runs.
+
+    A checkpoint records the context and the agent about to run after every
+    hop; task entries record each finished LLM generation so a resumed run
+    only regenerates work that never completed. A checkpoint can store just
+    the keys a hop changed, so large contexts are not rewritten every hop.
+    """
+
+    _instances: Dict[str, "RunJournal"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "run_id TEXT NOT NULL, hop INTEGER NOT NULL, agent TEXT, context TEXT NOT NULL, "
+            "created REAL NOT NULL, delta INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (run_id, hop));"
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "run_id TEXT NOT NULL, stage TEXT NOT NULL, task_key TEXT NOT NULL, payload TEXT NOT NULL, "
+            "created REAL NOT NULL, PRIMARY KEY (run_id, stage, task_key));"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")}
+        if "delta" not in columns:
+            # Journals written before delta checkpoints only hold full contexts.
+            self._conn.execute("ALTER TABLE checkpoints ADD COLUMN delta INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    @classmethod
+    def open(cls, path: str) -> "RunJournal":
+        key = os.path.realpath(path)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(path)
+            return cls._instances[key]
+
+    @classmethod
+    def for_output_dir(cls, output_dir: str) -> "RunJournal":
+        return cls.open(os.path.join(output_dir, JOURNAL_FILE))
+
+    @classmethod
+    def from_context(cls, context_variables: Dict[str, Any]) -> Optional[Tuple["RunJournal", str]]:
+        """Return ``(journal, run_id)`` if the run is journaled, else ``None``."""
+        path = context_variables.get("journal_path")
+        run_id = context_variables.get("run_id")
+        if not path or not run_id:
+            return None
+        return cls.open(path), run_id
+
+    def start_run(self) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, status, created, updated) VALUES (?, 'running', ?, ?)",
+                (run_id, now, now),
+            )
+            self._conn.commit()
+        return run_id
+
+    def finish_run(self, run_id: str, status: str = "completed") -> None:
+        """Set the run's status: "completed", or "failed" to keep it resumable."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, updated = ? WHERE run_id = ?", (status, time.time(), run_id)
+            )
+            self._conn.commit()
+
+    def run_status(self, run_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def latest_run(self, unfinished_only: bool = True) -> Optional[str]:
+        query = "SELECT run_id FROM runs"
+        if unfinished_only:
+            query += " WHERE status != 'completed'"
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY updated DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def checkpoint(
+        self,
+        run_id: str,
+        hop: int,
+        agent: Optional[str],
+        context: Mapping[str, Any],
+        changes: Optional[ContextDiff] = None,
+    ) -> None:
+        """Record the context after ``hop``.
+
+        With ``changes`` (the diff since the previous checkpoint), only those
+        are stored and :meth:`last_checkpoint` replays them onto the newest
+        full checkpoint.
+        """
+        if changes is not None:
+            payload = json.dumps(changes.to_dict(), separators=(",", ":"), default=str)
+        else:
+            payload = json.dumps(dict(context), separators=(",", ":"), default=str)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, hop, agent, context, created, delta) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, hop, agent, payload, now, int(changes is not None)),
+            )
+            self._conn.execute("UPDATE runs SET updated = ? WHERE run_id = ?", (now, run_id))
+            self._conn.commit()
+
+    def last_checkpoint(self, run_id: str) -> Optional[Tuple[int, Optional[str], Dict[str, Any]]]:
+        """Return ``(hop, agent, context)`` of the newest checkpoint of ``run_id``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hop, agent, context, delta FROM checkpoints WHERE run_id = ? AND hop >= "
+                "(SELECT MAX(hop) FROM checkpoints WHERE run_id = ? AND delta = 0) ORDER BY hop",
+                (run_id, run_id),
+            ).fetchall()
+        if not rows:
+            return None
+        context: Dict[str, Any] = {}
+        for hop, agent, payload, delta in rows:
+            if delta:
+                ContextDiff.from_dict(json.loads(payload)).apply(context)
+            else:
+                context = json.loads(payload)
+        return hop, agent, context
+
+    def record_task(self, run_id: str, stage: str, task_key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (run_id, stage, task_key, payload, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, stage, task_key, json.dumps(payload, separators=(",", ":")), time.time()),
+            )
+            self._conn.commit()
+
+    def completed_task(self, run_id: str, stage: str, task_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM tasks WHERE run_id = ? AND stage = ? AND task_key = ?",
+                (run_id, stage, task_key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
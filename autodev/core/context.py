@@ -0,0 +1,223 @@
+# autodev/core/context.py
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Optional
+
+# Marks a key deleted in a layer, hiding any value in older layers.
+_DELETED = object()
+_MISSING = object()
+
+# Past this many layers, lookups are sped up by flattening the chain once.
+MAX_DEPTH = 16
+
+
+class _Layer:
+    """One frozen set of writes on top of a parent layer; never modified after creation."""
+
+    __slots__ = ("parent", "changes", "depth", "version")
+
+    def __init__(self, parent: Optional["_Layer"], changes: Dict[str, Any], version: int):
+        self.parent = parent
+        self.changes = changes
+        self.depth = parent.depth + 1 if parent is not None else 1
+        self.version = version
+
+
+def _lookup(layer: Optional[_Layer], key: str) -> Any:
+    """The newest value of ``key`` in the chain, or _DELETED if it has none."""
+    while layer is not None:
+        value = layer.changes.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        layer = layer.parent
+    return _DELETED
+
+
+def _flatten(layer: Optional[_Layer]) -> Dict[str, Any]:
+    chain = []
+    while layer is not None:
+        chain.append(layer.changes)
+        layer = layer.parent
+    merged: Dict[str, Any] = {}
+    for changes in reversed(chain):
+        merged.update(changes)
+    return {key: value for key, value in merged.items() if value is not _DELETED}
+
+
+def describe_value(value: Any) -> str:
+    """A short description of ``value`` for logs, without formatting its contents."""
+    if isinstance(value, str):
+        return f"str[{len(value)}]"
+    if isinstance(value, (list, tuple, dict, set)):
+        return f"{type(value).__name__}[{len(value)}]"
+    text = repr(value)
+    return text if len(text) <= 40 else f"{type(value).__name__}"
+
+
+def describe_keys(mapping: Mapping[str, Any], keys=None) -> str:
+    keys = list(mapping) if keys is None else keys
+    return ", ".join(f"{key}={describe_value(mapping[key])}" for key in keys)
+
+
+class ContextSnapshot(Mapping):
+    """A read-only view of a ContextStore at one version; taking one copies nothing."""
+
+    __slots__ = ("_layer",)
+
+    def __init__(self, layer: Optional[_Layer]):
+        self._layer = layer
+
+    @property
+    def version(self) -> int:
+        return self._layer.version if self._layer is not None else 0
+
+    def __getitem__(self, key: str) -> Any:
+        value = _lookup(self._layer, key)
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_flatten(self._layer))
+
+    def __len__(self) -> int:
+        return len(_flatten(self._layer))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _flatten(self._layer)
+
+    def __repr__(self) -> str:
+        return f"ContextSnapshot(version={self.version}, {describe_keys(self)})"
+
+
+@dataclass
+class ContextDiff:
+    """What changed between two versions of a context: new or replaced values and removed keys."""
+
+    updated: Dict[str, Any] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.updated or self.removed)
+
+    @property
+    def keys(self) -> List[str]:
+        return sorted(self.updated) + sorted(self.removed)
+
+    def apply(self, context: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        context.update(self.updated)
+        for key in self.removed:
+            context.pop(key, None)
+        return context
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"updated": self.updated, "removed": self.removed}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContextDiff":
+        return cls(dict(data.get("updated") or {}), list(data.get("removed") or []))
+
+    def __repr__(self) -> str:
+        # Only key names and sizes: values can be whole generated source files.
+        updated = describe_keys(self.updated, sorted(self.updated))
+        return f"ContextDiff(updated: {updated or '-'}; removed: {', '.join(self.removed) or '-'})"
+
+
+class ContextStore(MutableMapping):
+    """The pipeline's shared ``context_variables``, with copy-on-write snapshots.
+
+    It behaves like a dict, so agents read and assign keys as before. Writes
+    go into a small pending layer; :meth:`snapshot` freezes that layer on top
+    of the previous ones and returns a read-only view in O(1), so the swarm
+    can snapshot every hop without copying the context. :meth:`diff` lists
+    the keys written since a snapshot by walking only the newer layers.
+
+    Values are shared between versions, not copied: replace a value to change
+    it instead of mutating it in place, or earlier snapshots see the change too.
+    """
+
+    def __init__(self, initial: Optional[Mapping[str, Any]] = None):
+        self._base: Optional[_Layer] = None
+        self._pending: Dict[str, Any] = dict(initial or {})
+        self._version = 0
+
+    @classmethod
+    def wrap(cls, context: Optional[Mapping[str, Any]]) -> "ContextStore":
+        """``context`` itself if it already is a store, else a new store holding its items."""
+        return context if isinstance(context, cls) else cls(context)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._pending.get(key, _MISSING)
+        if value is _MISSING:
+            value = _lookup(self._base, key)
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._pending[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._pending[key] = _DELETED
+
+    def __contains__(self, key: object) -> bool:
+        value = self._pending.get(key, _MISSING)
+        if value is _MISSING:
+            value = _lookup(self._base, key)
+        return value is not _DELETED
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A plain dict of the current values (shallow: the values themselves are shared)."""
+        merged = _flatten(self._base)
+        for key, value in self._pending.items():
+            if value is _DELETED:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        return merged
+
+    def snapshot(self) -> ContextSnapshot:
+        """Freeze the current contents and return a read-only view of them."""
+        if self._pending:
+            self._version += 1
+            self._base = _Layer(self._base, self._pending, self._version)
+            self._pending = {}
+            if self._base.depth > MAX_DEPTH:
+                self._base = _Layer(None, _flatten(self._base), self._version)
+        return ContextSnapshot(self._base)
+
+    def diff(self, since: ContextSnapshot) -> ContextDiff:
+        """The changes from ``since`` to the current contents."""
+        touched = set(self._pending)
+        layer = self._base
+        while layer is not None and layer is not since._layer:
+            touched.update(layer.changes)
+            layer = layer.parent
+        if layer is not since._layer:
+            # The chain was flattened after the snapshot; compare every key.
+            touched = set(since) | set(self)
+        diff = ContextDiff()
+        for key in sorted(touched):
+            old = since.get(key, _MISSING)
+            new = self.get(key, _MISSING)
+            if new is _MISSING:
+                if old is not _MISSING:
+                    diff.removed.append(key)
+            elif old is _MISSING or (old is not new and old != new):
+                diff.updated[key] = new
+        return diff
+
+    def __repr__(self) -> str:
+        return f"ContextStore(version={self._version}, {describe_keys(self)})"
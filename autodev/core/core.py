@@ -9,6 +9,7 @@ from openai import OpenAI
 
 
 # Local imports
+from .context import ContextStore
 from .util import function_to_json, debug_print, merge_chunk
 from .types import (
     Agent,
@@ -145,7 +146,7 @@ class Swarm:
         execute_tools: bool = True,
     ):
         active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
+        context_variables = ContextStore(context_variables)
         history = copy.deepcopy(messages)
         init_len = len(messages)
 
@@ -247,7 +248,7 @@ class Swarm:
                 execute_tools=execute_tools,
             )
         active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
+        context_variables = ContextStore(context_variables)
         history = copy.deepcopy(messages)
         init_len = len(messages)
 
@@ -3,43 +3,94 @@
 from typing import Dict, Any
 import logging
 from .agent import Agent
-from .types import Response
+from .context import ContextSnapshot, ContextStore
+from .tracing import span
+from .types import Response, Result
 
 logger = logging.getLogger(__name__)
 
 class Swarm:
+    """Runs one agent per hop on a shared ContextStore.
+
+    A plain dict passed as ``context_variables`` is wrapped in a store; the
+    response carries the store and a diff of what the agent changed.
+    """
+
     def __init__(self, agents: Dict[str, Agent]):
         self.agents = agents
 
+    def _not_found(self, agent_name: str, context_variables: ContextStore) -> Response:
+        logger.error(f"Agent '{agent_name}' not found.")
+        return Response(
+            messages=[],
+            agent=None,
+            context_variables=context_variables,
+            changes=context_variables.diff(context_variables.snapshot()),
+        )
+
+    def _merge_result(
+        self, agent: Agent, result: Result, context_variables: ContextStore, before: ContextSnapshot
+    ) -> Response:
+        messages = [{"agent": agent.name, "message": result.value}]
+        if result.context_variables is not context_variables:
+            context_variables.update(result.context_variables or {})
+        changes = context_variables.diff(before)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Agent '{agent.name}' result: {result.value}")
+            logger.debug(f"Context variables updated: {changes}")
+        return Response(
+            messages=messages,
+            agent=result.agent,
+            context_variables=context_variables,
+            changes=changes,
+        )
+
+    def _failed(
+        self, agent: Agent, error: Exception, context_variables: ContextStore, before: ContextSnapshot
+    ) -> Response:
+        logger.error(f"Error executing agent '{agent.name}': {error}")
+        return Response(
+            messages=[],
+            agent=None,
+            context_variables=context_variables,
+            changes=context_variables.diff(before),
+            error=f"{type(error).__name__}: {error}",
+        )
+
     def run(
         self,
         agent_name: str,
         context_variables: Dict[str, Any],
     ) -> Response:
+        context_variables = ContextStore.wrap(context_variables)
         agent = self.agents.get(agent_name)
         if not agent:
-            logger.error(f"Agent '{agent_name}' not found.")
-            return Response(
-                messages=[],
-                agent=None,
-                context_variables=context_variables,
-            )
+            return self._not_found(agent_name, context_variables)
         logger.info(f"Running agent: {agent.name}")
+        before = context_variables.snapshot()
         try:
-            result = agent.execute(context_variables)
-            messages = [{"agent": agent.name, "message": result.value}]
-            context_variables.update(result.context_variables or {})
-            logger.debug(f"Agent '{agent.name}' result: {result.value}")
-            logger.debug(f"Context variables updated: {context_variables}")
-            return Response(
-                messages=messages,
-                agent=result.agent,
-                context_variables=context_variables,
-            )
+            with span(agent.name, "agent") as hop:
+                result = agent.execute(context_variables)
+                hop.set(next_agent=result.agent)
+            return self._merge_result(agent, result, context_variables, before)
+        except Exception as e:
+            return self._failed(agent, e, context_variables, before)
+
+    async def arun(
+        self,
+        agent_name: str,
+        context_variables: Dict[str, Any],
+    ) -> Response:
+        context_variables = ContextStore.wrap(context_variables)
+        agent = self.agents.get(agent_name)
+        if not agent:
+            return self._not_found(agent_name, context_variables)
+        logger.info(f"Running agent (async): {agent.name}")
+        before = context_variables.snapshot()
+        try:
+            with span(agent.name, "agent") as hop:
+                result = await agent.aexecute(context_variables)
+                hop.set(next_agent=result.agent)
+            return self._merge_result(agent, result, context_variables, before)
         except Exception as e:
-            logger.error(f"Error executing agent '{agent.name}': {e}")
-            return Response(
-                messages=[],
-                agent=None,
-                context_variables=context_variables,
-            )
+            return self._failed(agent, e, context_variables, before)
@@ -0,0 +1,297 @@
+# autodev/core/task_graph.py
+
+import asyncio
+import heapq
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskGraphError(ValueError):
+    """The task dependencies contain a cycle."""
+
+
+class DependencyFailed(RuntimeError):
+    """A task was skipped because one of its prerequisites failed."""
+
+
+def dependency_ids(task: Dict[str, Any]) -> List[Any]:
+    """The ``depends_on`` ids of ``task`` as a list (a single id is accepted too)."""
+    depends_on = task.get("depends_on") or []
+    if not isinstance(depends_on, (list, tuple)):
+        depends_on = [depends_on]
+    return list(depends_on)
+
+
+class TaskGraph:
+    """Tasks as a DAG of ``depends_on`` edges between ``task_id`` values.
+
+    References to unknown tasks and self-references are ignored. Each task
+    gets a priority equal to the length of the longest chain of tasks that
+    starts with it (weighted by ``cost``), so tasks on the critical path are
+    started first. Raises TaskGraphError if the dependencies have a cycle.
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[Dict[str, Any]],
+        cost: Optional[Callable[[Dict[str, Any]], float]] = None,
+    ):
+        self.tasks = list(tasks)
+        index_of: Dict[Any, int] = {}
+        for index, task in enumerate(self.tasks):
+            index_of.setdefault(task.get("task_id", index), index)
+        self.prerequisites: List[List[int]] = []
+        self.dependents: List[List[int]] = [[] for _ in self.tasks]
+        for index, task in enumerate(self.tasks):
+            edges = []
+            for dep in dependency_ids(task):
+                dep_index = index_of.get(dep)
+                if dep_index is None or dep_index == index or dep_index in edges:
+                    continue
+                edges.append(dep_index)
+                self.dependents[dep_index].append(index)
+            self.prerequisites.append(edges)
+
+        self.order = self._topological_order()
+        costs = [cost(task) if cost else 1.0 for task in self.tasks]
+        self.priority = [0.0] * len(self.tasks)
+        for index in reversed(self.order):
+            self.priority[index] = costs[index] + max(
+                (self.priority[child] for child in self.dependents[index]), default=0.0
+            )
+
+    def _topological_order(self) -> List[int]:
+        indegree = [len(edges) for edges in self.prerequisites]
+        ready = [index for index, degree in enumerate(indegree) if degree == 0]
+        order = []
+        while ready:
+            index = ready.pop()
+            order.append(index)
+            for child in self.dependents[index]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) < len(self.tasks):
+            cycle = self._find_cycle({index for index, degree in enumerate(indegree) if degree})
+            path = " -> ".join(str(self.task_id(index)) for index in cycle)
+            raise TaskGraphError(f"Task dependencies contain a cycle: {path}")
+        return order
+
+    def _find_cycle(self, remaining) -> List[int]:
+        # Every task left after Kahn's algorithm has a prerequisite that is
+        # also left, so walking prerequisites must revisit a task.
+        index = min(remaining)
+        seen: Dict[int, int] = {}
+        path: List[int] = []
+        while index not in seen:
+            seen[index] = len(path)
+            path.append(index)
+            index = next(dep for dep in self.prerequisites[index] if dep in remaining)
+        return path[seen[index]:] + [index]
+
+    def task_id(self, index: int) -> Any:
+        return self.tasks[index].get("task_id", index)
+
+    def waves(self) -> List[List[Dict[str, Any]]]:
+        """Tasks grouped into topological levels, critical path first within a level."""
+        level = [0] * len(self.tasks)
+        for index in self.order:
+            level[index] = max((level[dep] + 1 for dep in self.prerequisites[index]), default=0)
+        waves: List[List[int]] = [[] for _ in range(max(level, default=-1) + 1)]
+        for index in range(len(self.tasks)):
+            waves[level[index]].append(index)
+        return [
+            [self.tasks[index] for index in sorted(wave, key=lambda index: -self.priority[index])]
+            for wave in waves
+        ]
+
+    def critical_path(self) -> List[Dict[str, Any]]:
+        """The chain of dependent tasks with the highest total cost."""
+        if not self.tasks:
+            return []
+        roots = [index for index, edges in enumerate(self.prerequisites) if not edges]
+        index = max(roots, key=lambda index: self.priority[index])
+        path = [index]
+        while self.dependents[index]:
+            index = max(self.dependents[index], key=lambda child: self.priority[child])
+            path.append(index)
+        return [self.tasks[index] for index in path]
+
+    def describe(self) -> str:
+        waves = self.waves()
+        path = " -> ".join(str(task.get("task_id")) for task in self.critical_path())
+        return f"{len(self.tasks)} tasks in {len(waves)} waves; critical path {path or '-'}"
+
+
+def normalize_dependencies(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return ``tasks`` with clean ``depends_on`` lists and any cycles broken.
+
+    Unknown ids and self-references are dropped. While the graph has a
+    cycle, the edge that closes it is removed and a warning is logged, so a
+    bad plan degrades to less ordering instead of failing the run.
+    """
+    known = {task.get("task_id") for task in tasks}
+    tasks = [
+        dict(task, depends_on=[
+            dep for dep in dict.fromkeys(dependency_ids(task))
+            if dep in known and dep != task.get("task_id")
+        ])
+        for task in tasks
+    ]
+    while True:
+        try:
+            TaskGraph(tasks)
+            return tasks
+        except TaskGraphError as e:
+            logger.warning(f"{e}; dropping the dependency that closes it.")
+            task, dep = _cycle_edge(tasks)
+            task["depends_on"] = [other for other in task["depends_on"] if other != dep]
+
+
+def _cycle_edge(tasks: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Any]:
+    """The last edge ``(task, dependency id)`` of a cycle, found by depth-first search."""
+    by_id = {task.get("task_id"): task for task in tasks}
+    state: Dict[Any, int] = {}
+
+    def visit(task_id):
+        state[task_id] = 1
+        for dep in by_id[task_id]["depends_on"]:
+            if state.get(dep) == 1:
+                return by_id[task_id], dep
+            if dep not in state:
+                found = visit(dep)
+                if found:
+                    return found
+        state[task_id] = 2
+        return None
+
+    for task_id in by_id:
+        if task_id not in state:
+            found = visit(task_id)
+            if found:
+                return found
+    raise TaskGraphError("No cycle found.")
+
+
+class _GraphRun:
+    """Bookkeeping shared by the sync and async DAG runners."""
+
+    def __init__(self, graph: TaskGraph):
+        self.graph = graph
+        self.waiting = [len(edges) for edges in graph.prerequisites]
+        self.ready: List[Tuple[float, int]] = [
+            (-graph.priority[index], index) for index, count in enumerate(self.waiting) if count == 0
+        ]
+        heapq.heapify(self.ready)
+        self.outcomes: Dict[int, Tuple[Any, Optional[BaseException]]] = {}
+
+    def next_ready(self) -> Optional[Tuple[int, Dict[Any, Any]]]:
+        """Pop the most critical runnable task as ``(index, prerequisite results)``.
+
+        Tasks whose prerequisites failed are completed with DependencyFailed
+        on the way.
+        """
+        while self.ready:
+            _, index = heapq.heappop(self.ready)
+            failed = [
+                self.graph.task_id(dep)
+                for dep in self.graph.prerequisites[index]
+                if self.outcomes[dep][1] is not None
+            ]
+            if failed:
+                self.complete(index, None, DependencyFailed(f"Prerequisite task(s) {failed} failed."))
+                continue
+            return index, {
+                self.graph.task_id(dep): self.outcomes[dep][0]
+                for dep in self.graph.prerequisites[index]
+            }
+        return None
+
+    def complete(self, index: int, result: Any, error: Optional[BaseException]) -> None:
+        self.outcomes[index] = (result, error)
+        for child in self.graph.dependents[index]:
+            self.waiting[child] -= 1
+            if self.waiting[child] == 0:
+                heapq.heappush(self.ready, (-self.graph.priority[child], child))
+
+    def results(self) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+        return [
+            (task, *self.outcomes[index]) for index, task in enumerate(self.graph.tasks)
+        ]
+
+
+def run_graph(
+    func: Callable[[Dict[str, Any], Dict[Any, Any]], Any],
+    tasks: Sequence[Dict[str, Any]],
+    max_workers: int = 1,
+) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+    """Run ``func(task, prerequisites)`` for every task in dependency order.
+
+    ``prerequisites`` maps each ``depends_on`` id to that task's result. A
+    task starts as soon as all of its prerequisites have finished, with at
+    most ``max_workers`` in flight and the longest remaining chain first.
+    A failed task's dependents are not run and report DependencyFailed.
+    Returns ``(task, result, error)`` tuples in the order of ``tasks``, like
+    :func:`autodev.core.utils.run_bounded`.
+    """
+    run = _GraphRun(TaskGraph(tasks))
+    max_workers = max(1, max_workers)
+
+    def _guarded(index, prerequisites):
+        try:
+            return func(run.graph.tasks[index], prerequisites), None
+        except Exception as e:
+            return None, e
+
+    if max_workers == 1:
+        while True:
+            ready = run.next_ready()
+            if ready is None:
+                return run.results()
+            run.complete(ready[0], *_guarded(*ready))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, max(1, len(run.graph.tasks)))) as executor:
+        running = {}
+        while True:
+            while len(running) < max_workers:
+                ready = run.next_ready()
+                if ready is None:
+                    break
+                running[executor.submit(_guarded, *ready)] = ready[0]
+            if not running:
+                return run.results()
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                run.complete(running.pop(future), *future.result())
+
+
+async def run_graph_async(
+    func: Callable[[Dict[str, Any], Dict[Any, Any]], Awaitable[Any]],
+    tasks: Sequence[Dict[str, Any]],
+    max_concurrency: int = 1,
+) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+    """Async counterpart of :func:`run_graph` on the running event loop."""
+    run = _GraphRun(TaskGraph(tasks))
+    max_concurrency = max(1, max_concurrency)
+
+    async def _guarded(index, prerequisites):
+        try:
+            return await func(run.graph.tasks[index], prerequisites), None
+        except Exception as e:
+            return None, e
+
+    running: Dict[asyncio.Task, int] = {}
+    while True:
+        while len(running) < max_concurrency:
+            ready = run.next_ready()
+            if ready is None:
+                break
+            running[asyncio.ensure_future(_guarded(*ready))] = ready[0]
+        if not running:
+            return run.results()
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            run.complete(running.pop(future), *future.result())
@@ -0,0 +1,239 @@
+# autodev/core/tracing.py
+
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    """Returned by :func:`span` while tracing is off; every operation does nothing.
+
+    It is falsy, so callers can skip computing expensive attributes with
+    ``if current_span: current_span.set(...)``.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def __bool__(self) -> bool:
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def mark_first_token(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed operation. Use as a context manager; attributes end up in the trace."""
+
+    __slots__ = ("tracer", "name", "category", "attrs", "start", "end", "track")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start = 0.0
+        self.end = 0.0
+        self.track = 0
+
+    def __enter__(self) -> "Span":
+        self.track = self.tracer.track()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.end = time.perf_counter()
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(self)
+        return False
+
+    def __bool__(self) -> bool:
+        return True
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def mark_first_token(self) -> None:
+        """Record time to first token, once, relative to the span's start."""
+        if "ttft_ms" not in self.attrs:
+            self.attrs["ttft_ms"] = round((time.perf_counter() - self.start) * 1000, 3)
+
+
+class Tracer:
+    """Collects finished spans for one run and exports them.
+
+    Spans are grouped into tracks: one per thread, and one per asyncio task
+    so concurrent coroutines on the loop thread do not appear nested inside
+    each other in the trace viewer.
+    """
+
+    def __init__(self, name: str = "autodev"):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._tracks: Dict[Any, Tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, category: str, attrs: Dict[str, Any]) -> Span:
+        return Span(self, name, category, attrs)
+
+    def track(self) -> int:
+        # Without asyncio imported there is no event loop, so no task to look up.
+        asyncio = sys.modules.get("asyncio")
+        try:
+            task = asyncio.current_task() if asyncio is not None else None
+        except RuntimeError:
+            task = None
+        key = task if task is not None else threading.get_ident()
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is None:
+                label = task.get_name() if task is not None else threading.current_thread().name
+                track = (len(self._tracks) + 1, label)
+                self._tracks[key] = track
+        return track[0]
+
+    def finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def chrome_events(self) -> List[Dict[str, Any]]:
+        """Spans as Chrome trace "complete" events (microsecond timestamps)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            tracks = list(self._tracks.values())
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}}
+        ]
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": label}}
+            for tid, label in tracks
+        )
+        for span in sorted(spans, key=lambda span: span.start):
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.track,
+                "args": {key: _jsonable(value) for key, value in span.attrs.items()},
+            })
+        return events
+
+    def export_chrome_trace(self, path: str) -> str:
+        """Write a trace viewable in chrome://tracing or Perfetto and return its path."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"}, trace_file)
+        return path
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per ``(category, name)``: call count, total/mean/p50/p95/max seconds and token totals."""
+        with self._lock:
+            spans = list(self.spans)
+        groups: Dict[Tuple[str, str], List[Span]] = {}
+        for span in spans:
+            groups.setdefault((span.category, span.name), []).append(span)
+        rows = []
+        for (category, name), group in groups.items():
+            durations = sorted(span.duration for span in group)
+            rows.append({
+                "category": category,
+                "name": name,
+                "count": len(group),
+                "errors": sum(1 for span in group if "error" in span.attrs),
+                "total": sum(durations),
+                "mean": sum(durations) / len(durations),
+                "p50": _nearest_rank(durations, 0.5),
+                "p95": _nearest_rank(durations, 0.95),
+                "max": durations[-1],
+                "prompt_tokens": sum(span.attrs.get("prompt_tokens") or 0 for span in group),
+                "completion_tokens": sum(span.attrs.get("completion_tokens") or 0 for span in group),
+            })
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def format_summary(self) -> str:
+        header = (
+            f"{'category':<8} {'name':<32} {'count':>6} {'errors':>6} {'total s':>9} "
+            f"{'mean s':>8} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'tokens in/out':>15}"
+        )
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            tokens = (
+                f"{row['prompt_tokens']}/{row['completion_tokens']}"
+                if row["prompt_tokens"] or row["completion_tokens"] else "-"
+            )
+            lines.append(
+                f"{row['category']:<8} {row['name'][:32]:<32} {row['count']:>6} {row['errors']:>6} "
+                f"{row['total']:>9.3f} {row['mean']:>8.3f} {row['p50']:>8.3f} {row['p95']:>8.3f} "
+                f"{row['max']:>8.3f} {tokens:>15}"
+            )
+        return "\n".join(lines)
+
+
+def _nearest_rank(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, category: str = "app", **attrs: Any):
+    """Time the enclosed block as a span of the active trace.
+
+    Costs one global lookup and returns a shared no-op span when tracing is off.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.span(name, category, attrs)
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def start_tracing(name: str = "autodev") -> Tracer:
+    """Start collecting spans for a new run, replacing any active tracer."""
+    global _tracer
+    _tracer = Tracer(name)
+    return _tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Stop collecting spans and return the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
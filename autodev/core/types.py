@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, Optional, List
 
 
@@ -8,6 +8,8 @@ class Task:
     description: str
     code: Optional[str] = None
     tests: Optional[str] = None
+    # task_ids that must be implemented before this task.
+    depends_on: List[int] = field(default_factory=list)
 
 
 @dataclass
@@ -41,3 +43,7 @@ class Response:
     messages: List[Dict[str, Any]]
     agent: Optional[str] = None
     context_variables: Dict[str, Any] = None
+    # What the agent changed in the context during this hop (a ContextDiff).
+    changes: Any = None
+    # Set when the agent raised instead of returning a Result.
+    error: Optional[str] = None
@@ -1,6 +1,84 @@
-from typing import Any
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 1
 
 
 def debug_print(debug: bool, *args: Any) -> None:
     if debug:
         print(*args)
+
+
+def get_max_concurrency(context_variables: Dict[str, Any]) -> int:
+    """Resolve the number of in-flight LLM calls an agent may issue.
+
+    ``context_variables["max_concurrency"]`` wins over the
+    ``AUTODEV_MAX_CONCURRENCY`` environment variable; values below 1 fall back
+    to sequential execution.
+    """
+    value = context_variables.get("max_concurrency")
+    if value is None:
+        value = os.getenv("AUTODEV_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid max_concurrency value {value!r}; running sequentially.")
+        return DEFAULT_MAX_CONCURRENCY
+
+
+def run_bounded(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_CONCURRENCY,
+) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+    """Apply ``func`` to every item with at most ``max_workers`` calls in flight.
+
+    Returns ``(item, result, error)`` tuples in the order of ``items``. An
+    exception raised for one item is stored in its ``error`` slot instead of
+    aborting the remaining items.
+    """
+    items = list(items)
+
+    def _guarded(item):
+        try:
+            return item, func(item), None
+        except Exception as e:
+            return item, None, e
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [_guarded(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(_guarded, items))
+
+
+async def run_bounded_async(
+    func: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+    """Async counterpart of :func:`run_bounded` driven by a semaphore on the running loop."""
+    import asyncio  # not imported at module level to keep CLI startup fast
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _guarded(item):
+        async with semaphore:
+            try:
+                return item, await func(item), None
+            except Exception as e:
+                return item, None, e
+
+    return list(await asyncio.gather(*(_guarded(item) for item in items)))
+
+
+def sort_by_task_id(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order task dicts by ``task_id``, keeping the input order if ids are not comparable."""
+    try:
+        return sorted(tasks, key=lambda task: task.get("task_id"))
+    except TypeError:
+        return list(tasks)
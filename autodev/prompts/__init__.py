@@ -1,3 +1,4 @@
 from .agent_prompts import get_prompt, BASE_PROMPTS
+from .registry import PromptRegistry, get_registry, render_prompt
 
-__all__ = ["get_prompt", "BASE_PROMPTS"]
+__all__ = ["get_prompt", "BASE_PROMPTS", "PromptRegistry", "get_registry", "render_prompt"]
@@ -1,8 +1,11 @@
 # autodev/prompts/agent_prompts.py
 
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Dict
 import re
 
+from .registry import PromptSlot
+
 BASE_PROMPTS: Dict[str, str] = {
     "user_interface_agent": (
         "You are the User Interface Agent.\n"
@@ -56,6 +59,17 @@ BASE_PROMPTS: Dict[str, str] = {
 }
 
 
+DEFAULT_PROMPT = "You are an agent."
+
+# Precomputed lookups so get_prompt resolves both "developer_agent" and
+# "DeveloperAgent" without running the normalizing regexes.
+PROMPT_ALIASES: Dict[str, str] = {}
+for _key in BASE_PROMPTS:
+    PROMPT_ALIASES[_key] = _key
+    PROMPT_ALIASES["".join(part.capitalize() for part in _key.split("_"))] = _key
+
+
+@lru_cache(maxsize=256)
 def normalize_agent_name(agent_name: str) -> str:
     """Convert agent names to match the keys in BASE_PROMPTS."""
     s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', agent_name)
@@ -65,5 +79,103 @@ def normalize_agent_name(agent_name: str) -> str:
 
 
 def get_prompt(agent_name: str) -> str:
-    normalized_name = normalize_agent_name(agent_name)
-    return BASE_PROMPTS.get(normalized_name, "You are an agent.")
+    normalized_name = PROMPT_ALIASES.get(agent_name) or normalize_agent_name(agent_name)
+    return BASE_PROMPTS.get(normalized_name, DEFAULT_PROMPT)
+
+
+# Templates for the per-call prompts. Everything in ``static_prefix`` is
+# identical for every call so it can be served from provider prompt caches;
+# per-task content only appears in the slots that follow it.
+PROMPT_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "developer_agent": {
+        "static_prefix": BASE_PROMPTS["developer_agent"] + (
+            "\n\n"
+            "Instructions:\n"
+            "- Write code in the programming language given below to implement the task in the target file given below.\n"
+            "- Include documentation as docstrings or comments within the code.\n"
+            "- Do not include any comments, explanations, or code block markers like ``` or \'\'\'.\n"
+            "- Return only the code."
+        ),
+        "slots": [
+            PromptSlot("programming_language", "Programming Language: {{ programming_language }}"),
+            PromptSlot("file_path", "Target File: {{ file_path }}"),
+            PromptSlot("description", 'Task Description:\n"""{{ body }}"""', elide="head"),
+            PromptSlot(
+                "prerequisites",
+                "Prerequisite Code (already implemented; use these interfaces as they are):\n{{ body }}",
+                elide="middle",
+                optional=True,
+            ),
+        ],
+    },
+    "testing_agent": {
+        "static_prefix": BASE_PROMPTS["testing_agent"] + (
+            "\n\n"
+            "Instructions:\n"
+            "- Write unit tests in the programming language given below for the provided code.\n"
+            "- Return only the test code.\n"
+            "- Do not include any comments, explanations, or code block markers like ```."
+        ),
+        "slots": [
+            PromptSlot("programming_language", "Programming Language: {{ programming_language }}"),
+            PromptSlot("code", 'Code:\n"""{{ body }}"""', elide="middle"),
+        ],
+    },
+    "task_decomposer_agent": {
+        "static_prefix": BASE_PROMPTS["task_decomposer_agent"] + (
+            "\n\n"
+            "Instructions:\n"
+            "- Decompose the project described below into detailed, actionable coding tasks.\n"
+            "- Return the tasks **only** as a JSON array.\n"
+            "- **Do not** include any comments, explanations, or code block markers (like triple backticks).\n"
+            "- Each task must have \"task_id\" (integer), \"description\" (string) and \"depends_on\" (array of task_ids).\n"
+            "- \"depends_on\" lists the tasks whose code this task uses; leave it empty for independent tasks and never create cycles.\n"
+            "- Ensure the JSON is properly formatted.\n"
+            "\n"
+            "Example Output:\n"
+            "[\n"
+            "    {\"task_id\": 1, \"description\": \"First coding task description\", \"depends_on\": []},\n"
+            "    {\"task_id\": 2, \"description\": \"Second coding task description\", \"depends_on\": [1]}\n"
+            "]"
+        ),
+        "slots": [
+            PromptSlot("project_description", 'Project Description:\n"""{{ body }}"""', elide="head"),
+        ],
+    },
+    "solution_architect_agent": {
+        "static_prefix": BASE_PROMPTS["solution_architect_agent"] + (
+            "\n\n"
+            "Instructions:\n"
+            "- Analyze the project description and initial coding tasks given below.\n"
+            "- Decide on the best technology stack, including programming language, frameworks, and libraries.\n"
+            "- Provide a high-level system architecture focused solely on code components (e.g., modules, classes, functions).\n"
+            "- Include the chosen programming language and frameworks in the architecture description.\n"
+            "- Define the folder structure of the project and specify **file paths with appropriate file extensions** where each task will be implemented.\n"
+            "- Ensure that the file structure and file names reflect the conventions of the chosen technology stack.\n"
+            "- Create dummy files in the repository to represent these files (e.g., empty `.js` files for JavaScript, `.java` for Java).\n"
+            "- Assign each task to a specific file path.\n"
+            "- Keep each task's \"depends_on\" list of prerequisite task_ids, adjusting it if the architecture changes which tasks use each other's code; never create cycles.\n"
+            "- Return the architecture, programming_language, updated tasks, and file assignments as a JSON object with keys \"architecture\", \"programming_language\", \"tasks\", and \"file_structure\".\n"
+            "- Do not include any comments, explanations, or non-code considerations.\n"
+            "- Do not include any code block markers like ```.\n"
+            "\n"
+            "Output Format:\n"
+            "{\n"
+            "    \"architecture\": \"Description of the system architecture focused on code components, including programming language and frameworks.\",\n"
+            "    \"programming_language\": \"Programming language used (e.g., 'JavaScript', 'Java')\",\n"
+            "    \"tasks\": [\n"
+            "        {\"task_id\": 1, \"description\": \"Detailed coding task description\", \"file_path\": \"path/to/file.ext\", \"depends_on\": []},\n"
+            "        {\"task_id\": 2, \"description\": \"Detailed coding task description\", \"file_path\": \"path/to/another_file.ext\", \"depends_on\": [1]}\n"
+            "    ],\n"
+            "    \"file_structure\": [\n"
+            "        \"path/to/file.ext\",\n"
+            "        \"path/to/another_file.ext\"\n"
+            "    ]\n"
+            "}"
+        ),
+        "slots": [
+            PromptSlot("project_description", 'Project Description:\n"""{{ body }}"""', elide="head"),
+            PromptSlot("tasks", "Initial Coding Tasks:\n{{ body }}", elide="items", priority=1),
+        ],
+    },
+}
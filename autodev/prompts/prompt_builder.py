@@ -0,0 +1,204 @@
+# autodev/prompts/prompt_builder.py
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to a local approximation
+    tiktoken = None
+
+# Per-agent input token budgets; override with AUTODEV_PROMPT_BUDGET_<AGENT_NAME>
+# (e.g. AUTODEV_PROMPT_BUDGET_DEVELOPER_AGENT) or globally with AUTODEV_PROMPT_BUDGET.
+DEFAULT_TOKEN_BUDGETS: Dict[str, int] = {
+    "task_decomposer_agent": 8000,
+    "solution_architect_agent": 24000,
+    "developer_agent": 8000,
+    "testing_agent": 24000,
+}
+FALLBACK_TOKEN_BUDGET = 16000
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        _encoding = tiktoken.get_encoding("o200k_base")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens locally with tiktoken, or approximate them when it is not installed.
+
+    The approximation counts words and punctuation marks, splitting long
+    words into four-character pieces, which tracks BPE counts for code and
+    English prose closely enough for budgeting.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """Shorten ``text`` to at most ``max_tokens`` tokens, keeping its head or its tail."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        kept = tokens[:max_tokens] if keep == "head" else tokens[-max_tokens:]
+        return encoding.decode(kept)
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Binary search on character length; deterministic for a given input.
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        candidate = text[:mid] if keep == "head" else text[-mid:]
+        if count_tokens(candidate) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] if keep == "head" else text[len(text) - low:]
+
+
+def compact_json(value: Any) -> str:
+    """Serialize structured prompt input as minified JSON."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def get_token_budget(agent_name: str) -> int:
+    for variable in (f"AUTODEV_PROMPT_BUDGET_{agent_name.upper()}", "AUTODEV_PROMPT_BUDGET"):
+        if os.getenv(variable):
+            return int(os.getenv(variable))
+    return DEFAULT_TOKEN_BUDGETS.get(agent_name, FALLBACK_TOKEN_BUDGET)
+
+
+@dataclass
+class PromptSection:
+    name: str
+    body: str = ""
+    prefix: str = ""
+    suffix: str = ""
+    # Higher priority sections are shrunk last; None marks a section that is never shrunk.
+    priority: Optional[int] = None
+    # "head" keeps the start, "middle" keeps both ends, "items" drops trailing list items.
+    strategy: str = "head"
+    items: List[str] = field(default_factory=list)
+
+    def render(self, body: Optional[str] = None) -> str:
+        return f"{self.prefix}{self.body if body is None else body}{self.suffix}"
+
+
+class PromptBuilder:
+    """Assemble a prompt from sections and fit it into a token budget.
+
+    When the prompt is over budget, elidable sections are shrunk in order of
+    ascending priority (later sections first on ties) until it fits, and each
+    cut is marked in the text so the model knows content was omitted.
+    """
+
+    def __init__(self, budget: int, separator: str = "\n\n"):
+        self.budget = budget
+        self.separator = separator
+        self.sections: List[PromptSection] = []
+
+    def add(self, body: str, name: str = "", prefix: str = "", suffix: str = "") -> "PromptBuilder":
+        name = name or f"section{len(self.sections)}"
+        self.sections.append(PromptSection(name, body, prefix, suffix))
+        return self
+
+    def add_elidable(
+        self,
+        name: str,
+        body: str,
+        priority: int = 0,
+        strategy: str = "head",
+        prefix: str = "",
+        suffix: str = "",
+    ) -> "PromptBuilder":
+        self.sections.append(PromptSection(name, body, prefix, suffix, priority, strategy))
+        return self
+
+    def add_items(
+        self,
+        name: str,
+        items: List[Any],
+        priority: int = 0,
+        prefix: str = "",
+        suffix: str = "",
+    ) -> "PromptBuilder":
+        """Add a JSON array rendered compactly, one item per line; trailing items are elided first."""
+        encoded = [compact_json(item) for item in items]
+        section = PromptSection(name, "", prefix, suffix, priority, "items", encoded)
+        section.body = self._render_items(encoded, 0)
+        self.sections.append(section)
+        return self
+
+    @staticmethod
+    def _render_items(items: List[str], omitted: int) -> str:
+        body = "[\n" + ",\n".join(items) + "\n]"
+        if omitted:
+            body += f"\n[... {omitted} more items omitted to fit the token budget ...]"
+        return body
+
+    def _rendered(self, bodies: Dict[int, str]) -> str:
+        return self.separator.join(
+            section.render(bodies.get(index)) for index, section in enumerate(self.sections)
+        )
+
+    def _shrink(self, section: PromptSection, max_tokens: int) -> str:
+        if section.strategy == "items":
+            kept = list(section.items)
+            rendered = self._render_items(kept, 0)
+            while kept and count_tokens(rendered) > max_tokens:
+                kept.pop()
+                rendered = self._render_items(kept, len(section.items) - len(kept))
+            return rendered
+        total = count_tokens(section.body)
+        marker = f"\n[... {total - max_tokens} tokens elided to fit the token budget ...]\n"
+        room = max(0, max_tokens - count_tokens(marker))
+        if section.strategy == "middle":
+            head = truncate_to_tokens(section.body, room - room // 2, keep="head")
+            tail = truncate_to_tokens(section.body, room // 2, keep="tail")
+            return f"{head}{marker}{tail}"
+        return f"{truncate_to_tokens(section.body, room, keep='head')}{marker}"
+
+    def build(self) -> str:
+        bodies: Dict[int, str] = {}
+        prompt = self._rendered(bodies)
+        total = count_tokens(prompt)
+        if total <= self.budget:
+            return prompt
+
+        order = sorted(
+            (index for index, section in enumerate(self.sections) if section.priority is not None),
+            key=lambda index: (self.sections[index].priority, -index),
+        )
+        for index in order:
+            section = self.sections[index]
+            excess = total - self.budget
+            if excess <= 0:
+                break
+            section_tokens = count_tokens(section.body)
+            bodies[index] = self._shrink(section, max(0, section_tokens - excess))
+            prompt = self._rendered(bodies)
+            total = count_tokens(prompt)
+            logger.info(
+                f"Elided prompt section '{section.name}' from {section_tokens} tokens "
+                f"to fit budget of {self.budget} (now {total})."
+            )
+        if total > self.budget:
+            logger.warning(f"Prompt is {total} tokens, over the budget of {self.budget} tokens.")
+        return prompt
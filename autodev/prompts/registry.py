@@ -0,0 +1,141 @@
+# autodev/prompts/registry.py
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import jinja2
+
+from .prompt_builder import PromptBuilder, count_tokens, get_token_budget
+
+logger = logging.getLogger(__name__)
+
+_BODY_MARKER = "\x00body\x00"
+
+
+@dataclass
+class PromptSlot:
+    """A variable section rendered after a template's static prefix.
+
+    ``template`` is Jinja source. If ``elide`` is set the slot's ``body``
+    variable may be shrunk to fit the token budget ("head", "middle", or
+    "items" for a list rendered as compact JSON). An ``optional`` slot is
+    left out when its variable is empty or not given.
+    """
+
+    name: str
+    template: str
+    elide: Optional[str] = None
+    priority: int = 0
+    optional: bool = False
+
+
+@dataclass
+class CompiledPrompt:
+    name: str
+    static_prefix: str
+    slots: List[PromptSlot]
+    compiled: List[jinja2.Template] = field(default_factory=list)
+    budget_key: Optional[str] = None
+
+    @property
+    def cacheable_prefix_length(self) -> int:
+        """Length in characters of the byte-identical prefix shared by every render."""
+        return len(self.static_prefix)
+
+    @property
+    def cacheable_prefix_tokens(self) -> int:
+        return count_tokens(self.static_prefix)
+
+    def render(self, budget: Optional[int] = None, **variables: Any) -> str:
+        if budget is None:
+            budget = get_token_budget(self.budget_key or self.name)
+        builder = PromptBuilder(budget)
+        builder.add(self.static_prefix, name="static_prefix")
+        for slot, template in zip(self.slots, self.compiled):
+            if slot.optional and not variables.get(slot.name):
+                continue
+            if slot.elide is None:
+                builder.add(template.render(**variables), name=slot.name)
+                continue
+            # Render the slot around a marker so only the body is elided.
+            prefix, _, suffix = template.render(**variables, body=_BODY_MARKER).partition(_BODY_MARKER)
+            body = variables[slot.name]
+            if slot.elide == "items":
+                builder.add_items(slot.name, body, slot.priority, prefix=prefix, suffix=suffix)
+            else:
+                builder.add_elidable(slot.name, body, slot.priority, slot.elide, prefix, suffix)
+        return builder.build()
+
+
+class PromptRegistry:
+    """Precompiled agent prompt templates, looked up by name in O(1).
+
+    Every template starts with a static prefix that is identical across
+    renders, followed by its variable slots, so providers with prompt
+    prefix caching can reuse the shared part across a run.
+    """
+
+    def __init__(self):
+        self._env = jinja2.Environment(
+            undefined=jinja2.StrictUndefined,
+            autoescape=False,
+            keep_trailing_newline=False,
+        )
+        self._templates: Dict[str, CompiledPrompt] = {}
+
+    def register(
+        self,
+        name: str,
+        static_prefix: str,
+        slots: List[PromptSlot],
+        budget_key: Optional[str] = None,
+    ) -> CompiledPrompt:
+        compiled = CompiledPrompt(
+            name=name,
+            static_prefix=static_prefix,
+            slots=slots,
+            compiled=[self._env.from_string(slot.template) for slot in slots],
+            budget_key=budget_key,
+        )
+        self._templates[name] = compiled
+        return compiled
+
+    def get(self, name: str) -> CompiledPrompt:
+        return self._templates[name]
+
+    def render(self, name: str, budget: Optional[int] = None, **variables: Any) -> str:
+        return self._templates[name].render(budget=budget, **variables)
+
+    def prefix_report(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {
+                "cacheable_prefix_chars": template.cacheable_prefix_length,
+                "cacheable_prefix_tokens": template.cacheable_prefix_tokens,
+            }
+            for name, template in self._templates.items()
+        }
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> PromptRegistry:
+    """Return the shared registry of agent templates, compiling it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from .agent_prompts import PROMPT_TEMPLATES
+
+                registry = PromptRegistry()
+                for name, definition in PROMPT_TEMPLATES.items():
+                    registry.register(name, **definition)
+                _registry = registry
+    return _registry
+
+
+def render_prompt(name: str, budget: Optional[int] = None, **variables: Any) -> str:
+    return get_registry().render(name, budget=budget, **variables)
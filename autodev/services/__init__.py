@@ -1,4 +1,24 @@
-from .github_service import GitHubService
-from .llm_service import call_llm
+import importlib
 
-__all__ = ["GitHubService", "call_llm"]
+# Submodules are imported on first attribute access so that importing the
+# package does not pull in PyGithub or the LLM SDKs.
+_EXPORTS = {
+    "GitHubService": ".github_service",
+    "LLMRequestError": ".llm_service",
+    "acall_llm": ".llm_service",
+    "call_llm": ".llm_service",
+}
+
+__all__ = ["GitHubService", "LLMRequestError", "acall_llm", "call_llm"]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
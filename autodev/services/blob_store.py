@@ -0,0 +1,118 @@
+# autodev/services/blob_store.py
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import shutil
+import threading
+from typing import Dict, Optional, Union
+
+from autodev.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = os.path.join(".autodev", "blobs")
+REF_PREFIX = "sha256:"
+_REF = re.compile(r"^sha256:([0-9a-f]{64})$")
+_CHUNK_SIZE = 1 << 20
+
+
+def is_blob_ref(value: object) -> bool:
+    return isinstance(value, str) and _REF.match(value) is not None
+
+
+def file_ref(path: str) -> Optional[str]:
+    """The blob reference ``path``'s content would get, or None if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as blob_file:
+            for chunk in iter(lambda: blob_file.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return REF_PREFIX + digest.hexdigest()
+
+
+class BlobStore:
+    """Content-addressed files for generated code and tests.
+
+    Each artifact is written once to ``<root>/<aa>/<sha256>`` and passed
+    around as a ``sha256:<hex>`` reference, so the context and the task
+    results stay small however large the project gets. Content is loaded
+    through mmap only when an agent needs it. Writes go to a temporary file
+    and are renamed into place, so concurrent writers of the same content
+    are safe.
+    """
+
+    _instances: Dict[str, "BlobStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @classmethod
+    def open(cls, root: str) -> "BlobStore":
+        key = os.path.realpath(root)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(root)
+            return cls._instances[key]
+
+    @classmethod
+    def for_project(cls, project_dir: str) -> "BlobStore":
+        return cls.open(os.path.join(project_dir, BLOB_DIR))
+
+    def path(self, ref: str) -> str:
+        match = _REF.match(ref or "")
+        if match is None:
+            raise ValueError(f"Not a blob reference: {ref!r}")
+        digest = match.group(1)
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, ref: str) -> bool:
+        return os.path.isfile(self.path(ref))
+
+    def size(self, ref: str) -> int:
+        return os.path.getsize(self.path(ref))
+
+    def put(self, content: Union[str, bytes]) -> str:
+        """Store ``content`` (text is UTF-8 encoded) and return its reference."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        ref = REF_PREFIX + hashlib.sha256(data).hexdigest()
+        path = self.path(ref)
+        if os.path.isfile(path):
+            return ref
+        tmp_path = self._tmp_path(path)
+        with span("write", "file", path=path), open(tmp_path, "wb") as blob_file:
+            blob_file.write(data)
+        os.replace(tmp_path, path)
+        return ref
+
+    def put_file(self, source: str) -> str:
+        """Copy the file at ``source`` into the store in chunks and return its reference."""
+        ref = file_ref(source)
+        if ref is None:
+            raise FileNotFoundError(source)
+        path = self.path(ref)
+        if os.path.isfile(path):
+            return ref
+        tmp_path = self._tmp_path(path)
+        with span("write", "file", path=path):
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        return ref
+
+    def read(self, ref: str) -> str:
+        """The text of ``ref``, decoded straight from a read-only memory map."""
+        with open(self.path(ref), "rb") as blob_file:
+            if os.fstat(blob_file.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return str(view, "utf-8")
+
+    def _tmp_path(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
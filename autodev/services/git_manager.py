@@ -1,30 +1,130 @@
 # autodev/services/git_manager.py
 
+import atexit
 import os
+import stat
 import subprocess
+import threading
 import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from autodev.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
+class GitCatFile:
+    """A persistent ``git cat-file --batch`` process answering object queries."""
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+    def read(self, rev: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return ``(sha, type, content)`` for ``rev``, or ``None`` if it does not exist."""
+        with self._lock, span("git cat-file", "git", rev=rev):
+            process = self._ensure_process()
+            process.stdin.write(rev.encode("utf-8") + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline().decode("utf-8").rstrip("\n")
+            if not header or header.endswith(" missing") or header.endswith(" ambiguous"):
+                return None
+            sha, object_type, size = header.split(" ")
+            content = process.stdout.read(int(size))
+            process.stdout.read(1)  # trailing LF
+            return sha, object_type, content
+
+    def close(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.stdin.close()
+                self._process.wait()
+            self._process = None
+
+
 class GitManagerService:
+    _instances: Dict[str, "GitManagerService"] = {}
+    _instances_lock = threading.Lock()
+
     def __init__(self, repo_path: str):
         self.repo_path = repo_path
+        self._remotes: Optional[List[str]] = None
+        self._branch_ref: Optional[str] = None
+        self._cat_file = GitCatFile(repo_path)
+        self._lock = threading.RLock()
         os.makedirs(self.repo_path, exist_ok=True)
         if not self.is_git_repository():
             self.init_repo()
 
+    @classmethod
+    def for_repo(cls, repo_path: str) -> "GitManagerService":
+        """Return the shared service for ``repo_path``, creating it on first use."""
+        key = os.path.realpath(repo_path)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None or not instance.is_git_repository():
+                instance = cls(repo_path)
+                cls._instances[key] = instance
+            return instance
+
+    @classmethod
+    def close_all(cls):
+        with cls._instances_lock:
+            for instance in cls._instances.values():
+                instance.close()
+            cls._instances.clear()
+
+    def close(self):
+        self._cat_file.close()
+
+    def invalidate(self):
+        """Drop cached remote and branch state after a mutation."""
+        self._remotes = None
+        self._branch_ref = None
+
     def is_git_repository(self) -> bool:
         return os.path.isdir(os.path.join(self.repo_path, ".git"))
 
     def init_repo(self):
         logger.info(f"Initializing new Git repository at {self.repo_path}")
         self.run_git_command(["init"])
+        self.invalidate()
+
+    def remotes(self) -> List[str]:
+        if self._remotes is None:
+            result = self.run_git_command(["remote"], capture_output=True)
+            self._remotes = result.stdout.split()
+        return self._remotes
 
     def has_remote(self) -> bool:
-        result = self.run_git_command(["remote"], capture_output=True)
-        remotes = result.stdout.strip()
-        return bool(remotes)
+        return bool(self.remotes())
+
+    def branch_ref(self) -> str:
+        """Full ref name of the checked-out branch (e.g. ``refs/heads/main``)."""
+        if self._branch_ref is None:
+            self._branch_ref = self._git_output(["symbolic-ref", "-q", "HEAD"]).strip()
+        return self._branch_ref
+
+    def rev_parse(self, rev: str) -> Optional[str]:
+        """Resolve ``rev`` to an object id through the persistent cat-file channel."""
+        obj = self._cat_file.read(rev)
+        return obj[0] if obj else None
+
+    def read_object(self, rev: str) -> Optional[bytes]:
+        obj = self._cat_file.read(rev)
+        return obj[2] if obj else None
 
     def pull(self):
         if self.has_remote():
@@ -39,11 +139,155 @@ class GitManagerService:
 
     def commit(self, message: str):
         logger.info(f"Committing changes with message: {message}")
-        status = self.run_git_command(["status", "--porcelain"], capture_output=True)
-        if status.stdout.strip():
-            self.run_git_command(["commit", "-m", message], check=False)
-        else:
+        with self._lock:
+            # Exit status 0: the index matches HEAD; 1: there is something to commit.
+            result = self.run_git_command(["diff", "--cached", "--quiet"], capture_output=True, check=False)
+            if result.returncode == 0:
+                logger.info("Nothing to commit.")
+                return
+            if result.returncode == 1:
+                result = self.run_git_command(
+                    ["commit", "-q", "-m", message], capture_output=True, check=False
+                )
+        if result.returncode != 0:
+            logger.error(f"Failed to commit '{message}': {result.stderr.strip()}")
+
+    def commit_batch(
+        self,
+        commits: Sequence[Tuple[str, Sequence[str]]],
+        per_commit: bool = True,
+        squash_message: Optional[str] = None,
+    ) -> int:
+        """Commit many files with a fixed number of git processes.
+
+        ``commits`` is a list of ``(message, paths)`` pairs. With ``per_commit``
+        each pair becomes its own commit, preserving per-task history;
+        otherwise everything lands in one commit titled ``squash_message``.
+        Blobs are written with ``hash-object --stdin-paths`` and the commits are
+        streamed through ``fast-import``, so the cost no longer grows with the
+        number of files. Files whose content matches ``HEAD`` are skipped, and
+        commits left empty are dropped. Returns the number of commits created.
+        """
+        with self._lock:
+            return self._commit_batch(commits, per_commit, squash_message)
+
+    def _commit_batch(
+        self,
+        commits: Sequence[Tuple[str, Sequence[str]]],
+        per_commit: bool,
+        squash_message: Optional[str],
+    ) -> int:
+        groups = [
+            (message, [self._repo_relative(path) for path in paths])
+            for message, paths in commits
+            if paths
+        ]
+        if not per_commit and groups:
+            squash_message = squash_message or "\n".join(message for message, _ in groups)
+            groups = [(squash_message, [path for _, paths in groups for path in paths])]
+
+        all_paths = sorted({path for _, paths in groups for path in paths})
+        existing = [path for path in all_paths if os.path.isfile(os.path.join(self.repo_path, path))]
+        if not existing:
+            logger.info("Nothing to commit.")
+            return 0
+
+        branch_ref = self.branch_ref()
+        hashed = self._git_output(
+            ["hash-object", "-w", "--stdin-paths"], input_text="\n".join(existing) + "\n"
+        )
+        blobs = dict(zip(existing, hashed.split()))
+
+        head = self.rev_parse("HEAD")
+        head_tree = self._ls_tree(f"{head}^{{tree}}") if head else {}
+        committer = self._git_output(["var", "GIT_COMMITTER_IDENT"]).strip()
+
+        stream: List[str] = []
+        created = 0
+        tree = dict(head_tree)
+        for message, paths in groups:
+            changes = []
+            for path in dict.fromkeys(paths):
+                blob = blobs.get(path)
+                if blob is None:
+                    if path in tree:
+                        changes.append(f"D {self._quote_path(path)}")
+                        del tree[path]
+                    continue
+                mode = self._file_mode(path)
+                if tree.get(path) == (mode, blob):
+                    continue
+                changes.append(f"M {mode} {blob} {self._quote_path(path)}")
+                tree[path] = (mode, blob)
+            if not changes:
+                logger.info(f"Nothing to commit for: {message}")
+                continue
+            encoded = message.encode("utf-8")
+            stream.append(f"commit {branch_ref}")
+            stream.append(f"committer {committer}")
+            stream.append(f"data {len(encoded)}")
+            stream.append(message)
+            if created == 0 and head:
+                stream.append(f"from {head}")
+            stream.extend(changes)
+            stream.append("")
+            created += 1
+
+        if not created:
             logger.info("Nothing to commit.")
+            return 0
+
+        logger.info(f"Committing {len(existing)} files in {created} commit(s) via fast-import.")
+        stream.append("done")
+        self.run_git_command(
+            ["fast-import", "--quiet", "--done"],
+            input_text="\n".join(stream) + "\n",
+        )
+        # fast-import only moves the ref; bring the index in line with the new HEAD.
+        self.run_git_command(["reset", "-q"])
+        self.invalidate()
+        return created
+
+    def _repo_relative(self, path: str) -> str:
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.repo_path)
+        return os.path.normpath(path).replace(os.sep, "/")
+
+    def _file_mode(self, path: str) -> str:
+        st_mode = os.stat(os.path.join(self.repo_path, path)).st_mode
+        return "100755" if st_mode & stat.S_IXUSR else "100644"
+
+    def _ls_tree(self, tree: str, prefix: str = "") -> Dict[str, Tuple[str, str]]:
+        """Recursively list blobs under ``tree`` by reading tree objects via cat-file."""
+        entries: Dict[str, Tuple[str, str]] = {}
+        content = self.read_object(tree) or b""
+        pos = 0
+        while pos < len(content):
+            space = content.index(b" ", pos)
+            nul = content.index(b"\0", space)
+            mode = content[pos:space].decode("ascii")
+            name = content[space + 1:nul].decode("utf-8", "surrogateescape")
+            sha = content[nul + 1:nul + 21].hex()
+            pos = nul + 21
+            path = f"{prefix}{name}"
+            if mode == "40000":
+                entries.update(self._ls_tree(sha, f"{path}/"))
+            else:
+                entries[path] = (mode.rjust(6, "0"), sha)
+        return entries
+
+    def _git_output(self, command_list, input_text=None) -> str:
+        result = self.run_git_command(command_list, capture_output=True, input_text=input_text)
+        if isinstance(result, subprocess.CalledProcessError):
+            raise result
+        return result.stdout
+
+    @staticmethod
+    def _quote_path(path: str) -> str:
+        if path.startswith('"') or "\n" in path or "\\" in path:
+            escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return f'"{escaped}"'
+        return path
 
     def push(self, remote_name: str = "origin", branch_name: str = "main"):
         if self.has_remote():
@@ -55,16 +299,20 @@ class GitManagerService:
     def set_remote(self, remote_name: str, remote_url: str):
         logger.info(f"Setting remote '{remote_name}' to '{remote_url}'")
         self.run_git_command(["remote", "add", remote_name, remote_url])
+        self.invalidate()
 
-    def run_git_command(self, command_list, capture_output=False, check=True):
+    def run_git_command(self, command_list, capture_output=False, check=True, input_text=None):
         try:
-            result = subprocess.run(
-                ["git"] + command_list,
-                cwd=self.repo_path,
-                capture_output=capture_output,
-                text=True,
-                check=check,
-            )
+            with span(f"git {command_list[0]}", "git", args=" ".join(command_list)):
+                result = subprocess.run(
+                    ["git"] + command_list,
+                    cwd=self.repo_path,
+                    capture_output=capture_output,
+                    text=True,
+                    encoding="utf-8",
+                    check=check,
+                    input=input_text,
+                )
             return result
         except subprocess.CalledProcessError as e:
             logger.error(f"Git command '{' '.join(command_list)}' failed: {e}")
@@ -72,3 +320,6 @@ class GitManagerService:
                 return e
             else:
                 raise
+
+
+atexit.register(GitManagerService.close_all)
@@ -1,32 +1,145 @@
 # autodev/services/github_service.py
 
+import base64
 import os
 import logging
-from github import Github, GithubException
+import threading
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+from github import Auth, GithubException, InputGitTreeElement
+
+from autodev.core.tracing import span
+from autodev.core.utils import run_bounded
+
+from .github_transport import build_github, shared_transport
 
 logger = logging.getLogger(__name__)
 
+# Never uploaded by commit_directory.
+IGNORED_DIRS = (".git", ".autodev", "__pycache__")
+
+# Git tree modes of uploaded files.
+REGULAR_MODE = "100644"
+EXECUTABLE_MODE = "100755"
+
+# Login of each (API URL, token) already authenticated in this process.
+_logins: Dict[Tuple[str, str], str] = {}
+_logins_lock = threading.Lock()
+
+
+@dataclass
+class GitHubSettings:
+    token: Optional[str] = None
+    base_url: str = "https://api.github.com"
+    # Concurrent blob uploads (and HTTP connections) per commit_files call.
+    max_workers: int = 8
+    # PyGithub paces requests by default (1 s between writes), which would
+    # serialize blob uploads; GitHub's secondary rate limits are still
+    # retried by PyGithub when hit.
+    seconds_between_requests: float = 0.0
+    seconds_between_writes: float = 0.0
+    timeout: int = 15
+    # Conditional-request cache for GETs, shared by all services using one token.
+    etag_cache_bytes: int = 32 * 1024 * 1024
+    # Requests kept in reserve, and the share of the hourly quota below which
+    # requests are spread out until the reset.
+    rate_limit_reserve: int = 100
+    rate_limit_pace_below: float = 0.1
+    rate_limit_max_wait: float = 3600.0
+
+    @classmethod
+    def from_env(cls) -> "GitHubSettings":
+        return cls(
+            token=os.getenv("GITHUB_TOKEN"),
+            base_url=os.getenv("GITHUB_API_URL", cls.base_url),
+            max_workers=int(os.getenv("GITHUB_MAX_WORKERS", cls.max_workers)),
+            seconds_between_requests=float(
+                os.getenv("GITHUB_SECONDS_BETWEEN_REQUESTS", cls.seconds_between_requests)
+            ),
+            seconds_between_writes=float(
+                os.getenv("GITHUB_SECONDS_BETWEEN_WRITES", cls.seconds_between_writes)
+            ),
+            timeout=int(os.getenv("GITHUB_TIMEOUT", cls.timeout)),
+            etag_cache_bytes=int(os.getenv("GITHUB_ETAG_CACHE_BYTES", cls.etag_cache_bytes)),
+            rate_limit_reserve=int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", cls.rate_limit_reserve)),
+            rate_limit_pace_below=float(
+                os.getenv("GITHUB_RATE_LIMIT_PACE_BELOW", cls.rate_limit_pace_below)
+            ),
+            rate_limit_max_wait=float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", cls.rate_limit_max_wait)),
+        )
+
 
 class GitHubService:
-    def __init__(self):
-        self.token = os.getenv("GITHUB_TOKEN")
+    def __init__(self, settings: Optional[GitHubSettings] = None):
+        self.settings = settings or GitHubSettings.from_env()
+        self.token = self.settings.token
         if not self.token:
             logger.error("GITHUB_TOKEN environment variable not set.")
             raise ValueError("GITHUB_TOKEN environment variable not set.")
-        self.github = Github(self.token)
+        self.cache, self.budget = shared_transport(
+            self.settings.base_url,
+            self.token,
+            self.settings.etag_cache_bytes,
+            self.settings.rate_limit_reserve,
+            self.settings.rate_limit_pace_below,
+            self.settings.rate_limit_max_wait,
+        )
+        self.github = build_github(
+            self.cache,
+            self.budget,
+            auth=Auth.Token(self.token),
+            base_url=self.settings.base_url,
+            timeout=self.settings.timeout,
+            pool_size=max(1, self.settings.max_workers),
+            seconds_between_requests=self.settings.seconds_between_requests or None,
+            seconds_between_writes=self.settings.seconds_between_writes or None,
+        )
+        self._repos: Dict[str, object] = {}
+        self._repos_lock = threading.Lock()
+        # get_user() makes no request; the login is fetched once per process and token.
+        self.user = self.github.get_user()
+        self.login = self._authenticate()
+
+    def _authenticate(self) -> str:
+        """The token's login, fetched once per process and token."""
+        key = (self.settings.base_url, self.token)
+        with _logins_lock:
+            login = _logins.get(key)
+        if login is not None:
+            return login
         try:
-            self.user = self.github.get_user()
-            logger.info(f"Authenticated with GitHub as {self.user.login}")
+            login = self.user.login
         except GithubException as e:
             logger.error(f"Failed to authenticate with GitHub: {e}")
             raise
+        logger.info(f"Authenticated with GitHub as {login}")
+        with _logins_lock:
+            _logins[key] = login
+        return login
+
+    def rate_limit(self) -> Dict[str, Dict[str, float]]:
+        """Quota last reported by GitHub per resource, without spending a request."""
+        return self.budget.stats()
+
+    def get_repository(self, repo_name: str):
+        """The user's repository ``repo_name``, fetched once and then reused."""
+        with self._repos_lock:
+            repo = self._repos.get(repo_name)
+        if repo is None:
+            repo = self.github.get_repo(f"{self.login}/{repo_name}")
+            with self._repos_lock:
+                repo = self._repos.setdefault(repo_name, repo)
+        return repo
 
     def create_repository(self, repo_name: str, private: bool = True) -> None:
-        if self.repository_exists(repo_name):
-            logger.warning(f"Repository '{repo_name}' already exists.")
-            return
         try:
+            if self.repository_exists(repo_name):
+                logger.warning(f"Repository '{repo_name}' already exists.")
+                return
             repo = self.user.create_repo(name=repo_name, private=private)
+            with self._repos_lock:
+                self._repos[repo_name] = repo
             logger.info(f"Repository '{repo_name}' created.")
         except GithubException as e:
             logger.error(f"Failed to create repository '{repo_name}': {e}")
@@ -38,41 +151,161 @@ class GitHubService:
         content: str,
         commit_message: str = "Initial commit",
     ) -> None:
+        self.commit_files(repo_name, {file_path: content}, commit_message)
+
+    def commit_files(
+        self,
+        repo_name: str,
+        files: Mapping[str, Union[str, bytes]],
+        commit_message: str = "Initial commit",
+        branch: Optional[str] = None,
+        modes: Optional[Mapping[str, str]] = None,
+    ) -> Optional[str]:
+        """Create or update all ``files`` (path -> content) in a single commit.
+
+        Uses the Git Data API: the blobs are uploaded concurrently, then one
+        tree (based on the branch head's tree, so other files are kept), one
+        commit and one ref update are made, instead of several requests and
+        a commit per file. On a new branch the commit has no parent and the
+        branch is created. GitHub refuses Git Data writes to a repository
+        with no commits at all, so there the first file is committed through
+        the contents API and the rest on top of it. ``modes`` maps paths to
+        their git file mode (``"100755"`` for executables); other files are
+        ``"100644"``. Returns the new commit's sha, or None on failure.
+        """
+        if not files:
+            return None
+        count = len(files)
+        modes = modes or {}
         try:
-            repo = self.github.get_repo(f"{self.user.login}/{repo_name}")
-            if self.file_exists(repo, file_path):
-                logger.info(f"Updating existing file '{file_path}' in repository '{repo_name}'.")
-                file = repo.get_contents(file_path)
-                repo.update_file(
-                    path=file_path,
-                    message=commit_message,
-                    content=content,
-                    sha=file.sha,
+            repo = self.get_repository(repo_name)
+            branch = branch or repo.default_branch
+            with span("github commit_files", "github", files=count):
+                head = self._branch_head(repo, branch)
+                if head is None:
+                    files, seed_sha = self._seed_empty_repository(repo, branch, files, modes, commit_message)
+                    if not files:
+                        logger.info(f"Committed {count} files to {repo_name}@{branch} as {seed_sha[:7]}")
+                        return seed_sha
+                    head = self._branch_head(repo, branch)
+                head_ref, parents, base_tree = head
+                results = run_bounded(
+                    lambda item: self._create_blob(repo, item[1]),
+                    list(files.items()),
+                    self.settings.max_workers,
                 )
-            else:
-                repo.create_file(
-                    path=file_path,
-                    message=commit_message,
-                    content=content,
+                failed = [(item[0], error) for item, _, error in results if error is not None]
+                if failed:
+                    path, error = failed[0]
+                    raise GithubException(
+                        getattr(error, "status", 500),
+                        f"Uploading {len(failed)} of {len(files)} blobs failed; {path}: {error}",
+                        None,
+                    )
+                tree_elements = [
+                    InputGitTreeElement(path, modes.get(path, REGULAR_MODE), "blob", sha=blob_sha)
+                    for (path, _), blob_sha, _ in results
+                ]
+                tree = (
+                    repo.create_git_tree(tree_elements, base_tree)
+                    if base_tree is not None else repo.create_git_tree(tree_elements)
                 )
-            logger.info(f"Committed code to {repo_name}/{file_path}")
+                commit = repo.create_git_commit(commit_message, tree, parents)
+                if head_ref is None:
+                    repo.create_git_ref(f"refs/heads/{branch}", commit.sha)
+                else:
+                    head_ref.edit(commit.sha)
+            logger.info(f"Committed {count} files to {repo_name}@{branch} as {commit.sha[:7]}")
+            return commit.sha
         except GithubException as e:
-            logger.error(f"Failed to commit code to {repo_name}/{file_path}: {e}")
+            logger.error(f"Failed to commit {count} files to {repo_name}: {e}")
+            return None
 
-    def repository_exists(self, repo_name: str) -> bool:
+    def commit_directory(
+        self,
+        repo_name: str,
+        directory: str,
+        commit_message: str = "Initial commit",
+        branch: Optional[str] = None,
+    ) -> Optional[str]:
+        """Upload every file under ``directory`` (except VCS and AutoDev metadata) in one commit."""
+        files: Dict[str, bytes] = {}
+        modes: Dict[str, str] = {}
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if name not in IGNORED_DIRS)
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                repo_path = os.path.relpath(path, directory).replace(os.sep, "/")
+                with open(path, "rb") as project_file:
+                    files[repo_path] = project_file.read()
+                if os.access(path, os.X_OK):
+                    modes[repo_path] = EXECUTABLE_MODE
+        return self.commit_files(repo_name, files, commit_message, branch, modes)
+
+    @staticmethod
+    def _branch_head(repo, branch: str):
+        """``(ref, parents, base_tree)`` of ``branch``: ``(None, [], None)`` if the
+        branch does not exist yet, None if the repository has no commits at all.
+        """
         try:
-            self.github.get_repo(f"{self.user.login}/{repo_name}")
-            logger.debug(f"Repository '{repo_name}' exists.")
+            head_ref = repo.get_git_ref(f"heads/{branch}")
+        except GithubException as e:
+            if e.status == 409:  # "Git Repository is empty."
+                return None
+            if e.status != 404:
+                raise
+            return None, [], None
+        head = repo.get_git_commit(head_ref.object.sha)
+        return head_ref, [head], head.tree
+
+    @staticmethod
+    def _seed_empty_repository(
+        repo,
+        branch: str,
+        files: Mapping[str, Union[str, bytes]],
+        modes: Mapping[str, str],
+        commit_message: str,
+    ) -> Tuple[Dict[str, Union[str, bytes]], str]:
+        """Commit one of ``files`` through the contents API; returns the files left and the commit sha.
+
+        A file with the regular mode is preferred, as the contents API cannot
+        set the executable bit.
+        """
+        remaining = dict(files)
+        seed_path = min(remaining, key=lambda path: (modes.get(path, REGULAR_MODE) != REGULAR_MODE, path))
+        result = repo.create_file(seed_path, commit_message, remaining[seed_path], branch=branch)
+        if modes.get(seed_path, REGULAR_MODE) == REGULAR_MODE:
+            del remaining[seed_path]
+        logger.info(f"Repository '{repo.name}' was empty; committed {seed_path} to create {branch}.")
+        return remaining, result["commit"].sha
+
+    @staticmethod
+    def _create_blob(repo, content: Union[str, bytes]) -> str:
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        return repo.create_git_blob(base64.b64encode(data).decode("ascii"), "base64").sha
+
+    def _exists(self, url: str) -> bool:
+        """True if GET ``url`` succeeds, False on 404; a conditional request when repeated."""
+        status, headers, output = self.github.requester.requestJson("GET", url)
+        if status == 200:
             return True
-        except GithubException:
-            logger.debug(f"Repository '{repo_name}' does not exist.")
+        if status == 404:
             return False
+        raise GithubException(status, output, headers)
+
+    def repository_exists(self, repo_name: str) -> bool:
+        """Raises GithubException if GitHub answers with anything but 200 or 404."""
+        with self._repos_lock:
+            if repo_name in self._repos:
+                return True
+        exists = self._exists(f"/repos/{self.login}/{repo_name}")
+        logger.debug(f"Repository '{repo_name}' {'exists' if exists else 'does not exist'}.")
+        return exists
 
     def file_exists(self, repo, file_path: str) -> bool:
-        try:
-            repo.get_contents(file_path)
-            logger.debug(f"File '{file_path}' exists in repository '{repo.name}'.")
-            return True
-        except GithubException:
-            logger.debug(f"File '{file_path}' does not exist in repository '{repo.name}'.")
-            return False
+        """Raises GithubException if GitHub answers with anything but 200 or 404."""
+        exists = self._exists(f"{repo.url}/contents/{file_path}")
+        logger.debug(
+            f"File '{file_path}' {'exists' if exists else 'does not exist'} in repository '{repo.name}'."
+        )
+        return exists
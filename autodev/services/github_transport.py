@@ -0,0 +1,281 @@
+# autodev/services/github_transport.py
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Type
+
+import requests
+import requests.adapters
+from github.Requester import (
+    HTTPRequestsConnectionClass,
+    HTTPSRequestsConnectionClass,
+    RequestsResponse,
+)
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedResponse:
+    etag: str
+    content: bytes
+    headers: Dict[str, str]
+    encoding: Optional[str]
+
+
+class ETagCache:
+    """LRU cache of GET responses keyed by URL, revalidated with If-None-Match.
+
+    GitHub answers an unchanged resource with 304 Not Modified, which does
+    not count against the rate limit; the cached body is then returned as
+    if the server had sent it again.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        # Different tokens and media types can see different representations.
+        auth = hashlib.sha256(request.headers.get("Authorization", "").encode("utf-8")).hexdigest()[:16]
+        return f"{request.url} {request.headers.get('Accept', '')} {auth}"
+
+    def get(self, key: str) -> Optional[_CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        if not etag or len(response.content) > self.max_bytes:
+            return
+        entry = _CachedResponse(etag, response.content, dict(response.headers), response.encoding)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.content)
+            self._entries[key] = entry
+            self._bytes += len(entry.content)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.content)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+@dataclass
+class _Quota:
+    limit: int
+    remaining: int
+    reset: float
+    next_slot: float = 0.0
+
+
+@dataclass
+class RateLimitBudget:
+    """Spends the GitHub API quota evenly instead of running into a hard 403.
+
+    The ``x-ratelimit-*`` headers of every response update the remaining
+    quota per resource (core, search, graphql). Once less than
+    ``pace_below`` of the limit is left, requests are spaced out so the rest
+    lasts until the window resets; at ``reserve`` requests left, callers
+    wait for the reset.
+    """
+
+    reserve: int = 100
+    pace_below: float = 0.1
+    max_wait: float = 3600.0
+    _quotas: Dict[str, _Quota] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @staticmethod
+    def resource(url: str) -> str:
+        if "/search/" in url:
+            return "search"
+        if url.rstrip("/").endswith("/graphql"):
+            return "graphql"
+        return "core"
+
+    def acquire(self, resource: str) -> float:
+        """Wait, if needed, before spending one request of ``resource``; returns the seconds waited."""
+        now = time.time()
+        with self._lock:
+            quota = self._quotas.get(resource)
+            if quota is None or now >= quota.reset:
+                return 0.0
+            if quota.remaining <= self.reserve:
+                wait = quota.reset - now + 1.0
+                logger.warning(
+                    f"GitHub {resource} quota down to {quota.remaining}; waiting {wait:.0f}s for the reset."
+                )
+            elif quota.remaining <= quota.limit * self.pace_below:
+                interval = (quota.reset - now) / max(1, quota.remaining - self.reserve)
+                slot = max(now, quota.next_slot)
+                quota.next_slot = slot + interval
+                wait = slot - now
+            else:
+                wait = 0.0
+            quota.remaining -= 1
+        wait = min(wait, self.max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update(self, headers) -> None:
+        try:
+            limit = int(headers["x-ratelimit-limit"])
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        resource = headers.get("x-ratelimit-resource", "core")
+        with self._lock:
+            quota = self._quotas.get(resource)
+            if quota is None or quota.reset != reset:
+                self._quotas[resource] = _Quota(limit, remaining, reset)
+            else:
+                quota.limit, quota.remaining = limit, remaining
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                resource: {"limit": quota.limit, "remaining": quota.remaining, "reset": quota.reset}
+                for resource, quota in self._quotas.items()
+            }
+
+
+class GitHubAdapter(requests.adapters.HTTPAdapter):
+    """Transport adapter adding conditional GETs and rate-limit budgeting to every request."""
+
+    def __init__(self, cache: Optional[ETagCache], budget: Optional[RateLimitBudget], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.budget = budget
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        cached = key = None
+        if self.cache is not None and request.method == "GET":
+            key = self.cache.key(request)
+            cached = self.cache.get(key)
+            if cached is not None:
+                request.headers["If-None-Match"] = cached.etag
+        if self.budget is not None:
+            self.budget.acquire(self.budget.resource(request.url))
+        response = super().send(request, **kwargs)
+        if self.budget is not None:
+            self.budget.update(response.headers)
+        if key is None:
+            return response
+        if response.status_code == 304 and cached is not None:
+            self.cache.record(hit=True)
+            return self._from_cache(cached, request, response)
+        self.cache.record(hit=False)
+        if response.status_code == 200:
+            self.cache.put(key, response)
+        return response
+
+    @staticmethod
+    def _from_cache(
+        cached: _CachedResponse, request: requests.PreparedRequest, not_modified: requests.Response
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        # Fresh rate-limit headers from the 304 over the cached ones.
+        response.headers = CaseInsensitiveDict({**cached.headers, **not_modified.headers})
+        response._content = cached.content
+        response.encoding = cached.encoding
+        response.url = request.url
+        response.request = request
+        response.connection = not_modified.connection
+        return response
+
+
+def _connection_class(base: Type, cache: Optional[ETagCache], budget: Optional[RateLimitBudget]) -> Type:
+    class Connection(base):
+        # PyGithub shares one connection object between threads and keeps the
+        # pending request on it, so the request is kept per thread here.
+        def __init__(self, *args: Any, **kwargs: Any):
+            super().__init__(*args, **kwargs)
+            self._pending = threading.local()
+            self.adapter = GitHubAdapter(
+                cache,
+                budget,
+                max_retries=self.retry,
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size,
+            )
+            self.session.mount(f"{self.protocol}://", self.adapter)
+
+        def request(self, verb: str, url: str, input: Any, headers: Dict[str, str]) -> None:
+            self._pending.request = (verb, url, input, headers)
+
+        def getresponse(self) -> RequestsResponse:
+            verb, url, input, headers = self._pending.request
+            response = self.session.request(
+                verb,
+                f"{self.protocol}://{self.host}:{self.port}{url}",
+                headers=headers,
+                data=input,
+                timeout=self.timeout,
+                verify=self.verify,
+                allow_redirects=False,
+            )
+            return RequestsResponse(response)
+
+    return Connection
+
+
+def build_github(
+    cache: Optional[ETagCache], budget: Optional[RateLimitBudget], **github_kwargs: Any
+):
+    """A ``github.Github`` client whose HTTP connections use :class:`GitHubAdapter`.
+
+    The connection classes are set on the client's own Requester rather
+    than injected process-wide, so they apply to every connection it opens
+    over its lifetime (lazily, after a reconnect, or to another GitHub
+    host) and to no other client.
+    """
+    from github import Github
+
+    github = Github(**github_kwargs)
+    requester = github.requester
+    http_class = _connection_class(HTTPRequestsConnectionClass, cache, budget)
+    https_class = _connection_class(HTTPSRequestsConnectionClass, cache, budget)
+    # Requester reads these (name-mangled) attributes each time it connects.
+    requester._Requester__httpConnectionClass = http_class
+    requester._Requester__httpsConnectionClass = https_class
+    requester._Requester__connectionClass = https_class if requester.scheme == "https" else http_class
+    return github
+
+
+_shared: Dict[Tuple[str, str], Tuple[ETagCache, RateLimitBudget]] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_transport(
+    base_url: str, token: str, cache_bytes: int, reserve: int, pace_below: float, max_wait: float
+) -> Tuple[ETagCache, RateLimitBudget]:
+    """The cache and quota budget of one token, shared by every GitHubService in the process."""
+    key = (base_url, hashlib.sha256(token.encode("utf-8")).hexdigest())
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = (ETagCache(cache_bytes), RateLimitBudget(reserve, pace_below, max_wait))
+        return _shared[key]
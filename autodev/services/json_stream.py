@@ -0,0 +1,232 @@
+# autodev/services/json_stream.py
+
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\r\n"
+
+
+class MissingJSONError(json.JSONDecodeError):
+    """The response ended without the JSON document ever starting."""
+
+
+class JSONStreamParser:
+    """Incrementally parse the JSON document in a streamed LLM response.
+
+    Text before the document (prose, an opening code fence) is skipped
+    and anything after it is ignored, so no regex pass over the whole
+    response is needed. With ``items=None`` the document is an array of
+    objects; with ``items="tasks"`` it is an object whose ``"tasks"``
+    member is that array. :meth:`feed` returns the array's elements as
+    soon as they are complete, and an object's other members appear in
+    :attr:`members` as they finish. Each character is scanned once and
+    only the value still being written is buffered.
+    """
+
+    def __init__(self, items: Optional[str] = None):
+        self.items = items
+        self.members: Dict[str, Any] = {}
+        self.elements: List[Any] = []
+        self.done = False
+        # Depth of the element array: the root itself, or a member of the root object.
+        self._items_depth = 2 if items else 1
+        self._buffer = ""
+        self._pos = 0
+        self._found = False
+        self._confirmed = False
+        # Lookahead past the candidate root's bracket, and how much of its expected opening matched.
+        self._probe = 0
+        self._matched = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._last_string: Optional[str] = None
+        self._member_start: Optional[int] = None
+        self._in_items = False
+        self._item_start: Optional[int] = None
+        self._item_container = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume ``chunk`` and return the array elements it completed."""
+        if self.done or not chunk:
+            return []
+        self._buffer += chunk
+        completed: List[Any] = []
+        while self._pos < len(self._buffer) and not self.done:
+            if not self._found:
+                self._find_root()
+            elif not self._confirmed:
+                if not self._confirm_root():
+                    break
+            else:
+                self._scan(completed)
+        self._trim()
+        return completed
+
+    def finish(self) -> Any:
+        """The whole document; raises ``json.JSONDecodeError`` if it was not completed."""
+        kind = "object" if self.items else "array"
+        if not self._confirmed:
+            raise MissingJSONError(f"No JSON {kind} in response", self._buffer, self._pos)
+        if not self.done:
+            raise json.JSONDecodeError(f"Unterminated JSON {kind} in response", self._buffer, self._pos)
+        return self.members if self.items else self.elements
+
+    def _find_root(self) -> None:
+        start = self._buffer.find("{" if self.items else "[", self._pos)
+        if start == -1:
+            self._pos = len(self._buffer)
+            return
+        self._found = True
+        self._pos = start + 1
+        self._probe = 0
+        self._matched = 0
+
+    def _confirm_root(self) -> bool:
+        """Accept or reject the candidate root; False if more text is needed to tell.
+
+        A bracket in prose ("[in order]", "{as requested}") is not the
+        document: it must open an object that starts with a key, inside
+        the array unless the object is the root itself. The text is only
+        looked at here; on a rejection the search resumes right after the
+        rejected bracket.
+        """
+        expected = ('"',) if self.items else ("{", '"')
+        text = self._buffer
+        pos = self._pos + self._probe
+        while pos < len(text) and self._matched < len(expected):
+            char = text[pos]
+            if char not in _WHITESPACE:
+                if char not in expected[self._matched]:
+                    self._found = False
+                    return True
+                self._matched += 1
+            pos += 1
+        self._probe = pos - self._pos
+        if self._matched < len(expected):
+            return False
+        self._confirmed = True
+        self._in_items = not self.items
+        self._stack.append("{" if self.items else "[")
+        return True
+
+    def _scan(self, completed: List[Any]) -> None:
+        text = self._buffer
+        pos = self._pos
+        end = len(text)
+        stack = self._stack
+        while pos < end:
+            char = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self.items and len(stack) == 1 and self._member_start is None:
+                        self._last_string = json.loads(text[self._string_start:pos + 1])
+                pos += 1
+                continue
+            if char in _WHITESPACE:
+                pos += 1
+                continue
+            depth = len(stack)
+            if char in ",]}":
+                if self._in_items and depth == self._items_depth and self._item_start is not None \
+                        and not self._item_container:
+                    self._element_done(text[self._item_start:pos], completed)
+                if char != ",":
+                    stack.pop()
+                    depth -= 1
+                    if self._in_items and depth == self._items_depth and self._item_start is not None:
+                        self._element_done(text[self._item_start:pos + 1], completed)
+                    elif self._in_items and depth == self._items_depth - 1:
+                        # The element array itself is closed.
+                        if self.items:
+                            self.members[self.items] = self.elements
+                        self._in_items = False
+                if self.items and depth == 1 and char == ",":
+                    self._member_done(text, pos)
+                elif depth == 0:
+                    if self.items:
+                        self._member_done(text, pos)
+                    self.done = True
+                    pos += 1
+                    break
+            elif char == ":":
+                if self.items and depth == 1:
+                    self._key = self._last_string
+                    self._last_string = None
+            else:
+                # The first character of a value: an object, array, string or literal.
+                if self.items and depth == 1 and self._key is not None and self._member_start is None:
+                    self._member_start = pos
+                    self._in_items = char == "[" and self._key == self.items
+                    if self._in_items:
+                        # Elements are parsed one by one; the array is never buffered whole.
+                        self._member_start = None
+                        self.elements = []
+                elif self._in_items and depth == self._items_depth and self._item_start is None:
+                    self._item_start = pos
+                    self._item_container = char in "[{"
+                if char in "[{":
+                    stack.append(char)
+                elif char == '"':
+                    self._in_string = True
+                    self._string_start = pos
+            pos += 1
+        self._pos = pos
+
+    def _element_done(self, raw: str, completed: List[Any]) -> None:
+        element = json.loads(raw)
+        self.elements.append(element)
+        completed.append(element)
+        self._item_start = None
+
+    def _member_done(self, text: str, end: int) -> None:
+        """Record the top-level member ending before ``end`` (a ``,`` or the closing brace)."""
+        if self._key is not None and self._member_start is not None:
+            self.members[self._key] = json.loads(text[self._member_start:end])
+        self._key = None
+        self._member_start = None
+
+    def _trim(self) -> None:
+        """Drop the text that no pending value still needs."""
+        starts = [self._pos]
+        for start in (self._member_start, self._item_start):
+            if start is not None:
+                starts.append(start)
+        if self._in_string:
+            starts.append(self._string_start)
+        keep = min(starts)
+        if keep == 0:
+            return
+        self._buffer = self._buffer[keep:]
+        self._pos -= keep
+        self._string_start -= keep
+        if self._member_start is not None:
+            self._member_start -= keep
+        if self._item_start is not None:
+            self._item_start -= keep
+
+
+def parse_json_stream(
+    chunks: Iterable[str],
+    items: Optional[str] = None,
+    on_item: Optional[Callable[[Any, JSONStreamParser], None]] = None,
+) -> Any:
+    """Parse the JSON document in streamed ``chunks``, calling ``on_item(element, parser)`` as elements complete."""
+    parser = JSONStreamParser(items)
+    for chunk in chunks:
+        for element in parser.feed(chunk):
+            if on_item is not None:
+                on_item(element, parser)
+        if parser.done:
+            break
+    return parser.finish()
@@ -0,0 +1,192 @@
+# autodev/services/llm_hedge.py
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HedgeSettings:
+    enabled: bool = False
+    # Hedge once a request has outlived this percentile of recent latencies.
+    percentile: float = 0.95
+    # Hedges allowed per request sent, e.g. 0.1 caps extra spend at about 10%.
+    budget_ratio: float = 0.1
+    budget_burst: float = 5.0
+    min_samples: int = 20
+    window: int = 200
+    min_delay: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "HedgeSettings":
+        return cls(
+            enabled=os.getenv("AUTODEV_LLM_HEDGE", "false").lower() in ("1", "true", "yes"),
+            percentile=float(os.getenv("AUTODEV_LLM_HEDGE_PERCENTILE", cls.percentile)),
+            budget_ratio=float(os.getenv("AUTODEV_LLM_HEDGE_BUDGET", cls.budget_ratio)),
+            min_samples=int(os.getenv("AUTODEV_LLM_HEDGE_MIN_SAMPLES", cls.min_samples)),
+            min_delay=float(os.getenv("AUTODEV_LLM_HEDGE_MIN_DELAY", cls.min_delay)),
+        )
+
+
+class LatencyTracker:
+    """Rolling window of completed request latencies per key (usually the model)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class HedgeBudget:
+    """Each request earns ``ratio`` of a hedge, up to ``burst``; a hedge spends one."""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.credits = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self.credits = min(self.burst, self.credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.credits < 1.0:
+                return False
+            self.credits -= 1.0
+            return True
+
+
+class Hedger:
+    """Races a duplicate request against one that is slower than usual.
+
+    When a request has not finished after the configured percentile of
+    recent latencies, and the hedge budget allows, the same request is sent
+    again. Whichever finishes first wins and the other is cancelled, which
+    closes its HTTP request. Sync callers run the race on a private event
+    loop thread, so their losing request can be cancelled too.
+    """
+
+    def __init__(self, settings: Optional[HedgeSettings] = None):
+        self.settings = settings or HedgeSettings.from_env()
+        self.latencies = LatencyTracker(self.settings.window)
+        self.budget = HedgeBudget(self.settings.budget_ratio, self.settings.budget_burst)
+        self._counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0}
+        self._counters_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self._counters[name] += 1
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        delay = self.latencies.percentile(key, self.settings.percentile, self.settings.min_samples)
+        return None if delay is None else max(self.settings.min_delay, delay)
+
+    async def _timed(self, key: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        result = await attempt()
+        self.latencies.record(key, time.monotonic() - started)
+        return result
+
+    async def race(self, key: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``attempt()``, hedging it with a second call if it runs long."""
+        self._count("requests")
+        self.budget.earn()
+        delay = self.hedge_delay(key)
+        primary = asyncio.ensure_future(self._timed(key, attempt))
+        if delay is None:
+            return await primary
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.budget.try_spend():
+                self._count("over_budget")
+                return await primary
+            logger.info(f"LLM request to {key} exceeded {delay:.1f}s; sending a hedged request.")
+            self._count("hedged")
+            hedge = asyncio.ensure_future(self._timed(key, attempt))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # exception() raises CancelledError for a cancelled attempt.
+                    if task.cancelled():
+                        error = error or asyncio.CancelledError()
+                        continue
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-hedge-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, key: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Blocking form of :meth:`race` for threads without an event loop."""
+        future = asyncio.run_coroutine_threadsafe(self.race(key, attempt), self._ensure_loop())
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "budget_credits": round(self.budget.credits, 2)}
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = Hedger()
+    return _hedger
+
+
+def reset_hedger(settings: Optional[HedgeSettings] = None) -> Hedger:
+    global _hedger
+    with _hedger_lock:
+        _hedger = Hedger(settings)
+    return _hedger
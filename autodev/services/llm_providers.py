@@ -0,0 +1,466 @@
+# autodev/services/llm_providers.py
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    # The SDK takes about half a second to import, so it is only loaded
+    # when an OpenAI client is first built.
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClientSettings:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    timeout: float = 600.0
+    connect_timeout: float = 10.0
+    # Retries are handled by the LLM scheduler, which also sees the 429s.
+    max_retries: int = 0
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        return cls(
+            max_connections=int(os.getenv("AUTODEV_LLM_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(
+                os.getenv("AUTODEV_LLM_MAX_KEEPALIVE", cls.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(os.getenv("AUTODEV_LLM_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            http2=os.getenv("AUTODEV_LLM_HTTP2", "false").lower() in ("1", "true", "yes"),
+            timeout=float(os.getenv("AUTODEV_LLM_TIMEOUT", cls.timeout)),
+            connect_timeout=float(os.getenv("AUTODEV_LLM_CONNECT_TIMEOUT", cls.connect_timeout)),
+            max_retries=int(os.getenv("AUTODEV_LLM_MAX_RETRIES", cls.max_retries)),
+        )
+
+
+def _build_http_client(settings: ClientSettings, client_class=httpx.Client, **options):
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    timeout = httpx.Timeout(settings.timeout, connect=settings.connect_timeout)
+    try:
+        return client_class(limits=limits, timeout=timeout, http2=settings.http2, **options)
+    except ImportError:
+        # HTTP/2 needs the optional ``h2`` package.
+        logger.warning("HTTP/2 requested but 'h2' is not installed; falling back to HTTP/1.1.")
+        return client_class(limits=limits, timeout=timeout, **options)
+
+
+_client: Optional["OpenAI"] = None
+_client_lock = threading.Lock()
+# httpx async pools are bound to the event loop that created them.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_api_key() -> str:
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set.")
+    return api_key
+
+
+def get_client(settings: Optional[ClientSettings] = None) -> "OpenAI":
+    """Return the shared OpenAI client, building it on first use.
+
+    The client and its connection pool are safe to share across threads, so
+    every ``call_llm`` reuses the same keep-alive connections.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            settings = settings or ClientSettings.from_env()
+            logger.debug(f"Building shared OpenAI client: {settings}")
+            _client = OpenAI(
+                api_key=_get_api_key(),
+                http_client=_build_http_client(settings),
+                timeout=settings.timeout,
+                max_retries=settings.max_retries,
+            )
+    return _client
+
+
+def get_async_client(settings: Optional[ClientSettings] = None) -> "AsyncOpenAI":
+    """Return the AsyncOpenAI client for the running event loop, building it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from openai import AsyncOpenAI
+
+        settings = settings or ClientSettings.from_env()
+        logger.debug(f"Building async OpenAI client: {settings}")
+        client = AsyncOpenAI(
+            api_key=_get_api_key(),
+            http_client=_build_http_client(settings, httpx.AsyncClient),
+            timeout=settings.timeout,
+            max_retries=settings.max_retries,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Close the running event loop's AsyncOpenAI client, if one was built."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def close_openai_clients() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        _async_clients.clear()
+
+
+@dataclass
+class Completion:
+    text: str
+    total_tokens: Optional[int] = None
+
+
+class LLMProvider:
+    """A chat-completion backend.
+
+    ``complete``/``acomplete`` return a Completion. ``open_stream`` and
+    ``aopen_stream`` send the request before returning, so errors such as a
+    429 surface (and can be retried) before any text is consumed; the
+    returned iterator yields text chunks.
+    """
+
+    name = "provider"
+
+    def __init__(self, default_model: str, max_output_tokens: Optional[int] = None):
+        self.default_model = default_model
+        self.max_output_tokens = max_output_tokens
+
+    def output_tokens(self, requested: int) -> int:
+        if self.max_output_tokens:
+            return min(requested, self.max_output_tokens)
+        return requested
+
+    def complete(self, prompt: str, model: str, max_tokens: int) -> Completion:
+        raise NotImplementedError
+
+    async def acomplete(self, prompt: str, model: str, max_tokens: int) -> Completion:
+        raise NotImplementedError
+
+    def open_stream(self, prompt: str, model: str, max_tokens: int) -> Iterator[str]:
+        raise NotImplementedError
+
+    async def aopen_stream(self, prompt: str, model: str, max_tokens: int) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        """Close the clients built for the running event loop; call it before the loop closes."""
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    @staticmethod
+    def _request(prompt, model, max_tokens, **options) -> Dict[str, Any]:
+        return dict(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_completion_tokens=max_tokens,
+            **options,
+        )
+
+    @staticmethod
+    def _completion(response) -> Completion:
+        usage = getattr(response, "usage", None)
+        return Completion(
+            response.choices[0].message.content or "", getattr(usage, "total_tokens", None)
+        )
+
+    def complete(self, prompt, model, max_tokens):
+        response = get_client().chat.completions.create(
+            **self._request(prompt, model, self.output_tokens(max_tokens))
+        )
+        return self._completion(response)
+
+    async def acomplete(self, prompt, model, max_tokens):
+        response = await get_async_client().chat.completions.create(
+            **self._request(prompt, model, self.output_tokens(max_tokens))
+        )
+        return self._completion(response)
+
+    def open_stream(self, prompt, model, max_tokens):
+        stream = get_client().chat.completions.create(
+            **self._request(prompt, model, self.output_tokens(max_tokens), stream=True)
+        )
+
+        def chunks():
+            with stream:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+        return chunks()
+
+    async def aopen_stream(self, prompt, model, max_tokens):
+        stream = await get_async_client().chat.completions.create(
+            **self._request(prompt, model, self.output_tokens(max_tokens), stream=True)
+        )
+
+        async def chunks():
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+
+        return chunks()
+
+    def close(self) -> None:
+        close_openai_clients()
+
+    async def aclose(self) -> None:
+        await aclose_async_client()
+
+
+class HTTPProvider(LLMProvider):
+    """Base for providers spoken to directly over httpx with SSE streaming.
+
+    Failed requests raise ``httpx.HTTPStatusError`` so the scheduler can see
+    429s and Retry-After headers just as it does for the OpenAI SDK.
+    """
+
+    path = ""
+
+    def __init__(
+        self,
+        base_url: str,
+        default_model: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_output_tokens: Optional[int] = None,
+        settings: Optional[ClientSettings] = None,
+    ):
+        super().__init__(default_model, max_output_tokens)
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.settings = settings or ClientSettings.from_env()
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _payload(self, prompt: str, model: str, max_tokens: int, stream: bool) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _parse(self, body: Dict[str, Any]) -> Completion:
+        raise NotImplementedError
+
+    def _event_text(self, event: Dict[str, Any]) -> Optional[str]:
+        raise NotImplementedError
+
+    def client(self) -> httpx.Client:
+        with self._client_lock:
+            if self._client is None:
+                self._client = _build_http_client(
+                    self.settings, base_url=self.base_url, headers=self.headers
+                )
+            return self._client
+
+    def aclient(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = _build_http_client(
+                self.settings, httpx.AsyncClient, base_url=self.base_url, headers=self.headers
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _request(self, client, prompt, model, max_tokens, stream=False) -> httpx.Request:
+        return client.build_request(
+            "POST", self.path, json=self._payload(prompt, model, self.output_tokens(max_tokens), stream)
+        )
+
+    def _sse_text(self, line: str) -> Optional[str]:
+        if not line.startswith("data:"):
+            return None
+        data = line[len("data:"):].strip()
+        if not data or data == "[DONE]":
+            return None
+        return self._event_text(json.loads(data))
+
+    def complete(self, prompt, model, max_tokens):
+        client = self.client()
+        response = client.send(self._request(client, prompt, model, max_tokens))
+        response.raise_for_status()
+        return self._parse(response.json())
+
+    async def acomplete(self, prompt, model, max_tokens):
+        client = self.aclient()
+        response = await client.send(self._request(client, prompt, model, max_tokens))
+        response.raise_for_status()
+        return self._parse(response.json())
+
+    def open_stream(self, prompt, model, max_tokens):
+        client = self.client()
+        response = client.send(self._request(client, prompt, model, max_tokens, stream=True), stream=True)
+        if response.is_error:
+            response.read()
+            response.close()
+            response.raise_for_status()
+
+        def chunks():
+            try:
+                for line in response.iter_lines():
+                    text = self._sse_text(line)
+                    if text:
+                        yield text
+            finally:
+                response.close()
+
+        return chunks()
+
+    async def aopen_stream(self, prompt, model, max_tokens):
+        client = self.aclient()
+        response = await client.send(
+            self._request(client, prompt, model, max_tokens, stream=True), stream=True
+        )
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            response.raise_for_status()
+
+        async def chunks():
+            try:
+                async for line in response.aiter_lines():
+                    text = self._sse_text(line)
+                    if text:
+                        yield text
+            finally:
+                await response.aclose()
+
+        return chunks()
+
+    def close(self) -> None:
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+        self._async_clients.clear()
+
+
+class AnthropicProvider(HTTPProvider):
+    """Anthropic Messages API, or any server that implements it."""
+
+    name = "anthropic"
+    path = "/v1/messages"
+
+    def __init__(self, api_key: str, base_url: str = "https://api.anthropic.com", **kwargs):
+        headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+        super().__init__(base_url, headers=headers, **kwargs)
+
+    def _payload(self, prompt, model, max_tokens, stream):
+        payload = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _parse(self, body):
+        text = "".join(block.get("text", "") for block in body.get("content", []) if block.get("type") == "text")
+        usage = body.get("usage") or {}
+        total = None
+        if usage:
+            total = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        return Completion(text, total)
+
+    def _event_text(self, event):
+        if event.get("type") == "content_block_delta":
+            delta = event.get("delta", {})
+            if delta.get("type") == "text_delta":
+                return delta.get("text")
+        return None
+
+
+class LocalHTTPProvider(HTTPProvider):
+    """An OpenAI-compatible ``/chat/completions`` server such as a local vLLM, llama.cpp or Ollama."""
+
+    name = "local"
+    path = "/chat/completions"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, **kwargs):
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        super().__init__(base_url, headers=headers, **kwargs)
+
+    def _payload(self, prompt, model, max_tokens, stream):
+        return {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+
+    def _parse(self, body):
+        usage = body.get("usage") or {}
+        return Completion(body["choices"][0]["message"].get("content") or "", usage.get("total_tokens"))
+
+    def _event_text(self, event):
+        choices = event.get("choices") or []
+        if choices:
+            return (choices[0].get("delta") or {}).get("content")
+        return None
+
+
+def providers_from_env() -> Dict[str, LLMProvider]:
+    """Build every provider that has credentials (or a URL) configured."""
+    providers: Dict[str, LLMProvider] = {}
+    if os.getenv("OPENAI_API_KEY"):
+        providers["openai"] = OpenAIProvider(os.getenv("AUTODEV_OPENAI_MODEL", "o1-mini"))
+    if os.getenv("ANTHROPIC_API_KEY"):
+        providers["anthropic"] = AnthropicProvider(
+            os.getenv("ANTHROPIC_API_KEY"),
+            base_url=os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com"),
+            default_model=os.getenv("AUTODEV_ANTHROPIC_MODEL", "claude-3-5-sonnet-latest"),
+            max_output_tokens=int(os.getenv("AUTODEV_ANTHROPIC_MAX_TOKENS", 8192)),
+        )
+    if os.getenv("AUTODEV_LOCAL_LLM_URL"):
+        providers["local"] = LocalHTTPProvider(
+            os.getenv("AUTODEV_LOCAL_LLM_URL"),
+            api_key=os.getenv("AUTODEV_LOCAL_LLM_API_KEY"),
+            default_model=os.getenv("AUTODEV_LOCAL_LLM_MODEL", "local"),
+            max_output_tokens=int(os.getenv("AUTODEV_LOCAL_LLM_MAX_TOKENS", 4096)),
+        )
+    if os.getenv("MODEL_TYPE", "").lower() == "simulated":
+        from .llm_simulator import SimulatedProvider
+
+        providers["simulated"] = SimulatedProvider()
+    return providers
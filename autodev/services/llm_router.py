@@ -0,0 +1,212 @@
+# autodev/services/llm_router.py
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .llm_providers import LLMProvider, OpenAIProvider, providers_from_env
+
+logger = logging.getLogger(__name__)
+
+KNOWN_PROVIDERS = ("openai", "anthropic", "local", "simulated")
+
+
+@dataclass
+class Route:
+    provider: LLMProvider
+    model: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider.name}:{self.model}"
+
+
+class ProviderHealth:
+    """Rolling latency and error rate per provider, with a simple circuit breaker.
+
+    Only the last ``window`` calls within ``max_age`` seconds count, so a
+    provider that was routed around is preferred again once its bad samples
+    age out. Once at least ``min_samples`` calls are recorded and the error
+    rate reaches ``error_threshold``, the provider is taken out of rotation
+    for ``cooldown`` seconds; afterwards it is tried again and reopened if
+    it keeps failing.
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+        error_threshold: float = 0.5,
+        min_samples: int = 5,
+        cooldown: float = 30.0,
+        max_age: float = 300.0,
+    ):
+        self.window = window
+        self.error_threshold = error_threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.max_age = max_age
+        self._samples: Dict[str, Deque[Tuple[float, float, bool]]] = {}
+        self._open_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, provider: str, now: float) -> List[Tuple[float, bool]]:
+        samples = self._samples.get(provider, ())
+        return [(latency, ok) for at, latency, ok in samples if now - at <= self.max_age]
+
+    def record(self, provider: str, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._samples.setdefault(provider, deque(maxlen=self.window)).append((now, latency, ok))
+            if ok:
+                return
+            samples = self._recent(provider, now)
+            errors = sum(1 for _, success in samples if not success)
+            if len(samples) >= self.min_samples and errors / len(samples) >= self.error_threshold:
+                if self._open_until.get(provider, 0.0) <= now:
+                    logger.warning(
+                        f"LLM provider '{provider}' is failing ({errors}/{len(samples)} recent calls); "
+                        f"routing around it for {self.cooldown:.0f}s."
+                    )
+                self._open_until[provider] = now + self.cooldown
+
+    def available(self, provider: str) -> bool:
+        with self._lock:
+            return self._open_until.get(provider, 0.0) <= time.monotonic()
+
+    def snapshot(self, provider: str) -> Dict[str, Optional[float]]:
+        with self._lock:
+            samples = self._recent(provider, time.monotonic())
+        latencies = sorted(latency for latency, ok in samples if ok)
+        return {
+            "samples": len(samples),
+            "error_rate": (sum(1 for _, ok in samples if not ok) / len(samples)) if samples else 0.0,
+            "p50_latency": latencies[len(latencies) // 2] if latencies else None,
+        }
+
+    def expected_latency(self, provider: str) -> Optional[float]:
+        """Median latency divided by success rate: the expected wait per successful call.
+
+        None means no recent data; a provider with only failures scores infinity.
+        """
+        stats = self.snapshot(provider)
+        if not stats["samples"]:
+            return None
+        if stats["p50_latency"] is None:
+            return float("inf")
+        return stats["p50_latency"] / max(0.05, 1.0 - stats["error_rate"])
+
+
+class ProviderRouter:
+    """Chooses which provider serves each LLM call and in which order to fail over.
+
+    An agent with an explicit route (``AUTODEV_LLM_ROUTES``) always tries
+    its provider first while that provider is healthy. Other calls go to
+    the provider with the lowest expected latency per successful call,
+    preferring ``MODEL_TYPE`` until there is data. Providers whose circuit
+    is open are only tried as a last resort.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, LLMProvider],
+        default: str,
+        routes: Optional[Dict[str, str]] = None,
+        health: Optional[ProviderHealth] = None,
+    ):
+        if default not in providers:
+            raise ValueError(f"Default LLM provider '{default}' is not configured.")
+        self.providers = providers
+        self.default = default
+        self.routes = routes or {}
+        self.health = health or ProviderHealth()
+
+    @classmethod
+    def from_env(cls) -> "ProviderRouter":
+        providers = providers_from_env()
+        default = os.getenv("MODEL_TYPE", "openai").lower()
+        if default not in KNOWN_PROVIDERS:
+            logger.warning(f"Unknown MODEL_TYPE '{default}'; using 'openai'.")
+            default = "openai"
+        if default not in providers:
+            if default != "openai":
+                logger.warning(f"MODEL_TYPE '{default}' has no credentials configured; using 'openai'.")
+                default = "openai"
+            # Keep OpenAI registered so a missing key surfaces as a clear error.
+            providers.setdefault("openai", OpenAIProvider(os.getenv("AUTODEV_OPENAI_MODEL", "o1-mini")))
+        routes = {}
+        for entry in filter(None, os.getenv("AUTODEV_LLM_ROUTES", "").split(",")):
+            agent, _, provider = entry.partition("=")
+            if provider.strip() in providers:
+                routes[agent.strip()] = provider.strip()
+            else:
+                logger.warning(f"Ignoring LLM route '{entry}': provider is not configured.")
+        return cls(providers, default, routes)
+
+    def routes_for(self, agent: Optional[str] = None, model: Optional[str] = None) -> List[Route]:
+        """Providers to try for one call, best first.
+
+        An explicit ``model`` applies to the MODEL_TYPE provider; the others
+        use their own default models.
+        """
+        pinned = self.routes.get(agent) if agent else None
+
+        def rank(name: str):
+            expected = self.health.expected_latency(name)
+            return (
+                not self.health.available(name),
+                name != pinned,
+                expected is None and name != self.default,
+                expected if expected is not None else 0.0,
+                name != self.default,
+            )
+
+        ordered = sorted(self.providers, key=rank)
+        return [
+            Route(
+                self.providers[name],
+                model if model and name == self.default else self.providers[name].default_model,
+            )
+            for name in ordered
+        ]
+
+    def record(self, route: Route, latency: float, ok: bool) -> None:
+        self.health.record(route.provider.name, latency, ok)
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {name: self.health.snapshot(name) for name in self.providers}
+
+    def close(self) -> None:
+        for provider in self.providers.values():
+            provider.close()
+
+    async def aclose(self) -> None:
+        """Close every provider's clients for the running event loop."""
+        for provider in self.providers.values():
+            await provider.aclose()
+
+
+_router: Optional[ProviderRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ProviderRouter:
+    """Return the shared router, built from the environment on first use."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ProviderRouter.from_env()
+    return _router
+
+
+def reset_router(router: Optional[ProviderRouter] = None) -> None:
+    """Close the shared router's clients; ``router`` replaces it, else it is rebuilt on next use."""
+    global _router
+    with _router_lock:
+        if _router is not None:
+            _router.close()
+        _router = router
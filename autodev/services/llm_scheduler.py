@@ -0,0 +1,470 @@
+# autodev/services/llm_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Lower values are scheduled first: planning calls the user is waiting on
+# preempt bulk code and test generation queued behind them.
+AGENT_PRIORITIES: Dict[str, int] = {
+    "user_interface_agent": 0,
+    "task_decomposer_agent": 0,
+    "solution_architect_agent": 0,
+    "developer_agent": 1,
+    "testing_agent": 2,
+}
+DEFAULT_PRIORITY = 1
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+@dataclass
+class SchedulerSettings:
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    # Seconds of quota a bucket may accumulate while idle.
+    burst_seconds: float = 10.0
+    min_concurrency: int = 1
+    initial_concurrency: int = 4
+    max_concurrency: int = 16
+    # Latency above this counts as congestion, like a 429; None disables the signal.
+    target_latency: Optional[float] = None
+    decrease_factor: float = 0.5
+    decrease_cooldown: float = 5.0
+    max_retries: int = 6
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    completion_token_estimate: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "SchedulerSettings":
+        return cls(
+            requests_per_minute=_optional_float("AUTODEV_LLM_RPM"),
+            tokens_per_minute=_optional_float("AUTODEV_LLM_TPM"),
+            min_concurrency=int(os.getenv("AUTODEV_LLM_MIN_INFLIGHT", cls.min_concurrency)),
+            initial_concurrency=int(os.getenv("AUTODEV_LLM_INITIAL_INFLIGHT", cls.initial_concurrency)),
+            max_concurrency=int(os.getenv("AUTODEV_LLM_MAX_INFLIGHT", cls.max_concurrency)),
+            target_latency=_optional_float("AUTODEV_LLM_TARGET_LATENCY"),
+            max_retries=int(os.getenv("AUTODEV_LLM_RETRIES", cls.max_retries)),
+            backoff_base=float(os.getenv("AUTODEV_LLM_BACKOFF_BASE", cls.backoff_base)),
+            backoff_max=float(os.getenv("AUTODEV_LLM_BACKOFF_MAX", cls.backoff_max)),
+        )
+
+
+class TokenBucket:
+    """Refills at ``rate_per_minute`` up to ``capacity``; reservations may go into debt.
+
+    ``reserve`` never blocks. It takes the amount immediately and returns how
+    long the caller has to wait before that amount would have been available,
+    so concurrent callers are spaced out in the order they reserved.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund, if negative) ``amount`` after the fact."""
+        self.level = min(self.capacity, self.level - amount)
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+def _is_openai_error(error: BaseException, *names: str) -> bool:
+    # An SDK error can only exist once the SDK is imported, so never import it here.
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, tuple(getattr(openai, name) for name in names))
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return _is_openai_error(error, "RateLimitError") or status_code(error) == 429
+
+
+def is_retryable(error: BaseException) -> bool:
+    if getattr(error, "code", None) == "insufficient_quota":
+        # Billing problem, not throttling; waiting will not help.
+        return False
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError, TimeoutError)):
+        return True
+    if _is_openai_error(error, "APIConnectionError"):
+        return True
+    code = status_code(error)
+    return code is not None and (code in RETRYABLE_STATUS_CODES or code >= 500)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from ``retry-after-ms`` or ``retry-after``."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def response_tokens(response: Any) -> Optional[int]:
+    total = getattr(response, "total_tokens", None)
+    if total is None:
+        total = getattr(getattr(response, "usage", None), "total_tokens", None)
+    return total
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "wake", "delay", "granted", "cancelled")
+
+    def __init__(self, priority: int, seq: int, tokens: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.wake = wake
+        self.delay = 0.0
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Lease:
+    """One admitted LLM request; report how it went with ``succeed`` or ``fail``."""
+
+    def __init__(self, scheduler: "LLMScheduler", tokens: int):
+        self.scheduler = scheduler
+        self.tokens = tokens
+        self.started = time.monotonic()
+        self._released = False
+
+    def succeed(self, total_tokens: Optional[int] = None) -> None:
+        if not self._released:
+            self._released = True
+            self.scheduler._on_success(self, time.monotonic() - self.started, total_tokens)
+
+    def fail(self, error: BaseException) -> None:
+        if not self._released:
+            self._released = True
+            self.scheduler._on_failure(error)
+
+
+class LLMScheduler:
+    """Admission control shared by every LLM call to one provider.
+
+    Requests wait in a priority queue until an in-flight slot is free and the
+    requests- and tokens-per-minute buckets allow them through. The number of
+    slots adapts AIMD-style: it grows by about one per window of successful
+    calls and halves on a 429 (or on latency above ``target_latency``).
+    Retryable failures are retried with full-jitter exponential backoff, never
+    sooner than a ``Retry-After`` header asks, and a Retry-After pauses
+    every queued request rather than just the one that received it.
+    """
+
+    def __init__(self, settings: Optional[SchedulerSettings] = None, name: str = "default"):
+        self.name = name
+        self.settings = settings or SchedulerSettings.from_env()
+        s = self.settings
+        self.requests = (
+            TokenBucket(s.requests_per_minute, max(1.0, s.requests_per_minute * s.burst_seconds / 60))
+            if s.requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(s.tokens_per_minute, max(1.0, s.tokens_per_minute * s.burst_seconds / 60))
+            if s.tokens_per_minute else None
+        )
+        self.limit = float(min(max(s.initial_concurrency, s.min_concurrency), s.max_concurrency))
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._counters = {"requests": 0, "rate_limited": 0, "retries": 0, "failures": 0}
+
+    @staticmethod
+    def priority_for(agent: Optional[str]) -> int:
+        return AGENT_PRIORITIES.get(agent, DEFAULT_PRIORITY) if agent else DEFAULT_PRIORITY
+
+    def estimate_tokens(self, prompt_tokens: int) -> int:
+        return prompt_tokens + self.settings.completion_token_estimate
+
+    # Admission
+
+    def _dispatch_locked(self) -> None:
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled:
+                continue
+            now = time.monotonic()
+            delay = max(0.0, self._blocked_until - now)
+            if self.requests:
+                delay = max(delay, self.requests.reserve(1, now))
+            if self.tokens:
+                delay = max(delay, self.tokens.reserve(waiter.tokens, now))
+            self._in_flight += 1
+            self._counters["requests"] += 1
+            waiter.delay = delay
+            waiter.granted = True
+            waiter.wake()
+
+    def _enqueue(self, priority: int, tokens: int, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority, next(self._seq), tokens, wake)
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+            self._dispatch_locked()
+        return waiter
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch_locked()
+
+    def acquire(self, priority: int = DEFAULT_PRIORITY, tokens: int = 0) -> Lease:
+        event = threading.Event()
+        waiter = self._enqueue(priority, tokens, event.set)
+        event.wait()
+        if waiter.delay > 0:
+            logger.debug(f"Rate limit pacing: waiting {waiter.delay:.2f}s before sending request.")
+            time.sleep(waiter.delay)
+        return Lease(self, tokens)
+
+    async def aacquire(self, priority: int = DEFAULT_PRIORITY, tokens: int = 0) -> Lease:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(priority, tokens, _wake)
+        try:
+            await future
+            if waiter.delay > 0:
+                logger.debug(f"Rate limit pacing: waiting {waiter.delay:.2f}s before sending request.")
+                await asyncio.sleep(waiter.delay)
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = True
+                granted = waiter.granted
+            if granted:
+                self._release_slot()
+            raise
+        return Lease(self, tokens)
+
+    # Feedback
+
+    def _decrease_locked(self, now: float, reason: str) -> None:
+        # One decrease per cooldown, so a burst of 429s from requests that were
+        # already in flight does not collapse the limit to the minimum.
+        if now - self._last_decrease < self.settings.decrease_cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.settings.min_concurrency), self.limit * self.settings.decrease_factor)
+        logger.info(f"LLM concurrency {previous:.1f} -> {self.limit:.1f} ({reason}).")
+
+    def _on_success(self, lease: Lease, latency: float, total_tokens: Optional[int]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if self.tokens and total_tokens is not None:
+                self.tokens.adjust(total_tokens - lease.tokens)
+            target = self.settings.target_latency
+            if target is not None and latency > target:
+                self._decrease_locked(time.monotonic(), f"latency {latency:.1f}s over {target:.1f}s")
+            else:
+                self.limit = min(float(self.settings.max_concurrency), self.limit + 1.0 / self.limit)
+            self._dispatch_locked()
+
+    def _on_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._counters["failures"] += 1
+            if is_rate_limited(error):
+                self._counters["rate_limited"] += 1
+                now = time.monotonic()
+                self._decrease_locked(now, "rate limited")
+                wait = retry_after(error)
+                if wait:
+                    self._blocked_until = max(self._blocked_until, now + wait)
+            self._dispatch_locked()
+
+    def retry_delay(
+        self, error: BaseException, attempt: int, retries: Optional[int] = None
+    ) -> Optional[float]:
+        """Backoff before retry ``attempt + 1``, or None if ``error`` should be raised."""
+        retries = self.settings.max_retries if retries is None else retries
+        if attempt >= retries or not is_retryable(error):
+            return None
+        delay = random.uniform(0, min(self.settings.backoff_max, self.settings.backoff_base * 2 ** attempt))
+        return max(delay, retry_after(error) or 0.0)
+
+    # Calls
+
+    def open(
+        self,
+        func: Callable[[], Any],
+        priority: int = DEFAULT_PRIORITY,
+        tokens: int = 0,
+        retries: Optional[int] = None,
+    ) -> Tuple[Lease, Any]:
+        """Call ``func`` under admission control, retrying retryable errors.
+
+        Returns the still-held lease with the result, for calls such as
+        streams that keep using their slot after ``func`` returns.
+        ``retries`` overrides the configured retry count, e.g. to fail over
+        to another provider sooner.
+        """
+        attempt = 0
+        while True:
+            lease = self.acquire(priority, tokens)
+            try:
+                return lease, func()
+            except BaseException as e:
+                lease.fail(e)
+                if not isinstance(e, Exception):
+                    raise
+                delay = self.retry_delay(e, attempt, retries)
+                if delay is None:
+                    raise
+                self._count_retry(e, attempt, delay, retries)
+                time.sleep(delay)
+                attempt += 1
+
+    async def aopen(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        priority: int = DEFAULT_PRIORITY,
+        tokens: int = 0,
+        retries: Optional[int] = None,
+    ) -> Tuple[Lease, Any]:
+        attempt = 0
+        while True:
+            lease = await self.aacquire(priority, tokens)
+            try:
+                return lease, await func()
+            except BaseException as e:
+                lease.fail(e)
+                if not isinstance(e, Exception):
+                    raise
+                delay = self.retry_delay(e, attempt, retries)
+                if delay is None:
+                    raise
+                self._count_retry(e, attempt, delay, retries)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def run(
+        self,
+        func: Callable[[], Any],
+        priority: int = DEFAULT_PRIORITY,
+        tokens: int = 0,
+        retries: Optional[int] = None,
+    ) -> Any:
+        lease, result = self.open(func, priority, tokens, retries)
+        lease.succeed(response_tokens(result))
+        return result
+
+    async def arun(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        priority: int = DEFAULT_PRIORITY,
+        tokens: int = 0,
+        retries: Optional[int] = None,
+    ) -> Any:
+        lease, result = await self.aopen(func, priority, tokens, retries)
+        lease.succeed(response_tokens(result))
+        return result
+
+    def _count_retry(
+        self, error: BaseException, attempt: int, delay: float, retries: Optional[int]
+    ) -> None:
+        with self._lock:
+            self._counters["retries"] += 1
+        retries = self.settings.max_retries if retries is None else retries
+        logger.warning(
+            f"LLM request to {self.name} failed ({error.__class__.__name__}: {error}); "
+            f"retry {attempt + 1}/{retries} in {delay:.1f}s."
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self._in_flight,
+                "queued": sum(1 for waiter in self._waiters if not waiter.cancelled),
+            }
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_scheduler_settings: Optional[SchedulerSettings] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(provider: str = "default") -> LLMScheduler:
+    """Return the scheduler for ``provider``, configured from the environment on first use.
+
+    Each provider gets its own scheduler, since rate limits and congestion
+    are per provider.
+    """
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        with _scheduler_lock:
+            scheduler = _schedulers.get(provider)
+            if scheduler is None:
+                scheduler = LLMScheduler(_scheduler_settings, provider)
+                _schedulers[provider] = scheduler
+    return scheduler
+
+
+def reset_scheduler(settings: Optional[SchedulerSettings] = None) -> None:
+    """Drop all schedulers; new ones use ``settings``, or the environment if None."""
+    global _scheduler_settings
+    with _scheduler_lock:
+        _schedulers.clear()
+        _scheduler_settings = settings
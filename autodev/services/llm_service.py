@@ -1,27 +1,337 @@
 # autodev/services/llm_service.py
 
-import os
-import openai
 import logging
+import os
+import time
+from typing import Optional
+
+from autodev.core.tracing import span
+from autodev.prompts.prompt_builder import count_tokens
+
+from .llm_cache import get_response_cache, make_cache_key
+from .llm_hedge import get_hedger
+# ClientSettings and the client getters are re-exported for existing callers.
+from .llm_providers import ClientSettings, close_openai_clients, get_async_client, get_client  # noqa: F401
+from .llm_router import get_router, reset_router
+from .llm_scheduler import get_scheduler
+from .llm_stream import aspool_to_file, spool_to_file
 
 logger = logging.getLogger(__name__)
 
-def call_llm(prompt, model='o1-mini', max_completion_tokens=32768):
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set.")
-    openai.api_key = api_key
 
+# Retries on one provider before failing over to the next; the last
+# provider in the route gets the scheduler's full retry count.
+FAILOVER_RETRIES = int(os.getenv("AUTODEV_LLM_FAILOVER_RETRIES", 1))
+
+
+class LLMRequestError(RuntimeError):
+    """An LLM call failed on every provider or returned an empty completion."""
+
+
+def reset_client() -> None:
+    """Close the shared clients so the next call rebuilds them from current settings."""
+    close_openai_clients()
+    reset_router()
+
+
+def _cached_response(prompt, routes, max_completion_tokens, use_cache):
+    cache = get_response_cache() if use_cache else None
+    if not cache:
+        return None, None
+    for route in routes:
+        cache_key = make_cache_key(route.model, prompt, max_completion_tokens)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit for key {cache_key}")
+            return cache, cached
+    return cache, None
+
+
+def _admission(route, routes, prompt, agent):
+    scheduler = get_scheduler(route.provider.name)
+    retries = FAILOVER_RETRIES if route is not routes[-1] else None
+    tokens = scheduler.estimate_tokens(count_tokens(prompt))
+    return scheduler, scheduler.priority_for(agent), tokens, retries
+
+
+def _completion_text(completion) -> str:
+    content = (completion.text or "").strip()
+    if not content:
+        raise LLMRequestError("LLM returned an empty completion.")
+    return content
+
+
+def _failed(router, route, started, error):
+    router.record(route, time.monotonic() - started, ok=False)
+    logger.error(f"Error calling LLM provider '{route.provider.name}' ({route.model}): {error}")
+
+
+def _traced(llm_span, route, prompt, content=None):
+    """Attach the serving route and token counts to an enabled ``call_llm`` span."""
+    if llm_span:
+        llm_span.set(
+            provider=route.provider.name,
+            model=route.model,
+            prompt_tokens=count_tokens(prompt),
+        )
+        if content is not None:
+            llm_span.set(completion_tokens=count_tokens(content))
+
+
+def _counted_chunks(llm_span, chunks):
+    """Pass streamed ``chunks`` through, recording time to first token and completion tokens."""
+    completion_tokens = 0
+    try:
+        for chunk in chunks:
+            llm_span.mark_first_token()
+            completion_tokens += count_tokens(chunk)
+            yield chunk
+    finally:
+        llm_span.set(completion_tokens=completion_tokens)
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+async def _acounted_chunks(llm_span, chunks):
+    completion_tokens = 0
     try:
+        async for chunk in chunks:
+            llm_span.mark_first_token()
+            completion_tokens += count_tokens(chunk)
+            yield chunk
+    finally:
+        llm_span.set(completion_tokens=completion_tokens)
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+
+
+def _exhausted(routes, error):
+    names = ", ".join(route.provider.name for route in routes)
+    return LLMRequestError(f"LLM request failed on all providers ({names}): {error}")
+
+
+def call_llm(prompt, model=None, max_completion_tokens=32768, use_cache=True, agent=None):
+    """Return the completion for ``prompt``.
+
+    The router picks the provider for ``agent`` and fails over to the next
+    one if it keeps failing. Each request goes through that provider's
+    scheduler, which paces it against the rate limits and retries transient
+    failures, and ``agent`` also selects its priority there. With hedging
+    enabled a slow request is raced against a duplicate. Raises
+    LLMRequestError when every provider fails.
+    """
+    router = get_router()
+    routes = router.routes_for(agent, model)
+    with span("call_llm", "llm", agent=agent) as llm_span:
+        cache, cached = _cached_response(prompt, routes, max_completion_tokens, use_cache)
+        if cached is not None:
+            llm_span.set(cached=True)
+            return cached
+
+        hedger = get_hedger()
+        error = None
         logger.debug(f"Sending prompt to LLM:\n{prompt}")
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            max_completion_tokens=max_completion_tokens,
-        )
-        content = response.choices[0].message.content.strip()
-        logger.debug(f"Received response from LLM:\n{content}")
-        return content
-    except Exception as e:
-        logger.error(f"Error calling OpenAI API: {e}")
-        return ""
+        for route in routes:
+            scheduler, priority, tokens, retries = _admission(route, routes, prompt, agent)
+            started = time.monotonic()
+            try:
+                if hedger.enabled:
+                    completion = hedger.run(
+                        route.key,
+                        lambda: scheduler.arun(
+                            lambda: route.provider.acomplete(prompt, route.model, max_completion_tokens),
+                            priority,
+                            tokens,
+                            retries,
+                        ),
+                    )
+                else:
+                    completion = scheduler.run(
+                        lambda: route.provider.complete(prompt, route.model, max_completion_tokens),
+                        priority,
+                        tokens,
+                        retries,
+                    )
+                content = _completion_text(completion)
+            except Exception as e:
+                _failed(router, route, started, e)
+                error = e
+                continue
+            router.record(route, time.monotonic() - started, ok=True)
+            _traced(llm_span, route, prompt, content)
+            logger.debug(f"Received response from LLM ({route.key}):\n{content}")
+            if cache:
+                cache.set(make_cache_key(route.model, prompt, max_completion_tokens), content)
+            return content
+        raise _exhausted(routes, error) from error
+
+
+async def acall_llm(prompt, model=None, max_completion_tokens=32768, use_cache=True, agent=None):
+    router = get_router()
+    routes = router.routes_for(agent, model)
+    with span("call_llm", "llm", agent=agent) as llm_span:
+        cache, cached = _cached_response(prompt, routes, max_completion_tokens, use_cache)
+        if cached is not None:
+            llm_span.set(cached=True)
+            return cached
+
+        hedger = get_hedger()
+        error = None
+        logger.debug(f"Sending prompt to LLM (async):\n{prompt}")
+        for route in routes:
+            scheduler, priority, tokens, retries = _admission(route, routes, prompt, agent)
+            started = time.monotonic()
+
+            def attempt(route=route, scheduler=scheduler, priority=priority, tokens=tokens, retries=retries):
+                return scheduler.arun(
+                    lambda: route.provider.acomplete(prompt, route.model, max_completion_tokens),
+                    priority,
+                    tokens,
+                    retries,
+                )
+
+            try:
+                if hedger.enabled:
+                    completion = await hedger.race(route.key, attempt)
+                else:
+                    completion = await attempt()
+                content = _completion_text(completion)
+            except Exception as e:
+                _failed(router, route, started, e)
+                error = e
+                continue
+            router.record(route, time.monotonic() - started, ok=True)
+            _traced(llm_span, route, prompt, content)
+            logger.debug(f"Received response from LLM ({route.key}):\n{content}")
+            if cache:
+                cache.set(make_cache_key(route.model, prompt, max_completion_tokens), content)
+            return content
+        raise _exhausted(routes, error) from error
+
+
+def stream_llm(
+    prompt, model=None, max_completion_tokens=32768, use_cache=True, agent=None, cache_result=False
+):
+    """Yield the completion for ``prompt`` chunk by chunk as it is generated.
+
+    A cached response is replayed as a single chunk. Streamed responses are
+    only added to the cache with ``cache_result``, since that means holding
+    them in memory; it suits small structured outputs such as plans.
+    Only opening the stream is retried or failed over; the request keeps
+    its scheduler slot until the stream ends. Errors are logged and
+    re-raised so callers can discard partial output.
+    """
+    router = get_router()
+    routes = router.routes_for(agent, model)
+    with span("call_llm", "llm", agent=agent, stream=True) as llm_span:
+        cache, cached = _cached_response(prompt, routes, max_completion_tokens, use_cache)
+        if cached is not None:
+            llm_span.set(cached=True)
+            yield cached
+            return
+
+        logger.debug(f"Streaming prompt to LLM:\n{prompt}")
+        error = None
+        for route in routes:
+            scheduler, priority, tokens, retries = _admission(route, routes, prompt, agent)
+            started = time.monotonic()
+            try:
+                lease, chunks = scheduler.open(
+                    lambda: route.provider.open_stream(prompt, route.model, max_completion_tokens),
+                    priority,
+                    tokens,
+                    retries,
+                )
+                break
+            except Exception as e:
+                _failed(router, route, started, e)
+                error = e
+        else:
+            raise _exhausted(routes, error) from error
+
+        if llm_span:
+            _traced(llm_span, route, prompt)
+            chunks = _counted_chunks(llm_span, chunks)
+        collected = [] if cache and cache_result else None
+        try:
+            for chunk in chunks:
+                if collected is not None:
+                    collected.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped reading early; the request itself went fine.
+            lease.succeed()
+            raise
+        except BaseException as e:
+            lease.fail(e)
+            _failed(router, route, started, e)
+            raise
+        lease.succeed()
+        router.record(route, time.monotonic() - started, ok=True)
+        content = "".join(collected or ()).strip()
+        if content:
+            cache.set(make_cache_key(route.model, prompt, max_completion_tokens), content)
+
+
+async def astream_llm(prompt, model=None, max_completion_tokens=32768, use_cache=True, agent=None):
+    router = get_router()
+    routes = router.routes_for(agent, model)
+    with span("call_llm", "llm", agent=agent, stream=True) as llm_span:
+        _, cached = _cached_response(prompt, routes, max_completion_tokens, use_cache)
+        if cached is not None:
+            llm_span.set(cached=True)
+            yield cached
+            return
+
+        logger.debug(f"Streaming prompt to LLM (async):\n{prompt}")
+        error = None
+        for route in routes:
+            scheduler, priority, tokens, retries = _admission(route, routes, prompt, agent)
+            started = time.monotonic()
+            try:
+                lease, chunks = await scheduler.aopen(
+                    lambda: route.provider.aopen_stream(prompt, route.model, max_completion_tokens),
+                    priority,
+                    tokens,
+                    retries,
+                )
+                break
+            except Exception as e:
+                _failed(router, route, started, e)
+                error = e
+        else:
+            raise _exhausted(routes, error) from error
+
+        if llm_span:
+            _traced(llm_span, route, prompt)
+            chunks = _acounted_chunks(llm_span, chunks)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped reading early; the request itself went fine.
+            lease.succeed()
+            raise
+        except BaseException as e:
+            lease.fail(e)
+            _failed(router, route, started, e)
+            raise
+        lease.succeed()
+        router.record(route, time.monotonic() - started, ok=True)
+
+
+def stream_llm_to_file(
+    prompt, path, model=None, max_completion_tokens=32768, strip_fences=True, agent=None
+):
+    """Stream the completion for ``prompt`` straight into ``path`` with code fences removed."""
+    return spool_to_file(
+        stream_llm(prompt, model, max_completion_tokens, agent=agent), path, strip_fences
+    )
+
+
+async def astream_llm_to_file(
+    prompt, path, model=None, max_completion_tokens=32768, strip_fences=True, agent=None
+):
+    return await aspool_to_file(
+        astream_llm(prompt, model, max_completion_tokens, agent=agent), path, strip_fences
+    )
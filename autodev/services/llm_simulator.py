@@ -0,0 +1,266 @@
+# autodev/services/llm_simulator.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from autodev.prompts.prompt_builder import count_tokens
+
+from .llm_providers import Completion, LLMProvider
+
+logger = logging.getLogger(__name__)
+
+_TASK_LINE = re.compile(r'^(\{"task_id":.*\}),?$', re.MULTILINE)
+_FILE_LINE = re.compile(r"^Target File: (.+)$", re.MULTILINE)
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` for ``q`` in [0, 1]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+@dataclass
+class SimulationSettings:
+    # Time to first token is log-normal around this median (seconds).
+    latency_median: float = 0.5
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 200.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 5.0
+    tasks_per_project: int = 5
+    chunk_tokens: int = 16
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "SimulationSettings":
+        seed = os.getenv("AUTODEV_SIM_SEED")
+        return cls(
+            latency_median=float(os.getenv("AUTODEV_SIM_LATENCY_MEDIAN", cls.latency_median)),
+            latency_sigma=float(os.getenv("AUTODEV_SIM_LATENCY_SIGMA", cls.latency_sigma)),
+            tokens_per_second=float(os.getenv("AUTODEV_SIM_TOKENS_PER_SECOND", cls.tokens_per_second)),
+            rate_limit_rate=float(os.getenv("AUTODEV_SIM_RATE_LIMIT_RATE", cls.rate_limit_rate)),
+            retry_after=float(os.getenv("AUTODEV_SIM_RETRY_AFTER", cls.retry_after)),
+            timeout_rate=float(os.getenv("AUTODEV_SIM_TIMEOUT_RATE", cls.timeout_rate)),
+            timeout_seconds=float(os.getenv("AUTODEV_SIM_TIMEOUT_SECONDS", cls.timeout_seconds)),
+            tasks_per_project=int(os.getenv("AUTODEV_SIM_TASKS", cls.tasks_per_project)),
+            seed=int(seed) if seed else None,
+        )
+
+
+def _identifier(text: str) -> str:
+    words = re.findall(r"[a-z0-9]+", text.lower())[:4]
+    return "_".join(words) or "task"
+
+
+def _dependencies(task_id: int, tasks: int) -> List[int]:
+    # A diamond: everything builds on task 1 and the last task on the rest.
+    if task_id == 1:
+        return []
+    if task_id == tasks and tasks > 2:
+        return list(range(2, tasks))
+    return [1]
+
+
+def _decomposition(prompt: str, tasks: int) -> str:
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:6]
+    return json.dumps([
+        {
+            "task_id": task_id,
+            "description": f"Implement component {task_id} of project {digest}",
+            "depends_on": _dependencies(task_id, tasks),
+        }
+        for task_id in range(1, tasks + 1)
+    ], indent=4)
+
+
+def _architecture(prompt: str) -> str:
+    tasks = []
+    for line in _TASK_LINE.findall(prompt):
+        try:
+            tasks.append(json.loads(line))
+        except ValueError:
+            continue
+    for task in tasks:
+        task["file_path"] = f"src/component_{task.get('task_id')}.py"
+    return json.dumps({
+        "architecture": "A Python package with one module per component under src/.",
+        "programming_language": "python",
+        "tasks": tasks,
+        "file_structure": [task["file_path"] for task in tasks],
+    }, indent=4)
+
+
+def _code(prompt: str) -> str:
+    match = _FILE_LINE.search(prompt)
+    name = _identifier(os.path.splitext(os.path.basename(match.group(1)))[0] if match else "component")
+    return (
+        f'"""Simulated implementation of {name}."""\n\n\n'
+        f"def {name}(value):\n"
+        f'    """Return ``value`` unchanged."""\n'
+        f"    return value\n"
+    )
+
+
+def _tests(prompt: str) -> str:
+    functions = re.findall(r"^def (\w+)\(", prompt, re.MULTILINE) or ["component"]
+    cases = "".join(
+        f"    def test_{name}(self):\n        self.assertEqual({name}(1), 1)\n\n" for name in functions
+    )
+    return f"import unittest\n\n\nclass SimulatedTests(unittest.TestCase):\n{cases}"
+
+
+def simulated_text(prompt: str, settings: SimulationSettings) -> str:
+    """A structurally valid response for whichever agent wrote ``prompt``."""
+    if "You are the Task Decomposer Agent" in prompt:
+        return _decomposition(prompt, settings.tasks_per_project)
+    if "You are the Solution Architect Agent" in prompt:
+        return _architecture(prompt)
+    if "You are the Testing Agent" in prompt:
+        return _tests(prompt)
+    if "You are the Developer Agent" in prompt:
+        return _code(prompt)
+    return "OK"
+
+
+class SimulatedProvider(LLMProvider):
+    """A local stand-in for an LLM API, for tests and load runs without an API key.
+
+    Each call waits a log-normal time to first token plus the response
+    length at ``tokens_per_second``, and fails with a 429 (with a
+    Retry-After header) or a read timeout at the configured rates. The
+    errors are the same httpx exceptions the HTTP providers raise, so the
+    scheduler retries them the way it would real ones.
+    """
+
+    name = "simulated"
+
+    def __init__(self, settings: Optional[SimulationSettings] = None, default_model: str = "simulated"):
+        super().__init__(default_model)
+        self.settings = settings or SimulationSettings.from_env()
+        self._random = random.Random(self.settings.seed)
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self._counters = {"requests": 0, "completed": 0, "rate_limited": 0, "timeouts": 0, "tokens": 0}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _plan(self, prompt: str):
+        """Decide the outcome of one request: ``(error, first_token_delay, text)``."""
+        with self._lock:
+            self._counters["requests"] += 1
+            roll = self._random.random()
+            first_token = self._random.lognormvariate(
+                math.log(max(self.settings.latency_median, 1e-6)), self.settings.latency_sigma
+            ) if self.settings.latency_median > 0 else 0.0
+        request = httpx.Request("POST", "http://simulated.local/v1/chat/completions")
+        if roll < self.settings.rate_limit_rate:
+            self._count("rate_limited")
+            response = httpx.Response(
+                429, headers={"retry-after": str(self.settings.retry_after)}, request=request
+            )
+            error = httpx.HTTPStatusError(
+                "429 Too Many Requests (simulated)", request=request, response=response
+            )
+            return error, 0.0, ""
+        if roll < self.settings.rate_limit_rate + self.settings.timeout_rate:
+            self._count("timeouts")
+            error = httpx.ReadTimeout("Simulated read timeout", request=request)
+            return error, self.settings.timeout_seconds, ""
+        return None, first_token, simulated_text(prompt, self.settings)
+
+    def _generation_seconds(self, tokens: int) -> float:
+        if self.settings.tokens_per_second <= 0:
+            return 0.0
+        return tokens / self.settings.tokens_per_second
+
+    def _finish(self, prompt: str, text: str, started: float) -> Completion:
+        total = count_tokens(prompt) + count_tokens(text)
+        with self._lock:
+            self._counters["completed"] += 1
+            self._counters["tokens"] += total
+            self.latencies.append(time.monotonic() - started)
+        return Completion(text, total)
+
+    def _chunks(self, text: str) -> List[str]:
+        pieces = re.findall(r"\S+\s*|\s+", text)
+        size = max(1, self.settings.chunk_tokens)
+        return ["".join(pieces[i:i + size]) for i in range(0, len(pieces), size)]
+
+    def complete(self, prompt, model, max_tokens):
+        started = time.monotonic()
+        error, delay, text = self._plan(prompt)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        time.sleep(self._generation_seconds(count_tokens(text)))
+        return self._finish(prompt, text, started)
+
+    async def acomplete(self, prompt, model, max_tokens):
+        started = time.monotonic()
+        error, delay, text = self._plan(prompt)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        await asyncio.sleep(self._generation_seconds(count_tokens(text)))
+        return self._finish(prompt, text, started)
+
+    def open_stream(self, prompt, model, max_tokens):
+        started = time.monotonic()
+        error, delay, text = self._plan(prompt)
+        if error is not None:
+            time.sleep(delay)
+            raise error
+
+        def chunks():
+            time.sleep(delay)
+            for chunk in self._chunks(text):
+                time.sleep(self._generation_seconds(count_tokens(chunk)))
+                yield chunk
+            self._finish(prompt, text, started)
+
+        return chunks()
+
+    async def aopen_stream(self, prompt, model, max_tokens):
+        started = time.monotonic()
+        error, delay, text = self._plan(prompt)
+        if error is not None:
+            await asyncio.sleep(delay)
+            raise error
+
+        async def chunks():
+            await asyncio.sleep(delay)
+            for chunk in self._chunks(text):
+                await asyncio.sleep(self._generation_seconds(count_tokens(chunk)))
+                yield chunk
+            self._finish(prompt, text, started)
+
+        return chunks()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self.latencies)
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p90": percentile(latencies, 0.9),
+            "latency_p99": percentile(latencies, 0.99),
+        }
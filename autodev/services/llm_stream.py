@@ -0,0 +1,158 @@
+# autodev/services/llm_stream.py
+
+import hashlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterable, Iterable, Optional
+
+from autodev.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+_STRIPPABLE = " \t\r\n`"
+_LANGUAGE_TAG = re.compile(r"^[\w+#.-]*$")
+
+
+class FenceStripper:
+    """Incrementally remove markdown code fences from streamed LLM output.
+
+    Leading whitespace, an opening fence and its language tag are dropped;
+    a trailing run of whitespace and backticks is held back until more
+    content arrives and discarded when the stream ends. A reply fenced on a
+    single line (```print(1)```) keeps its content.
+    """
+
+    def __init__(self):
+        self._head = ""
+        self._started = False
+        self._tail = ""
+
+    def feed(self, chunk: str) -> str:
+        if not self._started:
+            self._head += chunk
+            self._head = self._head.lstrip(" \t\r\n")
+            if self._head.startswith("```"):
+                newline = self._head.find("\n")
+                closing = self._head.find("```", 3)
+                if closing != -1 and (newline == -1 or closing < newline):
+                    # Closed on the opening line: there is no language tag to drop.
+                    self._head = self._head[3:]
+                elif newline == -1:
+                    return ""
+                else:
+                    self._head = self._head[newline + 1:].lstrip(" \t\r\n")
+            if not self._head or self._head.strip("`") == "":
+                return ""
+            self._started = True
+            chunk, self._head = self._head.lstrip("`"), ""
+
+        text = self._tail + chunk
+        keep = len(text.rstrip(_STRIPPABLE))
+        self._tail = text[keep:]
+        return text[:keep]
+
+    def finish(self) -> str:
+        """End the stream and return any content still held back."""
+        self._tail = ""
+        head, self._head = self._head, ""
+        if self._started or not head.startswith("```"):
+            return ""
+        # An unterminated single-line fence: its text is code unless it is a bare language tag.
+        body = head[3:].rstrip(_STRIPPABLE)
+        return "" if _LANGUAGE_TAG.match(body) else body
+
+
+def strip_code_fences(text: str) -> str:
+    stripper = FenceStripper()
+    return stripper.feed(text) + stripper.finish()
+
+
+@dataclass
+class StreamedFile:
+    """A generated artifact that was spooled straight to disk."""
+
+    path: str
+    size: int
+    sha256: str
+    first_chunk_seconds: Optional[float] = None
+
+    def read(self) -> str:
+        with open(self.path, "r", encoding="utf-8") as streamed_file:
+            return streamed_file.read()
+
+
+class _Spool:
+    def __init__(self, path: str, strip_fences: bool):
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.stripper = FenceStripper() if strip_fences else None
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.started = time.monotonic()
+        self.first_chunk_seconds: Optional[float] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(self.part_path, "w", encoding="utf-8")
+
+    def write(self, chunk: str) -> None:
+        if self.first_chunk_seconds is None:
+            self.first_chunk_seconds = time.monotonic() - self.started
+        if self.stripper:
+            chunk = self.stripper.feed(chunk)
+        self._append(chunk)
+
+    def _append(self, chunk: str) -> None:
+        if chunk:
+            data = chunk.encode("utf-8")
+            self.digest.update(data)
+            self.size += len(data)
+            self.file.write(chunk)
+
+    def commit(self) -> StreamedFile:
+        if self.stripper:
+            self._append(self.stripper.finish())
+        if self.size == 0:
+            # An empty reply (or a bare fence) must not replace a good file.
+            self.abort()
+            raise ValueError(f"Streamed reply for {self.path} is empty")
+        with span("write", "file", path=self.path, bytes=self.size):
+            self.file.close()
+            os.replace(self.part_path, self.path)
+        return StreamedFile(self.path, self.size, self.digest.hexdigest(), self.first_chunk_seconds)
+
+    def abort(self) -> None:
+        self.file.close()
+        try:
+            os.remove(self.part_path)
+        except OSError:
+            pass
+
+
+def spool_to_file(chunks: Iterable[str], path: str, strip_fences: bool = True) -> StreamedFile:
+    """Write streamed chunks to ``path`` as they arrive, replacing it atomically at the end.
+
+    Raises ValueError, leaving ``path`` untouched, if nothing was left to write.
+    """
+    spool = _Spool(path, strip_fences)
+    try:
+        for chunk in chunks:
+            spool.write(chunk)
+    except BaseException:
+        spool.abort()
+        raise
+    return spool.commit()
+
+
+async def aspool_to_file(
+    chunks: AsyncIterable[str], path: str, strip_fences: bool = True
+) -> StreamedFile:
+    spool = _Spool(path, strip_fences)
+    try:
+        async for chunk in chunks:
+            spool.write(chunk)
+    except BaseException:
+        spool.abort()
+        raise
+    return spool.commit()
@@ -0,0 +1,114 @@
+# autodev/services/manifest.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from autodev.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = ".autodev"
+MANIFEST_FILE = "manifest.json"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Per-project record of which inputs produced each generated artifact.
+
+    Each entry maps a key such as ``code:3:src/app.py`` to the fingerprint of
+    the inputs that produced it and the hash of the file written. An artifact
+    is reused only while both still match, so edited inputs or files touched
+    outside the pipeline are regenerated.
+    """
+
+    def __init__(self, project_dir: str):
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, MANIFEST_DIR, MANIFEST_FILE)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as manifest_file:
+                    self.entries = json.load(manifest_file).get("entries", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def reuse(self, key: str, fingerprint: str) -> Optional[str]:
+        """Return the on-disk artifact for ``key`` if it was built from ``fingerprint``."""
+        with self._lock:
+            entry = self.entries.get(key)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        artifact_path = os.path.join(self.project_dir, entry["artifact"])
+        try:
+            with open(artifact_path, "r", encoding="utf-8") as artifact_file:
+                content = artifact_file.read()
+        except OSError:
+            return None
+        if content_hash(content) != entry.get("sha256"):
+            logger.info(f"Artifact {entry['artifact']} changed on disk; regenerating.")
+            return None
+        return content
+
+    def is_current(self, key: str, fingerprint: str, content: str) -> bool:
+        """True if ``content`` is already on disk for ``key`` and needs no rewrite."""
+        with self._lock:
+            entry = self.entries.get(key)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return False
+        if entry.get("sha256") != content_hash(content):
+            return False
+        return self.reuse(key, fingerprint) is not None
+
+    def record(
+        self,
+        key: str,
+        fingerprint: str,
+        artifact: str,
+        content: Optional[str] = None,
+        sha256: Optional[str] = None,
+    ) -> None:
+        """Record ``artifact``; pass ``sha256`` instead of ``content`` for streamed files."""
+        if os.path.isabs(artifact):
+            artifact = os.path.relpath(artifact, self.project_dir)
+        with self._lock:
+            self.entries[key] = {
+                "fingerprint": fingerprint,
+                "artifact": artifact,
+                "sha256": sha256 or content_hash(content),
+            }
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._exclude_from_git()
+        tmp_path = f"{self.path}.tmp"
+        with self._lock, span("write", "file", path=self.path):
+            with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+                json.dump({"version": 1, "entries": self.entries}, manifest_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _exclude_from_git(self) -> None:
+        exclude_path = os.path.join(self.project_dir, ".git", "info", "exclude")
+        if not os.path.isdir(os.path.join(self.project_dir, ".git")):
+            return
+        pattern = f"/{MANIFEST_DIR}/"
+        try:
+            with open(exclude_path, "r", encoding="utf-8") as exclude_file:
+                if pattern in exclude_file.read().splitlines():
+                    return
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+        with open(exclude_path, "a", encoding="utf-8") as exclude_file:
+            exclude_file.write(f"\n{pattern}\n")
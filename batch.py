@@ -0,0 +1,203 @@
+# batch.py
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
+
+# Add the project directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger("batch")
+
+SUMMARY_FILE = "batch-summary.json"
+RESULTS_FILE = "batch-results.jsonl"
+PROJECT_LOG = "autodev.log"
+INCOMPLETE_RUN = "Pipeline did not implement and test every task; see the log."
+
+
+def slugify(name: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "-", name.strip()).strip("-.")
+    return slug or "project"
+
+
+def load_specs(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Read project specs from a JSONL file.
+
+    Each line is an object with ``name`` and ``description``; any other keys
+    (``max_concurrency``, ``git_commit_mode``, ...) seed the run's context.
+    Returns ``(specs, errors)``: malformed lines are reported instead of
+    aborting the batch. Specs get a unique ``slug`` for their directory.
+    """
+    specs, errors, slugs = [], [], set()
+    with open(path, "r", encoding="utf-8") as spec_file:
+        for line_number, line in enumerate(spec_file, 1):
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append({"line": line_number, "error": f"Invalid JSON: {e}"})
+                continue
+            if not isinstance(spec, dict) or not spec.get("name") or not spec.get("description"):
+                errors.append({"line": line_number, "error": "A spec needs a 'name' and a 'description'."})
+                continue
+            slug, suffix = slugify(str(spec["name"])), 1
+            while slug in slugs:
+                suffix += 1
+                slug = f"{slugify(str(spec['name']))}-{suffix}"
+            slugs.add(slug)
+            specs.append(dict(spec, slug=slug, line=line_number))
+    return specs, errors
+
+
+def spec_context(spec: Dict[str, Any]) -> Dict[str, Any]:
+    context_variables = {
+        key: value for key, value in spec.items() if key not in ("name", "description", "slug", "line")
+    }
+    context_variables["project_name"] = spec["slug"]
+    context_variables["project_description"] = spec["description"]
+    return context_variables
+
+
+def configure_worker_logging(output_dir: str, level: int) -> None:
+    """Send this worker's logs to the project's own log file instead of the shared console."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(os.path.join(output_dir, PROJECT_LOG), encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def run_spec(spec: Dict[str, Any], output_root: str, use_async: bool, log_level: int) -> Dict[str, Any]:
+    """Run one spec through the pipeline in its own output directory (in a worker process)."""
+    output_dir = os.path.join(output_root, spec["slug"])
+    os.makedirs(output_dir, exist_ok=True)
+    configure_worker_logging(output_dir, log_level)
+    started = time.monotonic()
+    result: Dict[str, Any] = {
+        "name": spec["name"],
+        "line": spec["line"],
+        "output_dir": output_dir,
+        "log": os.path.join(output_dir, PROJECT_LOG),
+        "pid": os.getpid(),
+    }
+    try:
+        # Imported here so the parent process never builds agents or LLM clients.
+        import asyncio
+        from main import arun_system, run_outcome, run_system
+
+        if use_async:
+            context_variables = asyncio.run(
+                arun_system(output_dir=output_dir, initial_context=spec_context(spec))
+            )
+        else:
+            context_variables = run_system(output_dir=output_dir, initial_context=spec_context(spec))
+    except BaseException as e:
+        logger.exception(f"Batch project '{spec['name']}' crashed.")
+        result.update(ok=False, error=f"{type(e).__name__}: {e}", seconds=time.monotonic() - started)
+        return result
+
+    result.update(run_outcome(context_variables), seconds=time.monotonic() - started)
+    result["error"] = None if result["ok"] else INCOMPLETE_RUN
+    return result
+
+
+def summarize(results: List[Dict[str, Any]], errors, args, elapsed: float) -> Dict[str, Any]:
+    seconds = sorted(result["seconds"] for result in results)
+    return {
+        "specs": args.specs,
+        "output_dir": args.output_dir,
+        "workers": args.workers,
+        "projects": len(results),
+        "succeeded": sum(1 for result in results if result["ok"]),
+        "failed": sum(1 for result in results if not result["ok"]),
+        "invalid_specs": errors,
+        "wall_seconds": elapsed,
+        "project_seconds_total": sum(seconds),
+        "project_seconds_p50": seconds[(len(seconds) - 1) // 2] if seconds else None,
+        "project_seconds_max": seconds[-1] if seconds else None,
+        "results": sorted(results, key=lambda result: result["line"]),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run many AutoDev projects from a JSONL file of specs without prompting."
+    )
+    parser.add_argument("specs", help="JSONL file with one {\"name\", \"description\"} object per line.")
+    parser.add_argument(
+        "--output-dir",
+        default=os.path.join(os.getcwd(), "output", "batch"),
+        help="Root directory; each project gets its own subdirectory.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Projects run in parallel, one per worker process.",
+    )
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run each pipeline on an event loop.")
+    parser.add_argument("--summary", default=None, help=f"Summary JSON path (default: <output-dir>/{SUMMARY_FILE}).")
+    parser.add_argument("--verbose", action="store_true", help="Log at DEBUG level in the project logs.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    args.output_dir = os.path.abspath(args.output_dir)
+    args.workers = max(1, args.workers)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    specs, errors = load_specs(args.specs)
+    for error in errors:
+        logger.error(f"Skipping spec on line {error['line']}: {error['error']}")
+    logger.info(f"Running {len(specs)} projects with {args.workers} workers into {args.output_dir}.")
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    results: List[Dict[str, Any]] = []
+    started = time.monotonic()
+    # Results are appended as projects finish so an interrupted batch still leaves a record.
+    with open(os.path.join(args.output_dir, RESULTS_FILE), "w", encoding="utf-8") as results_file, \
+            ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(run_spec, spec, args.output_dir, args.use_async, log_level): spec
+            for spec in specs
+        }
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. killed or out of memory).
+                result = {"name": spec["name"], "line": spec["line"], "ok": False, "seconds": 0.0,
+                          "error": f"Worker failed: {type(e).__name__}: {e}"}
+            results.append(result)
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            status = "ok" if result["ok"] else f"FAILED ({result['error']})"
+            logger.info(f"[{len(results)}/{len(specs)}] {spec['name']}: {status} in {result['seconds']:.1f}s")
+
+    summary = summarize(results, errors, args, time.monotonic() - started)
+    summary_path = args.summary or os.path.join(args.output_dir, SUMMARY_FILE)
+    with open(summary_path, "w", encoding="utf-8") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+    logger.info(
+        f"Batch finished: {summary['succeeded']}/{summary['projects']} succeeded, "
+        f"{len(errors)} invalid specs, {summary['wall_seconds']:.1f}s wall time. Summary: {summary_path}"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    summary = main()
+    sys.exit(0 if not summary["failed"] and not summary["invalid_specs"] else 1)
@@ -0,0 +1,92 @@
+# bench_startup.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Dict, Any, List
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must not be imported just to start the CLI.
+HEAVY_MODULES = ("openai", "github", "tiktoken", "jinja2", "autodev.agents.developer")
+
+CASES = {
+    "baseline": ["-c", "pass"],
+    "import autodev": ["-c", "import autodev"],
+    "import main": ["-c", "import main"],
+    "main.py --help": ["main.py", "--help"],
+    "batch.py --help": ["batch.py", "--help"],
+}
+
+_PROBE = "import sys, json, main; print(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+
+
+def time_command(args: List[str], runs: int) -> float:
+    """Best wall time in seconds of ``python <args>`` over ``runs`` fresh interpreters."""
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args], cwd=PROJECT_DIR, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def heavy_modules_loaded() -> List[str]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(modules=HEAVY_MODULES)],
+        cwd=PROJECT_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure AutoDev CLI startup time.")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreters per case; the best time is reported.")
+    parser.add_argument(
+        "--threshold-ms",
+        type=float,
+        default=100.0,
+        help="Fail if a case takes longer than this over bare interpreter startup.",
+    )
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    seconds = {name: time_command(command, max(1, args.runs)) for name, command in CASES.items()}
+    baseline = seconds["baseline"]
+    results = {
+        "baseline_ms": baseline * 1000,
+        "threshold_ms": args.threshold_ms,
+        "cases": {
+            name: {"ms": value * 1000, "over_baseline_ms": (value - baseline) * 1000}
+            for name, value in seconds.items() if name != "baseline"
+        },
+        "heavy_modules_loaded": heavy_modules_loaded(),
+    }
+    results["ok"] = not results["heavy_modules_loaded"] and all(
+        case["over_baseline_ms"] <= args.threshold_ms for case in results["cases"].values()
+    )
+
+    print(f"{'case':<18} {'ms':>8} {'+baseline':>10}")
+    print(f"{'baseline':<18} {results['baseline_ms']:>8.1f} {'':>10}")
+    for name, case in results["cases"].items():
+        flag = "" if case["over_baseline_ms"] <= args.threshold_ms else "  SLOW"
+        print(f"{name:<18} {case['ms']:>8.1f} {case['over_baseline_ms']:>10.1f}{flag}")
+    if results["heavy_modules_loaded"]:
+        print(f"Heavy modules imported by main: {', '.join(results['heavy_modules_loaded'])}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main()["ok"] else 1)
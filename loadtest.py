@@ -0,0 +1,227 @@
+# loadtest.py
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+# Add the project directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from autodev.core.swarm import Swarm
+from autodev.core.tracing import start_tracing, stop_tracing
+from autodev.agents.project_manager import ProjectManagerAgent
+from autodev.agents.task_decomposer import TaskDecomposerAgent
+from autodev.agents.solution_architect import SolutionArchitectAgent
+from autodev.agents.developer import DeveloperAgent
+from autodev.agents.testing import TestingAgent
+from autodev.agents.integration import IntegrationAgent
+from autodev.agents.deployment import DeploymentAgent
+from autodev.services.llm_router import ProviderRouter, reset_router
+from autodev.services.llm_scheduler import get_scheduler
+from autodev.services.llm_simulator import SimulatedProvider, SimulationSettings, percentile
+
+logger = logging.getLogger("loadtest")
+
+MAX_HOPS = 20
+
+
+def build_agents():
+    return {
+        "ProjectManagerAgent": ProjectManagerAgent(),
+        "TaskDecomposerAgent": TaskDecomposerAgent(),
+        "SolutionArchitectAgent": SolutionArchitectAgent(),
+        "DeveloperAgent": DeveloperAgent(),
+        "TestingAgent": TestingAgent(),
+        "IntegrationAgent": IntegrationAgent(),
+        "DeploymentAgent": DeploymentAgent(),
+    }
+
+
+def project_context(index: int, args) -> Dict[str, Any]:
+    return {
+        "output_dir": args.output_dir,
+        "project_name": f"project-{index}",
+        "project_description": f"Load test project {index}: a small command line utility.",
+        "max_concurrency": args.max_concurrency,
+    }
+
+
+def project_result(index: int, started: float, context_variables: Dict[str, Any], stages) -> Dict[str, Any]:
+    implemented = context_variables.get("implemented_tasks", [])
+    tested = context_variables.get("tested_tasks", [])
+    failed = context_variables.get("failed_tasks", []) + context_variables.get("failed_tests", [])
+    return {
+        "project": index,
+        "seconds": time.monotonic() - started,
+        "implemented": len(implemented),
+        "tested": len(tested),
+        "failed": len(failed),
+        "ok": bool(implemented) and not failed and len(tested) == len(implemented),
+        "stages": stages,
+    }
+
+
+def run_project(index: int, args) -> Dict[str, Any]:
+    swarm = Swarm(agents=build_agents())
+    context_variables = project_context(index, args)
+    agent_name, stages, started = "ProjectManagerAgent", [], time.monotonic()
+    for _ in range(MAX_HOPS):
+        if agent_name not in swarm.agents:
+            break
+        stage_started = time.monotonic()
+        response = swarm.run(agent_name=agent_name, context_variables=context_variables)
+        stages.append((agent_name, time.monotonic() - stage_started))
+        context_variables, agent_name = response.context_variables, response.agent
+    return project_result(index, started, context_variables, stages)
+
+
+async def arun_project(index: int, args) -> Dict[str, Any]:
+    swarm = Swarm(agents=build_agents())
+    context_variables = project_context(index, args)
+    agent_name, stages, started = "ProjectManagerAgent", [], time.monotonic()
+    for _ in range(MAX_HOPS):
+        if agent_name not in swarm.agents:
+            break
+        stage_started = time.monotonic()
+        response = await swarm.arun(agent_name=agent_name, context_variables=context_variables)
+        stages.append((agent_name, time.monotonic() - stage_started))
+        context_variables, agent_name = response.context_variables, response.agent
+    return project_result(index, started, context_variables, stages)
+
+
+async def arun_projects(args) -> List[Dict[str, Any]]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(index):
+        async with semaphore:
+            return await arun_project(index, args)
+
+    return list(await asyncio.gather(*(bounded(index) for index in range(args.projects))))
+
+
+def summarize(results: List[Dict[str, Any]], provider: SimulatedProvider, elapsed: float) -> Dict[str, Any]:
+    seconds = [result["seconds"] for result in results]
+    stages: Dict[str, List[float]] = {}
+    for result in results:
+        for agent_name, duration in result["stages"]:
+            stages.setdefault(agent_name, []).append(duration)
+    llm = provider.stats()
+    return {
+        "projects": len(results),
+        "succeeded": sum(1 for result in results if result["ok"]),
+        "wall_seconds": elapsed,
+        "projects_per_minute": 60.0 * len(results) / elapsed if elapsed else None,
+        "llm_requests_per_second": llm["requests"] / elapsed if elapsed else None,
+        "llm_tokens_per_second": llm["tokens"] / elapsed if elapsed else None,
+        "project_p50": percentile(seconds, 0.5),
+        "project_p90": percentile(seconds, 0.9),
+        "project_p99": percentile(seconds, 0.99),
+        "stages": {
+            agent_name: {"p50": percentile(durations, 0.5), "p99": percentile(durations, 0.99)}
+            for agent_name, durations in stages.items()
+        },
+        "llm": llm,
+        "scheduler": get_scheduler(provider.name).stats(),
+    }
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    def fmt(value):
+        return "-" if value is None else f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    print(f"Projects:            {summary['succeeded']}/{summary['projects']} succeeded")
+    print(f"Wall time:           {fmt(summary['wall_seconds'])}s")
+    print(f"Throughput:          {fmt(summary['projects_per_minute'])} projects/min, "
+          f"{fmt(summary['llm_requests_per_second'])} LLM req/s, "
+          f"{fmt(summary['llm_tokens_per_second'])} tokens/s")
+    print(f"Project latency:     p50 {fmt(summary['project_p50'])}s  "
+          f"p90 {fmt(summary['project_p90'])}s  p99 {fmt(summary['project_p99'])}s")
+    llm = summary["llm"]
+    print(f"LLM call latency:    p50 {fmt(llm['latency_p50'])}s  "
+          f"p90 {fmt(llm['latency_p90'])}s  p99 {fmt(llm['latency_p99'])}s")
+    print(f"LLM requests:        {llm['requests']} sent, {llm['rate_limited']} rate limited, "
+          f"{llm['timeouts']} timed out")
+    scheduler = summary["scheduler"]
+    print(f"Scheduler:           {scheduler['retries']} retries, "
+          f"concurrency limit {scheduler['concurrency_limit']}")
+    print("Stage latency:")
+    for agent_name, stats in summary["stages"].items():
+        print(f"  {agent_name:<24} p50 {fmt(stats['p50'])}s  p99 {fmt(stats['p99'])}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run concurrent AutoDev projects against the simulated LLM backend."
+    )
+    parser.add_argument("--projects", type=int, default=10, help="Number of projects to run.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Projects running at once.")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="LLM calls in flight per agent.")
+    parser.add_argument("--tasks", type=int, default=5, help="Tasks per decomposed project.")
+    parser.add_argument("--latency-median", type=float, default=0.2, help="Median time to first token (s).")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal sigma of that latency.")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="Simulated output speed.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls that get a 429.")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of calls that time out.")
+    parser.add_argument("--timeout-seconds", type=float, default=2.0, help="How long a timeout takes.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Drive projects on one event loop.")
+    parser.add_argument("--output-dir", default=None, help="Where projects are written (default: a temp dir).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the summary as JSON here.")
+    parser.add_argument("--trace", default=None, help="Write a Chrome trace of the run here.")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    args.output_dir = args.output_dir or tempfile.mkdtemp(prefix="autodev-loadtest-")
+    # Cached responses would hide the backend's latency.
+    os.environ.pop("AUTODEV_LLM_CACHE_DIR", None)
+
+    provider = SimulatedProvider(SimulationSettings(
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        tasks_per_project=args.tasks,
+        seed=args.seed,
+    ))
+    reset_router(ProviderRouter({provider.name: provider}, provider.name))
+
+    if args.trace:
+        start_tracing("autodev-loadtest")
+    started = time.monotonic()
+    if args.use_async:
+        results = asyncio.run(arun_projects(args))
+    else:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda index: run_project(index, args), range(args.projects)))
+    summary = summarize(results, provider, time.monotonic() - started)
+
+    print_report(summary)
+    print(f"Projects written to: {args.output_dir}")
+    tracer = stop_tracing()
+    if tracer is not None:
+        print(tracer.format_summary())
+        print(f"Trace written to: {tracer.export_chrome_trace(args.trace)}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(summary, json_file, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
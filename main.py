@@ -2,22 +2,19 @@
 
 import os
 import sys
+import argparse
 import logging
 from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 
 # Add the project directory to sys.path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from autodev.core.swarm import Swarm
-from autodev.agents.user_interface import UserInterfaceAgent
-from autodev.agents.project_manager import ProjectManagerAgent
-from autodev.agents.task_decomposer import TaskDecomposerAgent
-from autodev.agents.solution_architect import SolutionArchitectAgent
-from autodev.agents.developer import DeveloperAgent
-from autodev.agents.testing import TestingAgent
-from autodev.agents.integration import IntegrationAgent
-from autodev.agents.deployment import DeploymentAgent
+from autodev.core.checkpoint import RunJournal
+from autodev.core.context import ContextStore
+from autodev.core.tracing import start_tracing, stop_tracing
+from autodev.agents import LazyAgentMap
 
 # Load environment variables
 load_dotenv()
@@ -29,52 +26,243 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Define the output directory
+# Define the output directory (created by the run journal when a run starts)
 OUTPUT_DIR = os.path.join(os.getcwd(), "output")
 
-# Ensure the output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# Map agent names to agent instances
-agent_map = {
-    "UserInterfaceAgent": UserInterfaceAgent(),
-    "ProjectManagerAgent": ProjectManagerAgent(),
-    "TaskDecomposerAgent": TaskDecomposerAgent(),
-    "SolutionArchitectAgent": SolutionArchitectAgent(),
-    "DeveloperAgent": DeveloperAgent(),
-    "TestingAgent": TestingAgent(),
-    "IntegrationAgent": IntegrationAgent(),
-    "DeploymentAgent": DeploymentAgent(),
-}
-
-def run_system():
+# Map agent names to agent instances, built the first time the swarm hands off to them
+agent_map = LazyAgentMap()
+
+MAX_HOPS = 20
+
+def start_run(
+    resume: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    initial_context: Optional[Dict[str, Any]] = None,
+):
+    """Open the run journal and return ``(journal, run_id, hop, agent_name, context)``.
+
+    ``resume`` is a run id, or ``"latest"`` for the most recent unfinished run.
+    ``initial_context`` seeds a new run, e.g. with ``project_name`` and
+    ``project_description`` so no input is asked for.
+    """
+    output_dir = output_dir or OUTPUT_DIR
+    journal = RunJournal.for_output_dir(output_dir)
+    if resume:
+        run_id = journal.latest_run() if resume == "latest" else resume
+        checkpoint = journal.last_checkpoint(run_id) if run_id else None
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint found to resume (requested: {resume}).")
+        hop, agent_name, context_variables = checkpoint
+        if not agent_name:
+            raise ValueError(f"Run {run_id} has already completed.")
+        journal.finish_run(run_id, "running")
+        logger.info(f"Resuming run {run_id} at hop {hop} with agent {agent_name}.")
+        return journal, run_id, hop, agent_name, ContextStore(context_variables)
+
+    run_id = journal.start_run()
+    context_variables = ContextStore({
+        **(initial_context or {}),
+        "output_dir": output_dir,
+        "run_id": run_id,
+        "journal_path": journal.path,
+    })
+    journal.checkpoint(run_id, 0, "UserInterfaceAgent", context_variables)
+    logger.info(f"Started run {run_id}.")
+    return journal, run_id, 0, "UserInterfaceAgent", context_variables
+
+def finish_hop(journal, run_id, hop, agent_name, response) -> Optional[str]:
+    """Checkpoint what the hop changed and return the next agent, or None when the run stops.
+
+    A hop whose agent raised, or that hands off to an unknown agent, marks the
+    run "failed" and keeps that agent in the checkpoint so ``--resume`` retries it.
+    """
+    next_agent_name = response.agent
+    if response.error is not None or (next_agent_name and next_agent_name not in agent_map):
+        retry_agent = agent_name if response.error is not None else next_agent_name
+        journal.checkpoint(run_id, hop, retry_agent, response.context_variables, response.changes)
+        journal.finish_run(run_id, "failed")
+        logger.error(
+            f"Run {run_id} stopped at hop {hop} ({response.error or f'unknown agent {next_agent_name}'}). "
+            f"Resume with --resume {run_id} to retry {retry_agent}."
+        )
+        return None
+    logger.info(f"Next agent: {next_agent_name}")
+    journal.checkpoint(run_id, hop, next_agent_name, response.context_variables, response.changes)
+    if not next_agent_name:
+        journal.finish_run(run_id)
+        logger.info("Workflow complete.")
+        return None
+    return next_agent_name
+
+def report_hop(on_progress, hop, agent_name, response):
+    """Pass a hop's outcome to ``on_progress``; a failing callback never stops the run."""
+    if on_progress is None:
+        return
+    try:
+        on_progress({
+            "event": "hop",
+            "hop": hop,
+            "agent": agent_name,
+            "next_agent": response.agent,
+            "messages": [message.get("message") for message in response.messages],
+            "changed": response.changes.keys if response.changes is not None else [],
+        })
+    except Exception as e:
+        logger.error(f"Progress callback failed: {e}")
+
+def run_outcome(context_variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Machine-readable result of a finished run: task counts and whether it fully succeeded."""
+    implemented = context_variables.get("implemented_tasks") or []
+    tested = context_variables.get("tested_tasks") or []
+    failed = (context_variables.get("failed_tasks") or []) + (context_variables.get("failed_tests") or [])
+    return {
+        "ok": bool(implemented) and not failed and len(tested) == len(implemented),
+        "run_id": context_variables.get("run_id"),
+        "project_dir": context_variables.get("project_dir"),
+        "tasks": len(context_variables.get("tasks") or []),
+        "implemented": len(implemented),
+        "tested": len(tested),
+        "failed": len(failed),
+    }
+
+def trace_path(
+    trace: Optional[str], run_id: Optional[str], output_dir: Optional[str] = None
+) -> Optional[str]:
+    """Where to write the run's trace: ``--trace`` wins over ``AUTODEV_TRACE``.
+
+    "auto" means ``<output_dir>/traces/<run_id>.json``.
+    """
+    trace = trace or os.getenv("AUTODEV_TRACE")
+    if trace == "auto":
+        return os.path.join(output_dir or OUTPUT_DIR, "traces", f"{run_id or 'run'}.json")
+    return trace
+
+def finish_trace(trace: Optional[str], run_id: Optional[str], output_dir: Optional[str] = None):
+    """Stop tracing, write the Chrome trace file and log the per-span summary."""
+    tracer = stop_tracing()
+    path = trace_path(trace, run_id, output_dir)
+    if tracer is None or not path:
+        return
+    try:
+        tracer.export_chrome_trace(path)
+    except OSError as e:
+        logger.error(f"Failed to write trace to {path}: {e}")
+        return
+    logger.info(f"Run summary by span:\n{tracer.format_summary()}")
+    logger.info(f"Trace written to {path} (open in chrome://tracing or https://ui.perfetto.dev).")
+
+def run_system(
+    resume: Optional[str] = None,
+    trace: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    initial_context: Optional[Dict[str, Any]] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run the pipeline to completion and return the final context.
+
+    ``on_progress`` is called with an event dict after every hop.
+    """
+    run_id, context_variables = None, dict(initial_context or {})
+    if trace_path(trace, run_id):
+        start_tracing()
     try:
+        journal, run_id, hop, current_agent_name, context_variables = start_run(
+            resume, output_dir, initial_context
+        )
         swarm = Swarm(agents=agent_map)
-        context_variables: Dict[str, Any] = {"output_dir": OUTPUT_DIR}
-        current_agent_name = "UserInterfaceAgent"
 
-        for _ in range(20):
+        while current_agent_name:
+            if hop >= MAX_HOPS:
+                logger.info("Maximum number of iterations reached.")
+                break
+            hop += 1
             logger.info(f"Current agent: {current_agent_name}")
             response = swarm.run(
                 agent_name=current_agent_name,
                 context_variables=context_variables,
             )
             context_variables = response.context_variables
-            next_agent_name = response.agent
+            report_hop(on_progress, hop, current_agent_name, response)
+            current_agent_name = finish_hop(journal, run_id, hop, current_agent_name, response)
 
-            logger.info(f"Next agent: {next_agent_name}")
-            if not next_agent_name or next_agent_name not in agent_map:
-                logger.info("Workflow complete or unknown agent encountered.")
-                break
+    except KeyboardInterrupt:
+        logger.warning("Process interrupted by user. Resume with --resume.")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+    finally:
+        finish_trace(trace, run_id, output_dir)
+    return context_variables
+
+async def arun_system(
+    resume: Optional[str] = None,
+    trace: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    initial_context: Optional[Dict[str, Any]] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Async variant of run_system; agents with async functions run natively on the loop."""
+    run_id, context_variables = None, dict(initial_context or {})
+    if trace_path(trace, run_id):
+        start_tracing()
+    try:
+        journal, run_id, hop, current_agent_name, context_variables = start_run(
+            resume, output_dir, initial_context
+        )
+        swarm = Swarm(agents=agent_map)
 
-            current_agent_name = next_agent_name
-        else:
-            logger.info("Maximum number of iterations reached.")
+        while current_agent_name:
+            if hop >= MAX_HOPS:
+                logger.info("Maximum number of iterations reached.")
+                break
+            hop += 1
+            logger.info(f"Current agent: {current_agent_name}")
+            response = await swarm.arun(
+                agent_name=current_agent_name,
+                context_variables=context_variables,
+            )
+            context_variables = response.context_variables
+            report_hop(on_progress, hop, current_agent_name, response)
+            current_agent_name = finish_hop(journal, run_id, hop, current_agent_name, response)
 
     except KeyboardInterrupt:
-        logger.warning("Process interrupted by user.")
+        logger.warning("Process interrupted by user. Resume with --resume.")
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
+    finally:
+        finish_trace(trace, run_id, output_dir)
+    return context_variables
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AutoDev agent pipeline.")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Drive the agents from a single asyncio event loop.",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        metavar="RUN_ID",
+        help="Resume a journaled run at the agent and task where it stopped "
+        "(defaults to the most recent unfinished run).",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="auto",
+        metavar="PATH",
+        help="Record timing spans for agents, LLM calls, git and file writes, write them "
+        "as a Chrome trace (defaults to output/traces/<run_id>.json) and log a summary.",
+    )
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    run_system()
+    args = parse_args()
+    if args.use_async:
+        import asyncio
+
+        asyncio.run(arun_system(resume=args.resume, trace=args.trace))
+    else:
+        run_system(resume=args.resume, trace=args.trace)
@@ -0,0 +1,452 @@
+# serve.py
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+import logging
+import threading
+import socketserver
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Iterator, List, Optional
+
+# Add the project directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from batch import slugify
+
+logger = logging.getLogger("serve")
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class QueueFull(Exception):
+    """The job queue is at capacity; the client should retry later."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    name: str
+    description: str
+    context: Dict[str, Any]
+    output_dir: str
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    hop: int = 0
+    agent: Optional[str] = None
+    outcome: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self.changed:
+            if event.get("event") == "hop":
+                self.hop, self.agent = event["hop"], event.get("next_agent")
+            self.events.append(dict(event, seq=len(self.events), time=time.time()))
+            self.changed.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "seconds": (self.finished or time.time()) - self.started if self.started else None,
+            "hop": self.hop,
+            "next_agent": self.agent,
+            "output_dir": self.output_dir,
+            "outcome": self.outcome,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """In-process job queue served by warm worker threads.
+
+    Every worker runs pipelines in this process, so the agents, the prompt
+    registry, the LLM provider clients and their connection pools are
+    built once at startup and reused by every job.
+    """
+
+    def __init__(
+        self,
+        output_root: str,
+        workers: int = 2,
+        max_queue: int = 100,
+        max_finished: int = 500,
+        use_async: bool = False,
+    ):
+        self.output_root = output_root
+        self.workers = max(1, workers)
+        self.max_finished = max_finished
+        self.use_async = use_async
+        self.jobs: Dict[str, Job] = {}
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def warm_up(self) -> None:
+        """Build the agents, prompt templates, tokenizer and LLM clients before the first job."""
+        started = time.monotonic()
+        from main import agent_map
+        from autodev.prompts.prompt_builder import count_tokens
+        from autodev.prompts.registry import get_registry
+        from autodev.services.llm_router import get_router
+
+        agent_map.load_all()
+        get_registry()
+        count_tokens("warm up")
+        get_router()
+        logger.info(f"Warmed up in {time.monotonic() - started:.2f}s.")
+
+    def start(self) -> None:
+        self.warm_up()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Let running jobs finish, cancel queued ones and stop the workers."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._finish(job, "cancelled", error="Server shut down.")
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, spec: Dict[str, Any]) -> Job:
+        name, description = spec.get("name"), spec.get("description")
+        if not name or not description:
+            raise ValueError("A job needs a 'name' and a 'description'.")
+        job_id = uuid.uuid4().hex[:12]
+        slug = slugify(str(name))
+        context = {key: value for key, value in spec.items() if key not in ("name", "description")}
+        context.update(project_name=slug, project_description=description)
+        job = Job(job_id, str(name), description, context, os.path.join(self.output_root, f"{job_id}-{slug}"))
+        job.emit({"event": "queued"})
+        with self._lock:
+            self._evict_finished()
+            self.jobs[job_id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self.jobs[job_id]
+            raise QueueFull(f"The job queue is full ({self._queue.maxsize} jobs waiting).")
+        logger.info(f"Queued job {job_id} ({name}).")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return sorted(self.jobs.values(), key=lambda job: job.created)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job that has not started yet; running jobs are left to finish."""
+        job = self.get(job_id)
+        if job is not None:
+            with job.changed:
+                if job.status != "queued":
+                    return job
+                job.status = "cancelled"
+            self._finish(job, "cancelled", error="Cancelled before it started.")
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.list():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queue_depth": self._queue.qsize(), "jobs": counts}
+
+    def events(self, job: Job, since: int = 0, timeout: float = 15.0) -> Iterator[Dict[str, Any]]:
+        """Yield the job's events from ``since`` on, blocking for new ones until it is done.
+
+        While nothing happens a heartbeat is yielded every ``timeout`` seconds
+        so idle streams are not closed by proxies.
+        """
+        position = since
+        while True:
+            with job.changed:
+                if position >= len(job.events) and not job.done:
+                    job.changed.wait(timeout)
+                pending = job.events[position:]
+                done = job.done
+            if not pending and not done:
+                yield {"event": "heartbeat", "time": time.time()}
+            for event in pending:
+                yield event
+            position += len(pending)
+            if done and position >= len(job.events):
+                return
+
+    def _evict_finished(self) -> None:
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in sorted(finished, key=lambda job: job.finished or 0)[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.job_id]
+
+    def _finish(self, job: Job, status: str, outcome=None, error=None) -> None:
+        # One critical section, so a reader never sees the final status without the final event.
+        with job.changed:
+            job.status, job.outcome, job.error = status, outcome, error
+            job.finished = time.time()
+            job.emit({"event": "finished", "status": status, "outcome": outcome, "error": error})
+
+    def _work(self) -> None:
+        import asyncio
+
+        # One event loop for the worker's lifetime: async LLM clients and their
+        # connection pools are built per loop, so they are reused across jobs.
+        loop = asyncio.new_event_loop() if self.use_async else None
+        if loop is not None:
+            asyncio.set_event_loop(loop)
+        try:
+            self._run_jobs(loop)
+        finally:
+            if loop is not None:
+                self._close_loop(loop)
+
+    @staticmethod
+    def _close_loop(loop) -> None:
+        from autodev.services.llm_router import get_router
+
+        try:
+            loop.run_until_complete(get_router().aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        except Exception as e:
+            logger.error(f"Failed to close the worker's LLM clients: {e}")
+        finally:
+            loop.close()
+
+    def _run_jobs(self, loop) -> None:
+        from main import arun_system, run_outcome, run_system
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with job.changed:
+                if job.status != "queued":
+                    continue
+                job.status, job.started = "running", time.time()
+                job.emit({"event": "started"})
+            logger.info(f"Running job {job.job_id} ({job.name}).")
+            try:
+                os.makedirs(job.output_dir, exist_ok=True)
+                if loop is not None:
+                    context_variables = loop.run_until_complete(arun_system(
+                        output_dir=job.output_dir, initial_context=job.context, on_progress=job.emit
+                    ))
+                else:
+                    context_variables = run_system(
+                        output_dir=job.output_dir, initial_context=job.context, on_progress=job.emit
+                    )
+                outcome = run_outcome(context_variables)
+            except Exception as e:
+                logger.exception(f"Job {job.job_id} crashed.")
+                self._finish(job, "failed", error=f"{type(e).__name__}: {e}")
+                continue
+            if outcome["ok"]:
+                self._finish(job, "succeeded", outcome)
+            else:
+                self._finish(job, "failed", outcome, "Pipeline did not implement and test every task.")
+            logger.info(f"Job {job.job_id} {job.status} in {job.finished - job.started:.1f}s.")
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """JSON API over the JobManager.
+
+    POST   /jobs                  submit {"name", "description", ...context}
+    GET    /jobs                  list jobs
+    GET    /jobs/<id>             job status
+    GET    /jobs/<id>/events      progress as a chunked NDJSON stream (?since=<seq>)
+    DELETE /jobs/<id>             cancel a queued job
+    GET    /health                worker and queue stats
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "AutoDev"
+    max_body_bytes = 1 << 20
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        path, _, query = self.path.partition("?")
+        parts = [part for part in path.split("/") if part]
+        params = dict(
+            pair.split("=", 1) for pair in query.split("&") if "=" in pair
+        )
+        return parts, params
+
+    def _job_or_404(self, job_id: str) -> Optional[Job]:
+        job = self.manager.get(job_id)
+        if job is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No job '{job_id}'."})
+        return job
+
+    def do_GET(self):
+        parts, params = self._route()
+        if parts == ["health"]:
+            return self._send_json(HTTPStatus.OK, {"status": "ok", **self.manager.stats()})
+        if parts == ["jobs"]:
+            return self._send_json(HTTPStatus.OK, {"jobs": [job.to_dict() for job in self.manager.list()]})
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+            return
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._stream_events(job, int(params.get("since", 0) or 0))
+            return
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.max_body_bytes:
+            return self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large."})
+        try:
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(spec, dict):
+                raise ValueError("The request body must be a JSON object.")
+            job = self.manager.submit(spec)
+        except QueueFull as e:
+            self.close_connection = True
+            return self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+        except ValueError as e:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+        job = self.manager.cancel(parts[1])
+        if job is None:
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No job '{parts[1]}'."})
+        status = HTTPStatus.OK if job.status == "cancelled" else HTTPStatus.CONFLICT
+        self._send_json(status, job.to_dict())
+
+    def _stream_events(self, job: Job, since: int) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event in self.manager.events(job, since):
+                data = (json.dumps(event) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class JobHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, manager: JobManager):
+        super().__init__(address, JobRequestHandler)
+        self.manager = manager
+
+
+class JobUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, manager: JobManager):
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, JobRequestHandler)
+        self.manager = manager
+
+
+def build_server(args, manager: JobManager):
+    if args.socket:
+        return JobUnixServer(args.socket, manager)
+    return JobHTTPServer((args.host, args.port), manager)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the AutoDev pipeline as a long-running job service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on.")
+    parser.add_argument("--socket", default=None, help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs run at the same time.")
+    parser.add_argument("--max-queue", type=int, default=100, help="Jobs allowed to wait before submits are refused.")
+    parser.add_argument(
+        "--output-dir",
+        default=os.path.join(os.getcwd(), "output", "jobs"),
+        help="Root directory; each job gets its own subdirectory.",
+    )
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run each pipeline on an event loop.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manager = JobManager(output_dir, args.workers, args.max_queue, use_async=args.use_async)
+    manager.start()
+    server = build_server(args, manager)
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    logger.info(f"AutoDev service listening on {where} with {manager.workers} workers.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down; waiting for running jobs to finish.")
+    finally:
+        server.server_close()
+        manager.stop()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import pytest
+
+from autodev.services.llm_router import ProviderRouter, reset_router
+from autodev.services.llm_scheduler import SchedulerSettings, reset_scheduler
+from autodev.services.llm_simulator import SimulatedProvider, SimulationSettings
+
+
+@pytest.fixture
+def simulated_llm(monkeypatch):
+    """Route every LLM call to an instant, deterministic simulated backend."""
+    monkeypatch.delenv("AUTODEV_LLM_CACHE_DIR", raising=False)
+    provider = SimulatedProvider(
+        SimulationSettings(latency_median=0, tokens_per_second=0, retry_after=0, seed=0)
+    )
+    reset_scheduler(SchedulerSettings(backoff_base=0.001, backoff_max=0.01))
+    reset_router(ProviderRouter({provider.name: provider}, provider.name))
+    yield provider
+    reset_router()
+    reset_scheduler()
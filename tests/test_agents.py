@@ -0,0 +1,124 @@
+import os
+
+import pytest
+
+from autodev.agents.developer import DeveloperAgent
+from autodev.agents.solution_architect import SolutionArchitectAgent
+from autodev.agents.task_decomposer import TaskDecomposerAgent
+from autodev.agents import testing
+from autodev.services.llm_service import LLMRequestError, call_llm
+
+
+def planned_context(tmp_path):
+    context_variables = {
+        "output_dir": str(tmp_path),
+        "project_name": "demo",
+        "project_description": "A command line todo list.",
+    }
+    context_variables.update(
+        TaskDecomposerAgent().decompose_project(context_variables).context_variables
+    )
+    return SolutionArchitectAgent().architect_solution(context_variables).context_variables
+
+
+def test_decomposer_returns_tasks(simulated_llm):
+    result = TaskDecomposerAgent().decompose_project({"project_description": "A todo list."})
+    tasks = result.context_variables["tasks"]
+    assert len(tasks) == simulated_llm.settings.tasks_per_project
+    assert all({"task_id", "description"} <= set(task) for task in tasks)
+    assert result.agent == "ProjectManagerAgent"
+
+
+def test_architect_assigns_files(simulated_llm, tmp_path):
+    context_variables = planned_context(tmp_path)
+    assert context_variables["programming_language"] == "python"
+    for task in context_variables["tasks"]:
+        assert task["file_path"].endswith(".py")
+        assert os.path.isfile(os.path.join(tmp_path, "demo", task["file_path"]))
+
+
+def test_developer_and_testing_write_files(simulated_llm, tmp_path):
+    context_variables = planned_context(tmp_path)
+    implemented = DeveloperAgent().implement_tasks(context_variables)
+    context_variables.update(implemented.context_variables)
+    assert implemented.context_variables["failed_tasks"] == []
+
+    tested = testing.TestingAgent().test_tasks(context_variables)
+    assert tested.context_variables["failed_tests"] == []
+    assert len(tested.context_variables["tested_tasks"]) == len(context_variables["tasks"])
+    for task in context_variables["tasks"]:
+        with open(os.path.join(tmp_path, "demo", task["file_path"]), encoding="utf-8") as code_file:
+            assert "def " in code_file.read()
+
+
+def test_rate_limited_calls_are_retried(simulated_llm):
+    simulated_llm.settings.rate_limit_rate = 0.5
+    for _ in range(5):
+        assert call_llm("You are the Developer Agent.\nTarget File: src/app.py")
+    assert simulated_llm.stats()["rate_limited"] > 0
+
+
+def test_exhausted_retries_raise(simulated_llm):
+    simulated_llm.settings.rate_limit_rate = 1.0
+    with pytest.raises(LLMRequestError):
+        call_llm("anything")
+
+
+def test_developer_sees_prerequisite_code(simulated_llm, tmp_path, monkeypatch):
+    context_variables = planned_context(tmp_path)
+    assert context_variables["tasks"][1]["depends_on"] == [1]
+    prompts = {}
+    developer = DeveloperAgent()
+    build_prompt = developer.build_prompt
+
+    def recording_build_prompt(task, programming_language, prerequisites=""):
+        prompts.setdefault(task["task_id"], set()).add(prerequisites)
+        return build_prompt(task, programming_language, prerequisites)
+
+    monkeypatch.setattr(developer, "build_prompt", recording_build_prompt)
+    context_variables["max_concurrency"] = 4
+    developer.implement_tasks(context_variables)
+    assert prompts[1] == {""}
+    assert any("def component_1(" in prerequisites for prerequisites in prompts[2])
+    last = simulated_llm.settings.tasks_per_project
+    assert any(
+        all(f"def component_{task_id}(" in prerequisites for task_id in range(2, last))
+        for prerequisites in prompts[last]
+    )
+
+
+def test_dependents_are_regenerated_when_a_prerequisite_changes(simulated_llm, tmp_path, monkeypatch):
+    context_variables = planned_context(tmp_path)
+    developer = DeveloperAgent()
+    developer.implement_tasks(context_variables)
+    generated = []
+    build_prompt = developer.build_prompt
+
+    def recording_build_prompt(task, programming_language, prerequisites=""):
+        if prerequisites:  # only real generations include the prerequisite code
+            generated.append(task["task_id"])
+        return build_prompt(task, programming_language, prerequisites)
+
+    monkeypatch.setattr(developer, "build_prompt", recording_build_prompt)
+    requests = simulated_llm.stats()["requests"]
+    developer.implement_tasks(context_variables)
+    assert simulated_llm.stats()["requests"] == requests and generated == []
+
+    # Task 1 now produces different code; task 2's prompt is unchanged but it builds on task 1.
+    context_variables["tasks"][0]["file_path"] = "src/renamed.py"
+    developer.implement_tasks(context_variables)
+    assert context_variables["tasks"][1]["depends_on"] == [1]
+    assert 2 in generated
+
+
+def test_testing_agent_survives_git_failures(simulated_llm, tmp_path, monkeypatch):
+    context_variables = planned_context(tmp_path)
+    context_variables.update(DeveloperAgent().implement_tasks(context_variables).context_variables)
+
+    def broken_commit_batch(*args, **kwargs):
+        raise RuntimeError("index.lock exists")
+
+    monkeypatch.setattr(testing.GitManagerService, "commit_batch", broken_commit_batch)
+    result = testing.TestingAgent().test_tasks(context_variables)
+    assert result.agent == "IntegrationAgent"
+    assert len(result.context_variables["tested_tasks"]) == len(context_variables["tasks"])
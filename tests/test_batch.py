@@ -0,0 +1,63 @@
+import json
+
+import batch
+from autodev.agents.user_interface import UserInterfaceAgent
+
+
+def test_user_interface_skips_prompts_when_project_is_given(monkeypatch):
+    def no_input(prompt):
+        raise AssertionError("should not prompt")
+
+    monkeypatch.setattr("builtins.input", no_input)
+    result = UserInterfaceAgent().get_user_input(
+        {"project_name": "demo", "project_description": "A todo list."}
+    )
+    assert result.agent == "ProjectManagerAgent"
+
+
+def test_load_specs_reports_bad_lines_and_dedupes_names(tmp_path):
+    specs_path = tmp_path / "specs.jsonl"
+    specs_path.write_text(
+        '{"name": "Todo App", "description": "A todo list."}\n'
+        "not json\n"
+        '{"name": "Todo App", "description": "Another one.", "max_concurrency": 2}\n'
+        '{"name": "missing description"}\n',
+        encoding="utf-8",
+    )
+    specs, errors = batch.load_specs(str(specs_path))
+    assert [spec["slug"] for spec in specs] == ["Todo-App", "Todo-App-2"]
+    assert [error["line"] for error in errors] == [2, 4]
+    assert batch.spec_context(specs[1]) == {
+        "max_concurrency": 2,
+        "project_name": "Todo-App-2",
+        "project_description": "Another one.",
+    }
+
+
+def test_batch_runs_projects_in_isolated_directories(tmp_path, monkeypatch):
+    for name, value in {
+        "MODEL_TYPE": "simulated",
+        "AUTODEV_SIM_LATENCY_MEDIAN": "0",
+        "AUTODEV_SIM_TOKENS_PER_SECOND": "0",
+        "AUTODEV_SIM_TASKS": "3",
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("AUTODEV_LLM_CACHE_DIR", raising=False)
+    specs_path = tmp_path / "specs.jsonl"
+    specs_path.write_text(
+        "".join(
+            json.dumps({"name": f"project {index}", "description": f"Utility number {index}."}) + "\n"
+            for index in range(3)
+        ),
+        encoding="utf-8",
+    )
+    output_dir = tmp_path / "out"
+    summary = batch.main([str(specs_path), "--output-dir", str(output_dir), "--workers", "2"])
+
+    assert summary["succeeded"] == 3
+    for result in summary["results"]:
+        assert result["implemented"] == result["tested"] == 3
+        assert result["project_dir"].startswith(result["output_dir"])
+    written = json.loads((output_dir / batch.SUMMARY_FILE).read_text(encoding="utf-8"))
+    assert written["projects"] == 3
+    assert len((output_dir / batch.RESULTS_FILE).read_text(encoding="utf-8").splitlines()) == 3
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from autodev.agents import testing
+from autodev.agents.developer import DeveloperAgent
+from autodev.core.checkpoint import RunJournal
+from autodev.services.blob_store import BlobStore, file_ref, is_blob_ref
+
+from .test_agents import planned_context
+
+
+def test_blobs_are_content_addressed_and_read_back(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    ref = store.put("print('héllo')\n")
+    assert is_blob_ref(ref) and store.put("print('héllo')\n".encode("utf-8")) == ref
+    assert store.read(ref) == "print('héllo')\n"
+    assert store.size(ref) == len("print('héllo')\n".encode("utf-8"))
+    assert store.read(store.put("")) == ""
+
+    source = tmp_path / "module.py"
+    source.write_text("x = 1\n", encoding="utf-8")
+    assert store.put_file(str(source)) == file_ref(str(source)) == store.put("x = 1\n")
+    assert [name for _, _, names in os.walk(store.root) for name in names if name.endswith(".tmp")] == []
+
+    with pytest.raises(ValueError):
+        store.path("../../etc/passwd")
+    assert file_ref(str(tmp_path / "missing.py")) is None
+
+
+@pytest.mark.parametrize("stream_to_disk", [False, True])
+def test_tasks_carry_blob_references_instead_of_code(simulated_llm, tmp_path, stream_to_disk):
+    context_variables = planned_context(tmp_path)
+    context_variables["stream_to_disk"] = stream_to_disk
+    context_variables.update(DeveloperAgent().implement_tasks(context_variables).context_variables)
+    context_variables.update(testing.TestingAgent().test_tasks(context_variables).context_variables)
+
+    store = BlobStore.for_project(context_variables["project_dir"])
+    for task in context_variables["tested_tasks"]:
+        assert "code" not in task and "tests" not in task
+        with open(os.path.join(context_variables["project_dir"], task["file_path"]), encoding="utf-8") as code_file:
+            assert store.read(task["code_ref"]) == code_file.read()
+        assert "import unittest" in store.read(task["tests_ref"])
+
+
+@pytest.mark.parametrize("stream_to_disk", [False, True])
+def test_journal_records_blob_references(simulated_llm, tmp_path, stream_to_disk):
+    context_variables = planned_context(tmp_path)
+    journal = RunJournal.for_output_dir(str(tmp_path))
+    run_id = journal.start_run()
+    context_variables.update(
+        journal_path=journal.path, run_id=run_id, stream_to_disk=stream_to_disk, force_regenerate=True
+    )
+    context_variables.update(DeveloperAgent().implement_tasks(context_variables).context_variables)
+    context_variables.update(testing.TestingAgent().test_tasks(context_variables).context_variables)
+
+    store = BlobStore.for_project(context_variables["project_dir"])
+    developer, tester = DeveloperAgent(), testing.TestingAgent()
+    for task in context_variables["tested_tasks"]:
+        code_entry = journal.completed_task(run_id, developer.name, developer.manifest_key(task))
+        tests_entry = journal.completed_task(run_id, tester.name, tester.manifest_key(task))
+        assert code_entry == {"code_ref": task["code_ref"]}
+        assert tests_entry == {"tests_ref": task["tests_ref"]}
+
+    # Resuming the run reads every result back from the store without calling the LLM.
+    requests = simulated_llm.stats()["requests"]
+    resumed = dict(context_variables)
+    resumed.update(DeveloperAgent().implement_tasks(resumed).context_variables)
+    resumed.update(testing.TestingAgent().test_tasks(resumed).context_variables)
+    assert simulated_llm.stats()["requests"] == requests
+    assert [task["tests_ref"] for task in resumed["tested_tasks"]] == [
+        task["tests_ref"] for task in context_variables["tested_tasks"]
+    ]
@@ -0,0 +1,115 @@
+import sqlite3
+
+from autodev.core import context as context_module
+from autodev.core.checkpoint import RunJournal
+from autodev.core.context import ContextDiff, ContextStore
+from autodev.core.swarm import Swarm
+from autodev.core.types import Result
+
+
+def test_snapshots_are_frozen_and_diffs_list_changed_keys():
+    store = ContextStore({"name": "demo", "tasks": [1, 2]})
+    before = store.snapshot()
+    store["architecture"] = "layers"
+    store["tasks"] = [1, 2, 3]
+    del store["name"]
+    after = store.snapshot()
+
+    assert dict(before) == {"name": "demo", "tasks": [1, 2]}
+    assert store == {"tasks": [1, 2, 3], "architecture": "layers"}
+    assert "name" not in store and "name" in before
+    assert after.version == before.version + 1
+    diff = store.diff(before)
+    assert diff.updated == {"architecture": "layers", "tasks": [1, 2, 3]}
+    assert diff.removed == ["name"]
+    # Rewriting a value with an equal one is not a change.
+    store["architecture"] = "layers"
+    assert not store.diff(after)
+    assert store.snapshot() is not after and not store.diff(after)
+
+
+def test_diff_survives_flattening_of_a_deep_chain(monkeypatch):
+    monkeypatch.setattr(context_module, "MAX_DEPTH", 3)
+    store = ContextStore({"hop": 0})
+    first = store.snapshot()
+    for hop in range(1, 6):
+        store["hop"] = hop
+        store[f"key{hop}"] = hop
+        store.snapshot()
+    assert store._base.depth <= 3
+    assert store.diff(first).keys == ["hop", "key1", "key2", "key3", "key4", "key5"]
+    assert first["hop"] == 0 and "key1" not in first
+
+
+def test_repr_does_not_format_values():
+    store = ContextStore({"code": "x" * 100_000, "tasks": [{}] * 3})
+    assert repr(store) == "ContextStore(version=0, code=str[100000], tasks=list[3])"
+    assert "xxx" not in repr(ContextDiff({"code": "x" * 100_000}))
+
+
+def test_swarm_reports_what_each_agent_changed():
+    class Architect:
+        name = "SolutionArchitectAgent"
+
+        def execute(self, context_variables):
+            context_variables["architecture"] = "layers"
+            return Result(value="done", agent="DeveloperAgent", context_variables={"tasks": [1]})
+
+    response = Swarm({"SolutionArchitectAgent": Architect()}).run(
+        "SolutionArchitectAgent", {"project_name": "demo"}
+    )
+    assert isinstance(response.context_variables, ContextStore)
+    assert response.context_variables == {"project_name": "demo", "architecture": "layers", "tasks": [1]}
+    assert response.changes.updated == {"architecture": "layers", "tasks": [1]}
+
+
+def test_journal_replays_delta_checkpoints(tmp_path):
+    journal = RunJournal(str(tmp_path / "runs.sqlite3"))
+    run_id = journal.start_run()
+    store = ContextStore({"project_name": "demo", "draft": "x"})
+    journal.checkpoint(run_id, 0, "ArchitectAgent", store)
+    before = store.snapshot()
+    store["tasks"] = [1, 2]
+    del store["draft"]
+    journal.checkpoint(run_id, 1, "DeveloperAgent", store, store.diff(before))
+    before = store.snapshot()
+    store["implemented_tasks"] = [1]
+    journal.checkpoint(run_id, 2, "TestingAgent", store, store.diff(before))
+
+    assert journal.last_checkpoint(run_id) == (
+        2, "TestingAgent", {"project_name": "demo", "tasks": [1, 2], "implemented_tasks": [1]}
+    )
+
+
+def test_journal_adds_delta_column_to_old_databases(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE checkpoints (run_id TEXT NOT NULL, hop INTEGER NOT NULL, agent TEXT, "
+        "context TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (run_id, hop))"
+    )
+    conn.execute("INSERT INTO checkpoints VALUES ('old', 3, 'TestingAgent', '{\"a\": 1}', 0)")
+    conn.commit()
+    conn.close()
+    assert RunJournal(path).last_checkpoint("old") == (3, "TestingAgent", {"a": 1})
+
+
+def test_journal_tracks_run_status_and_finished_tasks(tmp_path):
+    journal = RunJournal.open(str(tmp_path / "runs.sqlite3"))
+    assert RunJournal.open(str(tmp_path / "runs.sqlite3")) is journal
+    first, second = journal.start_run(), journal.start_run()
+    journal.finish_run(second)
+    assert journal.run_status(second) == "completed" and journal.run_status("missing") is None
+    assert journal.latest_run() == first
+    journal.finish_run(first, "failed")
+    assert journal.latest_run() == first
+    journal.finish_run(first)
+    assert journal.latest_run() is None
+    assert journal.latest_run(unfinished_only=False) in (first, second)
+
+    assert journal.completed_task(first, "DeveloperAgent", "code:1:app.py") is None
+    journal.record_task(first, "DeveloperAgent", "code:1:app.py", {"code_ref": "sha256:aa"})
+    journal.record_task(first, "DeveloperAgent", "code:1:app.py", {"code_ref": "sha256:bb"})
+    assert journal.completed_task(first, "DeveloperAgent", "code:1:app.py") == {"code_ref": "sha256:bb"}
+    assert journal.completed_task(second, "DeveloperAgent", "code:1:app.py") is None
+    assert journal.completed_task(first, "TestingAgent", "code:1:app.py") is None
@@ -0,0 +1,106 @@
+import logging
+import os
+import subprocess
+
+import pytest
+
+from autodev.services.git_manager import GitManagerService
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "AutoDev")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "autodev@example.com")
+    git_manager = GitManagerService(str(tmp_path))
+    yield git_manager
+    git_manager.close()
+
+
+def write(repo, path, content, executable=False):
+    full_path = os.path.join(repo.repo_path, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as project_file:
+        project_file.write(content)
+    os.chmod(full_path, 0o755 if executable else 0o644)
+    return full_path
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", *args], cwd=repo.repo_path, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_commit_batch_makes_one_commit_per_task(repo):
+    commits = [
+        ("Implement task 1", [write(repo, "src/app.py", "print('app')\n")]),
+        ("Implement task 2", ["src/util.py"]),
+        ("Implement task 3", [write(repo, "run.sh", "#!/bin/sh\n", executable=True)]),
+    ]
+    write(repo, "src/util.py", "VALUE = 1\n")
+    assert repo.commit_batch(commits) == 3
+    assert git(repo, "log", "--format=%s").split("\n")[:3] == [
+        "Implement task 3", "Implement task 2", "Implement task 1"
+    ]
+    assert git(repo, "show", "HEAD~1:src/util.py") == "VALUE = 1\n"
+    assert "100755 blob" in git(repo, "ls-tree", "HEAD", "run.sh")
+    # The index follows the new HEAD, so nothing shows up as staged or modified.
+    assert git(repo, "status", "--porcelain") == ""
+
+
+def test_commit_batch_squashes_and_skips_unchanged_files(repo):
+    write(repo, "src/app.py", "print('app')\n")
+    write(repo, "src/util.py", "VALUE = 1\n")
+    repo.commit_batch([("Initial", ["src/app.py", "src/util.py"])])
+    head = repo.rev_parse("HEAD")
+
+    write(repo, "src/util.py", "VALUE = 2\n")
+    write(repo, "src/new.py", "NEW = True\n")
+    os.remove(os.path.join(repo.repo_path, "src/app.py"))
+    created = repo.commit_batch(
+        [("Task 1", ["src/app.py"]), ("Task 2", ["src/util.py", "src/new.py"])],
+        per_commit=False,
+        squash_message="Implement tasks",
+    )
+    assert created == 1
+    assert git(repo, "log", "-1", "--format=%s|%P").strip() == f"Implement tasks|{head}"
+    assert git(repo, "ls-tree", "-r", "--name-only", "HEAD").split() == ["src/new.py", "src/util.py"]
+
+    # Committing the same content again creates nothing.
+    assert repo.commit_batch([("Task 2 again", ["src/util.py", "src/new.py"])]) == 0
+    assert repo.commit_batch([]) == 0
+    assert git(repo, "rev-list", "--count", "HEAD") == "2\n"
+
+
+def test_repo_state_is_shared_and_read_through_one_cat_file_process(repo):
+    assert GitManagerService.for_repo(repo.repo_path) is GitManagerService.for_repo(repo.repo_path + "/")
+    assert repo.rev_parse("HEAD") is None
+    write(repo, "README.md", "# Demo\n")
+    repo.commit_batch([("Add README", ["README.md"])])
+    process = repo._cat_file._process
+    assert repo.read_object("HEAD:README.md") == b"# Demo\n"
+    assert repo.rev_parse("HEAD") == git(repo, "rev-parse", "HEAD").strip()
+    assert repo._cat_file._process is process
+    assert repo.branch_ref().startswith("refs/heads/")
+    assert not repo.has_remote()
+    GitManagerService.close_all()
+
+
+def test_commit_tells_an_empty_index_from_a_failure(repo, caplog):
+    caplog.set_level(logging.INFO)
+    repo.commit("Nothing staged yet")
+    assert "Nothing to commit." in caplog.text
+    write(repo, "app.py", "print('app')\n")
+    repo.add()
+    repo.commit("Add app")
+    assert git(repo, "log", "--format=%s") == "Add app\n"
+
+    caplog.clear()
+    write(repo, "app.py", "print('changed')\n")
+    repo.add()
+    # Another git process holds the index lock.
+    open(os.path.join(repo.repo_path, ".git", "index.lock"), "w").close()
+    repo.commit("Change app")
+    assert "Nothing to commit." not in caplog.text
+    assert "Failed to commit 'Change app'" in caplog.text and "index.lock" in caplog.text
@@ -0,0 +1,322 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from github import Auth, Github, GithubException
+
+from autodev.services import github_service, github_transport
+from autodev.services.github_service import GitHubService, GitHubSettings
+from autodev.services.github_transport import RateLimitBudget
+
+
+class GitDataStub:
+    """Just enough of the GitHub REST API for GitHubService, kept in memory."""
+
+    def __init__(self, base_url, login="octo", repo="demo"):
+        self.base_url = base_url
+        self.exists = True
+        self.login = login
+        self.repo_url = f"{base_url}/repos/{login}/{repo}"
+        self.repo = repo
+        self.blobs, self.trees, self.commits, self.refs = {}, {}, {}, {}
+        self.modes = {}
+        # Status to answer a route (e.g. "GET <repo>") with instead of handling it.
+        self.errors = {}
+        self.requests = Counter()
+        self.not_modified = 0
+        self.rate_limit, self.rate_remaining, self.rate_reset = 5000, 5000, int(time.time()) + 3600
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def sha(*parts):
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def repo_json(self):
+        return {"name": self.repo, "full_name": f"{self.login}/{self.repo}",
+                "url": self.repo_url, "default_branch": "main"}
+
+    def commit_json(self, sha):
+        tree = self.commits[sha]["tree"]
+        return {"sha": sha, "url": f"{self.repo_url}/git/commits/{sha}",
+                "tree": {"sha": tree, "url": f"{self.repo_url}/git/trees/{tree}"},
+                "parents": [{"sha": parent} for parent in self.commits[sha]["parents"]]}
+
+    def ref_json(self, branch):
+        sha = self.refs[branch]
+        return {"ref": f"refs/heads/{branch}", "url": f"{self.repo_url}/git/refs/heads/{branch}",
+                "object": {"sha": sha, "type": "commit", "url": f"{self.repo_url}/git/commits/{sha}"}}
+
+    def new_commit(self, branch, entries, parents):
+        tree = self.sha("tree", entries)
+        self.trees[tree] = entries
+        sha = self.sha("commit", tree, parents)
+        self.commits[sha] = {"tree": tree, "parents": parents}
+        self.refs[branch] = sha
+        return sha
+
+    def files(self, branch="main"):
+        tree = self.trees[self.commits[self.refs[branch]]["tree"]]
+        return {path: base64.b64decode(self.blobs[sha]).decode() for path, sha in tree.items()}
+
+    def handle(self, method, path, body):
+        repo_path = f"/repos/{self.login}/{self.repo}"
+        with self.lock:
+            route = re.sub(r"[0-9a-f]{40}", "<sha>", path.replace(repo_path, "<repo>"))
+            self.requests[f"{method} {route}"] += 1
+            if f"{method} {route}" in self.errors:
+                return self.errors[f"{method} {route}"], {"message": "Forbidden"}
+            if method == "GET" and path == "/user":
+                return 200, {"login": self.login, "url": f"{self.base_url}/users/{self.login}"}
+            if method == "GET" and path == repo_path + "/contents/README.md":
+                if "README.md" not in self.trees.get(self.commits.get(self.refs.get("main"), {}).get("tree"), {}):
+                    return 404, {"message": "Not Found"}
+                return 200, {"type": "file", "path": "README.md"}
+            if method == "POST" and path == "/user/repos":
+                if body["name"] != self.repo or self.exists:
+                    return 422, {"message": "Repository creation failed."}
+                self.exists = True
+                return 201, self.repo_json()
+            if not self.exists and path.startswith(repo_path):
+                return 404, {"message": "Not Found"}
+            if method == "GET" and path == repo_path:
+                return 200, self.repo_json()
+            empty = not self.refs
+            match = re.fullmatch(repo_path + r"/contents/(.+)", path)
+            if match and method == "PUT":
+                branch, parents = body.get("branch", "main"), []
+                entries = {}
+                if branch in self.refs:
+                    parents = [self.refs[branch]]
+                    entries = dict(self.trees[self.commits[parents[0]]["tree"]])
+                blob = self.sha("blob", body["content"])
+                self.blobs[blob] = body["content"]
+                entries[match.group(1)] = blob
+                self.modes[match.group(1)] = "100644"
+                sha = self.new_commit(branch, entries, parents)
+                return 201, {"content": {"type": "file", "path": match.group(1), "sha": blob},
+                             "commit": self.commit_json(sha)}
+            if empty and method == "POST" and path in (repo_path + "/git/blobs", repo_path + "/git/trees"):
+                return 409, {"message": "Git Repository is empty."}
+            match = re.fullmatch(repo_path + r"/git/refs?/heads/(.+)", path)
+            if match and method == "GET":
+                if empty:
+                    return 409, {"message": "Git Repository is empty."}
+                if match.group(1) not in self.refs:
+                    return 404, {"message": "Not Found"}
+                return 200, self.ref_json(match.group(1))
+            if match and method == "PATCH":
+                branch = match.group(1)
+                if not body.get("force") and self.refs[branch] not in self.commits[body["sha"]]["parents"]:
+                    return 422, {"message": "Update is not a fast forward"}
+                self.refs[branch] = body["sha"]
+                return 200, self.ref_json(branch)
+            match = re.fullmatch(repo_path + r"/git/commits/([0-9a-f]+)", path)
+            if match and method == "GET":
+                return 200, self.commit_json(match.group(1))
+            if method == "POST" and path == repo_path + "/git/blobs":
+                sha = self.sha("blob", body["content"])
+                self.blobs[sha] = body["content"]
+                return 201, {"sha": sha, "url": f"{self.repo_url}/git/blobs/{sha}"}
+            if method == "POST" and path == repo_path + "/git/trees":
+                entries = dict(self.trees.get(body.get("base_tree"), {}))
+                entries.update({entry["path"]: entry["sha"] for entry in body["tree"]})
+                self.modes.update({entry["path"]: entry["mode"] for entry in body["tree"]})
+                sha = self.sha("tree", entries)
+                self.trees[sha] = entries
+                return 201, {"sha": sha, "url": f"{self.repo_url}/git/trees/{sha}", "tree": []}
+            if method == "POST" and path == repo_path + "/git/commits":
+                sha = self.sha("commit", body)
+                self.commits[sha] = {"tree": body["tree"], "parents": body["parents"]}
+                return 201, self.commit_json(sha)
+            if method == "POST" and path == repo_path + "/git/refs":
+                branch = body["ref"][len("refs/heads/"):]
+                self.refs[branch] = body["sha"]
+                return 201, self.ref_json(branch)
+        return 404, {"message": "Not Found"}
+
+
+@pytest.fixture
+def github_stub():
+    stub_holder = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            stub = stub_holder["stub"]
+            status, payload = stub.handle(self.command, self.path, body)
+            data = json.dumps(payload).encode()
+            etag = f'"{hashlib.sha1(data).hexdigest()}"'
+            with stub.lock:
+                if self.command == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+                    stub.not_modified += 1
+                    status, data = 304, b""
+                else:
+                    stub.rate_remaining -= 1
+                rate_headers = {"X-RateLimit-Limit": stub.rate_limit, "X-RateLimit-Remaining": stub.rate_remaining,
+                                "X-RateLimit-Reset": stub.rate_reset, "X-RateLimit-Resource": "core"}
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            for name, value in rate_headers.items():
+                self.send_header(name, str(value))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_PUT = _respond
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    stub = stub_holder["stub"] = GitDataStub(f"http://127.0.0.1:{server.server_address[1]}")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield stub
+    github_service._logins.clear()
+    github_transport._shared.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def service_for(stub):
+    return GitHubService(GitHubSettings(token="test-token", base_url=stub.base_url, max_workers=8))
+
+
+def test_commit_files_makes_one_commit_for_many_files(github_stub):
+    service = service_for(github_stub)
+    service.commit_code("demo", "README.md", "# Demo\n")
+    files = {f"src/module_{index}.py": f"VALUE = {index}\n" for index in range(150)}
+
+    first = service.commit_files("demo", files, "Add generated project")
+    assert first and github_stub.refs["main"] == first
+    assert github_stub.files() == dict(files, **{"README.md": "# Demo\n"})
+    assert github_stub.requests["POST <repo>/git/blobs"] == 150
+    assert github_stub.requests["POST <repo>/git/commits"] == 1
+    assert github_stub.requests["PATCH <repo>/git/refs/heads/main"] == 1
+
+    second = service.commit_files("demo", {"src/module_0.py": "VALUE = 'changed'\n"}, "Update one file")
+    assert github_stub.commits[second]["parents"] == [first]
+    assert github_stub.files()["src/module_0.py"] == "VALUE = 'changed'\n"
+    assert len(github_stub.files()) == 151
+    assert github_stub.requests["PATCH <repo>/git/refs/heads/main"] == 2
+    # The repository is looked up once and cached.
+    assert github_stub.requests["GET <repo>"] == 1
+
+    # A new branch starts with a parentless commit.
+    third = service.commit_files("demo", {"notes.md": "draft\n"}, "Start notes", branch="notes")
+    assert github_stub.commits[third]["parents"] == [] and github_stub.files("notes") == {"notes.md": "draft\n"}
+    assert github_stub.requests["POST <repo>/git/refs"] == 1
+
+
+def test_new_repository_is_seeded_before_the_git_data_upload(github_stub):
+    github_stub.exists = False
+    service = service_for(github_stub)
+    service.create_repository("demo")
+    assert github_stub.requests["POST /user/repos"] == 1
+    assert service.repository_exists("demo")
+
+    files = {"README.md": "# Demo\n", "app.py": "print('hi')\n", "run.sh": "#!/bin/sh\n"}
+    sha = service.commit_files("demo", files, "Upload project", modes={"run.sh": "100755"})
+    # The empty repository refuses blobs, so README.md goes through the contents API first.
+    assert sha and github_stub.refs["main"] == sha
+    assert github_stub.files() == files
+    assert github_stub.modes == {"README.md": "100644", "app.py": "100644", "run.sh": "100755"}
+    assert github_stub.requests["PUT <repo>/contents/README.md"] == 1
+    assert github_stub.requests["POST <repo>/git/blobs"] == 2
+    assert len(github_stub.commits) == 2
+
+
+def test_failed_existence_checks_are_not_taken_as_missing(github_stub, caplog):
+    github_stub.exists = False
+    github_stub.errors["GET <repo>"] = 403
+    service = service_for(github_stub)
+    with pytest.raises(GithubException) as excinfo:
+        service.repository_exists("demo")
+    assert excinfo.value.status == 403
+    # create_repository logs the failure instead of creating the repository blindly.
+    service.create_repository("demo")
+    assert "Failed to create repository 'demo'" in caplog.text
+    assert github_stub.requests["POST /user/repos"] == 0
+
+
+def test_commit_directory_skips_metadata(github_stub, tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('hi')\n", encoding="utf-8")
+    (tmp_path / ".autodev").mkdir()
+    (tmp_path / ".autodev" / "manifest.json").write_text("{}", encoding="utf-8")
+    service = service_for(github_stub)
+    service.commit_code("demo", "README.md", "# Demo\n")
+    assert service.commit_directory("demo", str(tmp_path), "Upload project")
+    assert github_stub.files() == {"README.md": "# Demo\n", "src/app.py": "print('hi')\n"}
+
+
+def test_commit_directory_keeps_executable_bits(github_stub, tmp_path):
+    (tmp_path / "run.sh").write_text("#!/bin/sh\necho hi\n", encoding="utf-8")
+    (tmp_path / "run.sh").chmod(0o755)
+    (tmp_path / "app.py").write_text("print('hi')\n", encoding="utf-8")
+    (tmp_path / "app.py").chmod(0o644)
+    assert service_for(github_stub).commit_directory("demo", str(tmp_path), "Upload project")
+    assert github_stub.modes == {"run.sh": "100755", "app.py": "100644"}
+
+
+def test_auth_is_memoized_and_repeated_reads_are_conditional(github_stub):
+    service = service_for(github_stub)
+    assert [service_for(github_stub).login for _ in range(3)] == ["octo"] * 3
+    assert github_stub.requests["GET /user"] == 1
+
+    assert service.repository_exists("demo") and not service.repository_exists("other")
+    repo = service.get_repository("demo")
+    assert not service.file_exists(repo, "README.md")
+    service.commit_code("demo", "README.md", "# Demo\n")
+    spent, not_modified = github_stub.rate_limit - github_stub.rate_remaining, github_stub.not_modified
+    assert all(service.file_exists(repo, "README.md") for _ in range(5))
+    # Repeats of the same GET are answered with 304 and cost no quota.
+    assert github_stub.not_modified == not_modified + 4
+    assert github_stub.rate_limit - github_stub.rate_remaining == spent + 1
+    assert service.cache.hits == github_stub.not_modified
+    assert service.rate_limit()["core"]["remaining"] == github_stub.rate_remaining
+
+
+def test_conditional_gets_survive_reconnects(github_stub):
+    service = service_for(github_stub)
+    requester = service.github.requester
+    assert requester.requestJson("GET", "/repos/octo/demo")[0] == 200
+    # The client's connection is closed and reopened lazily by the next request.
+    service.github.close()
+    not_modified = github_stub.not_modified
+    assert requester.requestJson("GET", "/repos/octo/demo")[0] == 200
+    assert github_stub.not_modified == not_modified + 1
+    # A client built without the transport is left alone.
+    plain = Github(base_url=github_stub.base_url, auth=Auth.Token("test-token"))
+    not_modified = github_stub.not_modified
+    assert plain.requester.requestJson("GET", "/repos/octo/demo")[0] == 200
+    assert github_stub.not_modified == not_modified
+
+
+def test_budget_paces_low_quota_and_waits_for_reset(monkeypatch):
+    now = [1000.0]
+    slept = []
+    monkeypatch.setattr(github_transport.time, "time", lambda: now[0])
+    monkeypatch.setattr(github_transport.time, "sleep", slept.append)
+    budget = RateLimitBudget(reserve=10, pace_below=0.1)
+    assert budget.resource("https://api.github.com/search/code") == "search"
+
+    budget.update({"x-ratelimit-limit": "5000", "x-ratelimit-remaining": "4000", "x-ratelimit-reset": "4600"})
+    assert budget.acquire("core") == 0 and slept == []
+
+    # 110 left for 3600 s: one request every 36 s once the next slots are taken.
+    budget.update({"x-ratelimit-limit": "5000", "x-ratelimit-remaining": "110", "x-ratelimit-reset": "4600"})
+    waits = [budget.acquire("core") for _ in range(3)]
+    assert waits[0] == 0 and waits[1] == pytest.approx(36) and waits[2] > waits[1]
+
+    budget.update({"x-ratelimit-limit": "5000", "x-ratelimit-remaining": "10", "x-ratelimit-reset": "2000"})
+    assert budget.acquire("core") == pytest.approx(1001)
+    now[0] = 2001.0
+    assert budget.acquire("core") == 0
@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from autodev.agents import solution_architect
+from autodev.agents.task_decomposer import TaskDecomposerAgent
+from autodev.services import llm_cache
+from autodev.services.json_stream import JSONStreamParser, MissingJSONError, parse_json_stream
+from autodev.services.llm_simulator import _decomposition
+
+
+def chunked(text, size):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 64])
+def test_array_elements_are_emitted_as_they_close(size):
+    plan = _decomposition("A todo list.", 20)
+    text = "Here are the tasks [in order]:\n```json\n" + plan + "\n```\nLet me know {if} that works."
+    parser = JSONStreamParser()
+    seen, first_at = [], None
+    for offset, chunk in enumerate(chunked(text, size)):
+        seen.extend(parser.feed(chunk))
+        if seen and first_at is None:
+            first_at = offset * size
+    # The first task is available long before the rest of the plan has been written.
+    assert first_at < len(text) // 10
+    assert seen == json.loads(plan) == parser.finish()
+    assert len(parser._buffer) < 400
+
+
+def test_object_members_and_nested_items():
+    document = {
+        "architecture": 'Handles "quoted" text, {braces} and [brackets]\\n',
+        "programming_language": "python",
+        "tasks": [{"task_id": 1, "file_path": "src/a.py", "meta": {"tags": ["x}", {"y": None}]}}, 7, "s"],
+        "file_structure": ["src/a.py"],
+        "ratio": -1.5e3,
+        "final": True,
+    }
+    members_at_first_task = []
+
+    def on_item(task, parser):
+        if not members_at_first_task:
+            members_at_first_task.append(dict(parser.members))
+
+    result = parse_json_stream(chunked(json.dumps(document, indent=2), 5), items="tasks", on_item=on_item)
+    assert result == document
+    assert members_at_first_task == [{"architecture": document["architecture"], "programming_language": "python"}]
+
+
+@pytest.mark.parametrize("size", [1, 64])
+def test_brackets_in_leading_prose_are_skipped(size):
+    document = {"architecture": "Layers.", "tasks": [{"task_id": 1}, {"task_id": 2}]}
+    text = "Here is the plan {as requested} [{in order}] {}:\n```json\n" + json.dumps(document) + "\n```"
+    assert parse_json_stream(chunked(text, size), items="tasks") == document
+    tasks = "Tasks [1, 2] [{see below}]:\n" + json.dumps(document["tasks"])
+    assert parse_json_stream(chunked(tasks, size)) == document["tasks"]
+
+
+def test_missing_and_unterminated_documents():
+    with pytest.raises(MissingJSONError):
+        parse_json_stream(["No plan [yet]."])
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_stream(['[{"task_id": 1}, {"task_id"'])
+
+
+def test_architect_scaffolds_files_while_streaming(simulated_llm, tmp_path, monkeypatch):
+    context_variables = {"output_dir": str(tmp_path), "project_name": "demo", "project_description": "A todo list."}
+    context_variables.update(TaskDecomposerAgent().decompose_project(context_variables).context_variables)
+    stream_llm = solution_architect.stream_llm
+    first_file = os.path.join(tmp_path, "demo", "src", "component_1.py")
+    scaffolded_mid_stream = []
+
+    def observed_stream(*args, **kwargs):
+        for chunk in stream_llm(*args, **kwargs):
+            if os.path.isfile(first_file) and not scaffolded_mid_stream:
+                scaffolded_mid_stream.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr(solution_architect, "stream_llm", observed_stream)
+    result = solution_architect.SolutionArchitectAgent().architect_solution(context_variables)
+    assert result.context_variables["programming_language"] == "python"
+    assert scaffolded_mid_stream and "file_structure" not in "".join(scaffolded_mid_stream)
+    for task in result.context_variables["tasks"]:
+        assert os.path.isfile(os.path.join(tmp_path, "demo", task["file_path"]))
+
+
+def test_streamed_plans_are_cached(simulated_llm, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTODEV_LLM_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    first = TaskDecomposerAgent().decompose_project({"project_description": "A todo list."})
+    requests = simulated_llm.stats()["requests"]
+    second = TaskDecomposerAgent().decompose_project({"project_description": "A todo list."})
+    assert second.context_variables["tasks"] == first.context_variables["tasks"]
+    assert simulated_llm.stats()["requests"] == requests
@@ -0,0 +1,79 @@
+import pytest
+
+from autodev.services import llm_cache
+from autodev.services.llm_cache import LLMResponseCache, make_cache_key
+from autodev.services.llm_service import LLMRequestError, call_llm
+
+
+@pytest.fixture
+def response_cache(simulated_llm, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUTODEV_LLM_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    yield llm_cache.get_response_cache()
+    llm_cache._cache.close()
+
+
+def test_keys_cover_model_prompt_and_token_limit():
+    key = make_cache_key("o1-mini", "prompt", 100)
+    assert key == make_cache_key("o1-mini", "prompt", 100)
+    assert len({key, make_cache_key("gpt-4o", "prompt", 100),
+                make_cache_key("o1-mini", "prompt!", 100), make_cache_key("o1-mini", "prompt", 200)}) == 4
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = LLMResponseCache(str(tmp_path), ttl=60)
+    cache.set("key", "response")
+    now[0] += 59
+    assert cache.get("key") == "response"
+    now[0] += 2
+    assert cache.get("key") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = LLMResponseCache(str(tmp_path), max_bytes=10)
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.set(key, key * 4)
+    now[0] += 1
+    assert cache.get("a") == "aaaa"
+    now[0] += 1
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 8
+    # A response larger than the whole cache is not stored at all.
+    cache.set("d", "d" * 11)
+    assert cache.get("d") is None and cache.stats()["entries"] == 2
+
+
+def test_empty_responses_are_not_cached(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    cache.set("key", "")
+    assert cache.get("key") is None and cache.stats()["entries"] == 0
+
+
+def test_call_llm_replays_cached_responses(response_cache, simulated_llm):
+    prompt = "You are the Developer Agent.\nTarget File: src/app.py"
+    first = call_llm(prompt)
+    requests = simulated_llm.stats()["requests"]
+    assert call_llm(prompt) == first
+    assert simulated_llm.stats()["requests"] == requests
+    assert response_cache.stats()["hits"] == 1
+    # use_cache=False always goes to the provider.
+    call_llm(prompt, use_cache=False)
+    assert simulated_llm.stats()["requests"] == requests + 1
+
+
+def test_failed_calls_are_not_cached(response_cache, simulated_llm):
+    simulated_llm.settings.rate_limit_rate = 1.0
+    with pytest.raises(LLMRequestError):
+        call_llm("anything")
+    assert response_cache.stats()["entries"] == 0
+    simulated_llm.settings.rate_limit_rate = 0.0
+    assert call_llm("anything")
+    assert response_cache.stats()["entries"] == 1
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from autodev.services.llm_hedge import HedgeBudget, HedgeSettings, Hedger, LatencyTracker
+
+
+def test_latency_percentiles_need_enough_samples():
+    tracker = LatencyTracker(window=10)
+    for seconds in range(1, 21):
+        tracker.record("model", float(seconds))
+    # Only the last ten samples (11..20) are kept.
+    assert tracker.percentile("model", 0.5) == 16.0
+    assert tracker.percentile("model", 0.99) == 20.0
+    assert tracker.percentile("model", 0.5, min_samples=11) is None
+    assert tracker.percentile("other", 0.5) is None
+
+
+def test_hedge_budget_is_earned_per_request_and_capped():
+    budget = HedgeBudget(ratio=0.5, burst=1.0)
+    assert not budget.try_spend()
+    for _ in range(5):
+        budget.earn()
+    assert budget.credits == 1.0
+    assert budget.try_spend() and not budget.try_spend()
+
+
+def hedger_for(**settings):
+    hedger = Hedger(HedgeSettings(enabled=True, percentile=0.5, min_samples=1, min_delay=0.01, **settings))
+    hedger.latencies.record("model", 0.01)
+    return hedger
+
+
+def slow_then_fast(cancelled):
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "primary"
+        return "hedge"
+
+    return attempt
+
+
+def test_slow_requests_are_hedged_and_the_loser_cancelled():
+    hedger = hedger_for(budget_ratio=1.0, budget_burst=1.0)
+    cancelled = []
+    assert asyncio.run(hedger.race("model", slow_then_fast(cancelled))) == "hedge"
+    assert cancelled == [True]
+    assert hedger.stats()["hedged"] == 1 and hedger.stats()["hedge_wins"] == 1
+
+
+def test_hedges_stop_when_the_budget_is_spent():
+    hedger = hedger_for(budget_ratio=0.5, budget_burst=1.0)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    assert asyncio.run(hedger.race("model", attempt)) == "done"
+    assert len(calls) == 1 and hedger.stats()["over_budget"] == 1
+
+
+def test_requests_without_latency_history_are_not_hedged():
+    hedger = Hedger(HedgeSettings(enabled=True, min_samples=5, budget_ratio=1.0))
+    hedger.latencies.record("model", 0.01)
+    cancelled = []
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(hedger.race("model", slow_then_fast(cancelled)), 0.1))
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_a_failed_primary_falls_back_to_the_hedge():
+    hedger = hedger_for(budget_ratio=1.0, budget_burst=1.0)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise ConnectionError("reset")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    # The blocking form runs the race on the hedger's own loop thread.
+    assert hedger.run("model", attempt) == "hedge"
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_a_cancelled_primary_falls_back_to_the_hedge():
+    hedger = hedger_for(budget_ratio=1.0, budget_burst=1.0)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise asyncio.CancelledError()
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    assert asyncio.run(hedger.race("model", attempt)) == "hedge"
+    assert hedger.stats()["hedge_wins"] == 1
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+from autodev.services import llm_providers
+from autodev.services.llm_providers import (
+    ClientSettings,
+    aclose_async_client,
+    close_openai_clients,
+    get_async_client,
+    get_client,
+)
+
+
+@pytest.fixture
+def openai_env(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    close_openai_clients()
+    yield
+    close_openai_clients()
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("AUTODEV_LLM_MAX_CONNECTIONS", "50")
+    monkeypatch.setenv("AUTODEV_LLM_HTTP2", "yes")
+    monkeypatch.setenv("AUTODEV_LLM_TIMEOUT", "30")
+    settings = ClientSettings.from_env()
+    assert (settings.max_connections, settings.http2, settings.timeout) == (50, True, 30.0)
+    assert settings.max_retries == 0
+
+
+def test_one_client_is_shared_by_every_thread(openai_env):
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(clients) == 8 and all(client is clients[0] for client in clients)
+    # Retries are left to the scheduler, which also sees the 429s.
+    assert clients[0].max_retries == 0
+
+    close_openai_clients()
+    assert get_client() is not clients[0]
+
+
+def test_missing_api_key_is_reported(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    close_openai_clients()
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        get_client()
+
+
+def test_async_clients_belong_to_their_event_loop(openai_env):
+    async def clients():
+        first = get_async_client()
+        assert get_async_client() is first
+        await aclose_async_client()
+        assert first.is_closed() and get_async_client() is not first
+        return get_async_client()
+
+    loop_a = asyncio.new_event_loop()
+    loop_b = asyncio.new_event_loop()
+    try:
+        assert loop_a.run_until_complete(clients()) is not loop_b.run_until_complete(clients())
+        assert len(llm_providers._async_clients) == 2
+    finally:
+        loop_a.close()
+        loop_b.close()
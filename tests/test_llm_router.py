@@ -0,0 +1,70 @@
+import asyncio
+
+from autodev.services.llm_router import ProviderHealth, ProviderRouter, reset_router
+from autodev.services.llm_service import acall_llm, call_llm
+from autodev.services.llm_simulator import SimulatedProvider, SimulationSettings
+
+
+def provider(name, **settings):
+    simulated = SimulatedProvider(
+        SimulationSettings(latency_median=0, tokens_per_second=0, retry_after=0, seed=0, **settings),
+        default_model=f"{name}-model",
+    )
+    simulated.name = name
+    return simulated
+
+
+def names(routes):
+    return [route.provider.name for route in routes]
+
+
+def test_routes_prefer_the_default_then_the_fastest_provider():
+    router = ProviderRouter(
+        {name: provider(name) for name in ("openai", "anthropic", "local")}, "anthropic",
+        routes={"testing_agent": "local"},
+    )
+    assert names(router.routes_for())[0] == "anthropic"
+    assert names(router.routes_for("testing_agent"))[0] == "local"
+    # An explicit model applies to the default provider only.
+    assert [route.model for route in router.routes_for(model="claude-x")] == [
+        "claude-x", "openai-model", "local-model"
+    ]
+
+    for _ in range(3):
+        router.health.record("anthropic", 2.0, ok=True)
+        router.health.record("openai", 0.5, ok=True)
+        router.health.record("local", 1.0, ok=True)
+    assert names(router.routes_for()) == ["openai", "local", "anthropic"]
+    # The pinned provider still goes first while it is healthy.
+    assert names(router.routes_for("testing_agent")) == ["local", "openai", "anthropic"]
+
+
+def test_failing_providers_are_routed_around_until_the_cooldown_ends(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("autodev.services.llm_router.time.monotonic", lambda: now[0])
+    health = ProviderHealth(min_samples=3, error_threshold=0.5, cooldown=30)
+    router = ProviderRouter({"openai": provider("openai"), "local": provider("local")}, "openai",
+                            routes={"developer_agent": "openai"}, health=health)
+    health.record("local", 1.0, ok=True)
+    for _ in range(3):
+        health.record("openai", 0.1, ok=False)
+    assert not health.available("openai")
+    # An open circuit is a last resort, even for the agent pinned to it.
+    assert names(router.routes_for("developer_agent")) == ["local", "openai"]
+    now[0] += 31
+    assert health.available("openai")
+    assert names(router.routes_for("developer_agent")) == ["openai", "local"]
+
+
+def test_calls_fail_over_to_the_next_provider(simulated_llm):
+    router = ProviderRouter(
+        {"flaky": provider("flaky", rate_limit_rate=1.0), "steady": provider("steady")}, "flaky"
+    )
+    reset_router(router)
+    assert call_llm("anything", use_cache=False)
+    assert asyncio.run(acall_llm("anything", use_cache=False))
+    stats = router.stats()
+    assert stats["flaky"]["error_rate"] == 1.0 and stats["steady"]["error_rate"] == 0.0
+    assert router.providers["steady"].stats()["completed"] == 2
+    # With its error rate known, the failing provider is no longer tried first.
+    assert names(router.routes_for()) == ["steady", "flaky"]
@@ -0,0 +1,122 @@
+import threading
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from autodev.services import llm_scheduler
+from autodev.services.llm_scheduler import (
+    LLMScheduler,
+    SchedulerSettings,
+    TokenBucket,
+    is_retryable,
+    retry_after,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status, headers=None, code=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.code = code
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def test_token_bucket_spaces_out_reservations():
+    bucket = TokenBucket(60, capacity=2)  # one per second
+    now = bucket.updated
+    assert [bucket.reserve(1, now) for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+    # Idle time refills the debt, but never beyond the capacity.
+    assert bucket.reserve(1, now + 10) == 0.0
+    assert bucket.level == 1.0
+    bucket.adjust(-5)
+    assert bucket.level == 2.0
+
+
+def test_concurrency_grows_additively_and_halves_on_rate_limits():
+    scheduler = LLMScheduler(SchedulerSettings(initial_concurrency=4, max_concurrency=8, decrease_cooldown=60))
+    for _ in range(4):
+        scheduler.run(lambda: "ok")
+    assert scheduler.limit == pytest.approx(5.0, abs=0.1)
+    # Two 429s from requests already in flight count as one congestion signal.
+    for _ in range(2):
+        scheduler.acquire().fail(StatusError(429))
+    assert scheduler.limit == pytest.approx(2.5, abs=0.05)
+    assert scheduler.stats()["rate_limited"] == 2 and scheduler.stats()["in_flight"] == 0
+    for _ in range(100):
+        scheduler.run(lambda: "ok")
+    assert scheduler.limit == 8
+
+
+def test_slow_responses_count_as_congestion():
+    scheduler = LLMScheduler(SchedulerSettings(initial_concurrency=4, target_latency=1.0))
+    lease = scheduler.acquire()
+    lease.started -= 2
+    lease.succeed()
+    assert scheduler.limit == 2
+
+
+def test_retry_after_headers():
+    assert retry_after(StatusError(429, {"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    assert retry_after(StatusError(429, {"retry-after": "3"})) == 3.0
+    assert 25 < retry_after(StatusError(503, {"retry-after": formatdate(time.time() + 30, usegmt=True)})) <= 30
+    assert retry_after(StatusError(429, {"retry-after": "soon"})) is None
+    assert retry_after(StatusError(429)) is None
+
+
+def test_retryable_errors():
+    assert is_retryable(StatusError(429)) and is_retryable(StatusError(500))
+    assert is_retryable(httpx.ConnectTimeout("timed out"))
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(StatusError(429, code="insufficient_quota"))
+
+
+def test_retry_after_pauses_the_whole_queue(monkeypatch):
+    slept = []
+    monkeypatch.setattr(llm_scheduler.time, "sleep", slept.append)
+    scheduler = LLMScheduler(SchedulerSettings(max_retries=1, backoff_base=0.001))
+    calls = []
+
+    def rate_limited_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise StatusError(429, {"retry-after": "2"})
+        return "ok"
+
+    assert scheduler.run(rate_limited_once) == "ok"
+    # The retry waits at least as long as asked, and so does every request admitted meanwhile.
+    assert slept[0] >= 2.0
+    assert slept[1] > 1.9
+    assert scheduler.acquire() is not None and slept[2] > 1.9
+
+    def bad_request():
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        scheduler.run(bad_request)
+    assert scheduler.stats()["retries"] == 1
+
+
+def test_queued_requests_are_admitted_by_priority():
+    scheduler = LLMScheduler(SchedulerSettings(initial_concurrency=1, max_concurrency=1))
+    held = scheduler.acquire()
+    admitted = []
+
+    def request(priority):
+        lease = scheduler.acquire(priority)
+        admitted.append(priority)
+        lease.succeed()
+
+    threads = []
+    for priority in (2, 1, 2, 0):
+        threads.append(threading.Thread(target=request, args=(priority,)))
+        threads[-1].start()
+        while scheduler.stats()["queued"] < len(threads):
+            time.sleep(0.001)
+    held.succeed()
+    for thread in threads:
+        thread.join()
+    assert admitted == [0, 1, 2, 2]
+    assert LLMScheduler.priority_for("task_decomposer_agent") < LLMScheduler.priority_for("testing_agent")
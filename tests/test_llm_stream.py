@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from autodev.agents import testing
+from autodev.services.llm_stream import FenceStripper, spool_to_file, strip_code_fences
+
+
+def feed_all(chunks):
+    stripper = FenceStripper()
+    return "".join(stripper.feed(chunk) for chunk in chunks) + stripper.finish()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("```python\nprint(1)\n```\n", "print(1)"),
+    ("  ```\nx = 1\ny = 2\n```", "x = 1\ny = 2"),
+    ("print(1)\n", "print(1)"),
+    ("```print(1)```", "print(1)"),
+    ("```print(1)", "print(1)"),
+    ("```python", ""),
+    ("", ""),
+])
+def test_strip_code_fences(text, expected):
+    assert strip_code_fences(text) == expected
+    # The result does not depend on how the stream is split.
+    assert feed_all(list(text)) == expected
+
+
+def test_inner_backticks_are_kept():
+    text = "```md\nUse `x` and\n```inner```\nend\n```"
+    assert feed_all([text[:9], text[9:20], text[20:]]) == "Use `x` and\n```inner```\nend"
+
+
+def test_testing_agent_cleans_like_the_developer():
+    assert testing.TestingAgent.clean_tests("```python\nimport unittest\n```") == "import unittest"
+    # The first line is only dropped when it is a fence, not whenever the reply is fenced.
+    assert testing.TestingAgent.clean_tests("```import unittest```") == "import unittest"
+    with pytest.raises(ValueError):
+        testing.TestingAgent.clean_tests("```\n```")
+
+
+def test_spool_to_file_replaces_atomically(tmp_path):
+    path = str(tmp_path / "src" / "app.py")
+    streamed = spool_to_file(["```py", "thon\nprint(", "1)\n``", "`"], path)
+    with open(path, encoding="utf-8") as spooled:
+        assert spooled.read() == "print(1)"
+    assert streamed.size == len("print(1)") and not os.path.exists(path + ".part")
+
+    single_line = spool_to_file(["```print(2)", "```"], path)
+    assert single_line.read() == "print(2)"
+
+    def failing():
+        yield "partial"
+        raise RuntimeError("stream dropped")
+
+    with pytest.raises(RuntimeError):
+        spool_to_file(failing(), path)
+    # A failed stream leaves the previous file in place and no partial file behind.
+    assert single_line.read() == "print(2)" and not os.path.exists(path + ".part")
+
+    # So does a reply that is nothing but a fence.
+    with pytest.raises(ValueError):
+        spool_to_file(["```python\n", "```"], path)
+    assert single_line.read() == "print(2)" and not os.path.exists(path + ".part")
@@ -0,0 +1,60 @@
+import os
+
+from autodev.agents.developer import DeveloperAgent
+from autodev.services.manifest import BuildManifest
+
+from .test_agents import planned_context
+
+
+def test_artifacts_are_reused_only_while_inputs_and_file_match(tmp_path):
+    (tmp_path / ".git" / "info").mkdir(parents=True)
+    (tmp_path / "app.py").write_text("print('app')\n", encoding="utf-8")
+    manifest = BuildManifest(str(tmp_path))
+    fingerprint = BuildManifest.fingerprint("prompt", {"b": 2, "a": 1})
+    assert fingerprint == BuildManifest.fingerprint("prompt", {"a": 1, "b": 2})
+    manifest.record("code:1:app.py", fingerprint, str(tmp_path / "app.py"), "print('app')\n")
+    manifest.save()
+    manifest.save()
+
+    reloaded = BuildManifest(str(tmp_path))
+    assert reloaded.entries["code:1:app.py"]["artifact"] == "app.py"
+    assert reloaded.reuse("code:1:app.py", fingerprint) == "print('app')\n"
+    assert reloaded.is_current("code:1:app.py", fingerprint, "print('app')\n")
+    assert not reloaded.is_current("code:1:app.py", fingerprint, "print('other')\n")
+    assert reloaded.reuse("code:1:app.py", BuildManifest.fingerprint("edited prompt")) is None
+    assert reloaded.reuse("code:2:other.py", fingerprint) is None
+    # A file edited outside the pipeline is regenerated, and so is a deleted one.
+    (tmp_path / "app.py").write_text("print('edited')\n", encoding="utf-8")
+    assert reloaded.reuse("code:1:app.py", fingerprint) is None
+    os.remove(tmp_path / "app.py")
+    assert reloaded.reuse("code:1:app.py", fingerprint) is None
+
+    exclude = (tmp_path / ".git" / "info" / "exclude").read_text(encoding="utf-8")
+    assert exclude.splitlines().count("/.autodev/") == 1
+
+
+def test_unreadable_manifests_are_ignored(tmp_path):
+    (tmp_path / ".autodev").mkdir()
+    (tmp_path / ".autodev" / "manifest.json").write_text("{not json", encoding="utf-8")
+    assert BuildManifest(str(tmp_path)).entries == {}
+
+
+def test_unchanged_tasks_are_not_regenerated(simulated_llm, tmp_path):
+    context_variables = planned_context(tmp_path)
+    DeveloperAgent().implement_tasks(context_variables)
+    requests = simulated_llm.stats()["requests"]
+    DeveloperAgent().implement_tasks(context_variables)
+    assert simulated_llm.stats()["requests"] == requests
+
+    # Only the file edited by hand is generated again.
+    last_task = context_variables["tasks"][-1]
+    edited_path = os.path.join(tmp_path, "demo", last_task["file_path"])
+    with open(edited_path, "w", encoding="utf-8") as edited_file:
+        edited_file.write("# edited\n")
+    DeveloperAgent().implement_tasks(context_variables)
+    assert simulated_llm.stats()["requests"] == requests + 1
+    with open(edited_path, encoding="utf-8") as edited_file:
+        assert edited_file.read() != "# edited\n"
+
+    DeveloperAgent().implement_tasks(dict(context_variables, force_regenerate=True))
+    assert simulated_llm.stats()["requests"] == requests + 1 + len(context_variables["tasks"])
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from autodev.prompts.prompt_builder import (
+    PromptBuilder,
+    compact_json,
+    count_tokens,
+    get_token_budget,
+    truncate_to_tokens,
+)
+
+LONG_TEXT = " ".join(f"word{index}" for index in range(400))
+
+
+def test_truncation_keeps_the_head_or_the_tail():
+    head = truncate_to_tokens(LONG_TEXT, 50)
+    tail = truncate_to_tokens(LONG_TEXT, 50, keep="tail")
+    assert count_tokens(head) <= 50 and LONG_TEXT.startswith(head)
+    assert count_tokens(tail) <= 50 and LONG_TEXT.endswith(tail)
+    assert truncate_to_tokens("short", 50) == "short"
+    assert truncate_to_tokens(LONG_TEXT, 0) == ""
+
+
+def test_budgets_can_be_overridden_per_agent(monkeypatch):
+    monkeypatch.delenv("AUTODEV_PROMPT_BUDGET", raising=False)
+    assert get_token_budget("developer_agent") == 8000
+    assert get_token_budget("unknown_agent") == 16000
+    monkeypatch.setenv("AUTODEV_PROMPT_BUDGET", "1000")
+    monkeypatch.setenv("AUTODEV_PROMPT_BUDGET_DEVELOPER_AGENT", "500")
+    assert get_token_budget("developer_agent") == 500
+    assert get_token_budget("testing_agent") == 1000
+
+
+def test_prompts_within_budget_are_unchanged():
+    prompt = PromptBuilder(10000).add("Instructions").add_elidable("code", LONG_TEXT, prefix="Code:\n").build()
+    assert prompt == f"Instructions\n\nCode:\n{LONG_TEXT}"
+
+
+def test_lowest_priority_sections_are_elided_first():
+    budget = count_tokens(LONG_TEXT) + 100
+    builder = (
+        PromptBuilder(budget)
+        .add("Never shrunk instructions.", name="instructions")
+        .add_elidable("description", LONG_TEXT, priority=1)
+        .add_elidable("context", LONG_TEXT, priority=0, strategy="middle")
+    )
+    prompt = builder.build()
+    assert count_tokens(prompt) <= budget
+    assert prompt.startswith("Never shrunk instructions.\n\n")
+    description, context = prompt.split("\n\n", 1)[1].split("\n\n", 1)
+    # The budget was met by cutting the context alone, keeping both of its ends.
+    assert description == LONG_TEXT
+    assert "tokens elided to fit the token budget" in context
+    assert context.startswith("word0 ") and context.endswith("word399")
+
+
+def test_item_lists_drop_trailing_items():
+    items = [{"task_id": index, "description": f"Task number {index}"} for index in range(50)]
+    prompt = PromptBuilder(200).add("Tasks:").add_items("tasks", items).build()
+    assert count_tokens(prompt) <= 200
+    body, marker = prompt.split("\n\n", 1)[1].rsplit("\n", 1)
+    kept = json.loads(body)
+    assert kept == items[:len(kept)] and 0 < len(kept) < 50
+    assert marker == f"[... {50 - len(kept)} more items omitted to fit the token budget ...]"
+    assert compact_json(items[0]) == '{"task_id":0,"description":"Task number 0"}'
+
+
+def test_fixed_sections_over_budget_are_kept_with_a_warning(caplog):
+    prompt = PromptBuilder(10).add(LONG_TEXT).build()
+    assert prompt == LONG_TEXT
+    assert "over the budget" in caplog.text
+
+
+@pytest.mark.parametrize("text", ["", "print('hello, world')", LONG_TEXT])
+def test_token_counts_grow_with_the_text(text):
+    assert count_tokens(text + " extra words") > count_tokens(text)
@@ -0,0 +1,45 @@
+import jinja2
+import pytest
+
+from autodev.prompts.registry import PromptRegistry, PromptSlot, get_registry, render_prompt
+
+
+def test_renders_share_a_byte_identical_static_prefix():
+    template = get_registry().get("developer_agent")
+    first = render_prompt(
+        "developer_agent", programming_language="python", file_path="src/app.py", description="Build the app."
+    )
+    second = render_prompt(
+        "developer_agent", programming_language="go", file_path="main.go", description="Port it.",
+        prerequisites="package util",
+    )
+    assert first.startswith(template.static_prefix) and second.startswith(template.static_prefix)
+    assert template.cacheable_prefix_length == len(template.static_prefix)
+    # The optional prerequisites slot only appears when it has content.
+    assert "Prerequisite Code" not in first and "package util" in second
+    assert get_registry() is get_registry()
+    assert set(get_registry().prefix_report()) >= {"developer_agent", "testing_agent"}
+
+
+def test_slots_are_elided_to_the_budget_and_missing_variables_fail():
+    registry = PromptRegistry()
+    registry.register(
+        "demo",
+        "You are a helpful agent.",
+        [
+            PromptSlot("project", "Project: {{ project }}"),
+            PromptSlot("code", 'Code:\n"""{{ body }}"""', elide="middle"),
+            PromptSlot("tasks", "Tasks:\n{{ body }}", elide="items", priority=1),
+        ],
+    )
+    code = "\n".join(f"line_{index} = {index}" for index in range(500))
+    prompt = registry.render("demo", budget=400, project="demo", code=code, tasks=[{"task_id": 1}])
+    assert prompt.startswith("You are a helpful agent.\n\nProject: demo\n\nCode:\n\"\"\"line_0 = 0")
+    # Only the body is elided; the text around it is kept.
+    assert "tokens elided to fit the token budget" in prompt
+    assert 'line_499 = 499"""\n\nTasks:\n[\n{"task_id":1}\n]' in prompt
+
+    with pytest.raises(jinja2.UndefinedError):
+        registry.render("demo", budget=400, code="x", tasks=[])
+    with pytest.raises(KeyError):
+        registry.render("missing")
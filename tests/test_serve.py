@@ -0,0 +1,114 @@
+import json
+import threading
+
+import httpx
+import pytest
+
+import serve
+
+
+@pytest.fixture
+def service(simulated_llm, tmp_path):
+    manager = serve.JobManager(str(tmp_path / "jobs"), workers=2)
+    manager.start()
+    server = serve.JobHTTPServer(("127.0.0.1", 0), manager)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with httpx.Client(base_url=f"http://127.0.0.1:{server.server_address[1]}", timeout=30) as client:
+        yield client, manager
+    server.shutdown()
+    server.server_close()
+    manager.stop()
+
+
+def test_job_runs_and_streams_progress(service):
+    client, _ = service
+    response = client.post("/jobs", json={"name": "Todo App", "description": "A todo list."})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    with client.stream("GET", f"/jobs/{job_id}/events") as stream:
+        events = [json.loads(line) for line in stream.iter_lines() if line]
+    kinds = [event["event"] for event in events]
+    assert kinds[:2] == ["queued", "started"]
+    assert kinds[-1] == "finished"
+    assert "DeveloperAgent" in [event.get("agent") for event in events]
+
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["status"] == "succeeded"
+    assert status["outcome"]["implemented"] == status["outcome"]["tested"] > 0
+    assert client.get("/health").json()["jobs"] == {"succeeded": 1}
+
+
+def test_concurrent_jobs_share_warm_workers(service):
+    client, manager = service
+    job_ids = [
+        client.post("/jobs", json={"name": f"project {index}", "description": "A tool."}).json()["job_id"]
+        for index in range(4)
+    ]
+    for job_id in job_ids:
+        with client.stream("GET", f"/jobs/{job_id}/events") as stream:
+            for _ in stream.iter_lines():
+                pass
+    assert {client.get(f"/jobs/{job_id}").json()["status"] for job_id in job_ids} == {"succeeded"}
+    assert len({manager.get(job_id).output_dir for job_id in job_ids}) == 4
+
+
+def test_bad_requests(service):
+    client, _ = service
+    assert client.post("/jobs", json={"name": "no description"}).status_code == 400
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/nowhere").status_code == 404
+
+
+def test_queue_limit_and_cancel(simulated_llm, tmp_path):
+    manager = serve.JobManager(str(tmp_path), workers=1, max_queue=1)
+    job = manager.submit({"name": "first", "description": "queued"})
+    with pytest.raises(serve.QueueFull):
+        manager.submit({"name": "second", "description": "rejected"})
+    assert manager.cancel(job.job_id).status == "cancelled"
+    assert [event["event"] for event in manager.events(job)] == ["queued", "finished"]
+
+
+def test_unix_socket(simulated_llm, tmp_path):
+    manager = serve.JobManager(str(tmp_path / "jobs"), workers=1)
+    manager.start()
+    server = serve.JobUnixServer(str(tmp_path / "autodev.sock"), manager)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = httpx.HTTPTransport(uds=str(tmp_path / "autodev.sock"))
+    try:
+        with httpx.Client(transport=transport, base_url="http://autodev") as client:
+            assert client.get("/health").json()["status"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+        manager.stop()
+
+
+def test_async_worker_keeps_one_event_loop(simulated_llm, tmp_path, monkeypatch):
+    import asyncio
+
+    import main
+
+    loops, closed = [], []
+    arun_system = main.arun_system
+
+    async def recording_arun_system(**kwargs):
+        loops.append(asyncio.get_running_loop())
+        return await arun_system(**kwargs)
+
+    async def aclose():
+        closed.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(main, "arun_system", recording_arun_system)
+    monkeypatch.setattr(simulated_llm, "aclose", aclose)
+    manager = serve.JobManager(str(tmp_path / "jobs"), workers=1, use_async=True)
+    manager.start()
+    jobs = [manager.submit({"name": f"project {index}", "description": "A tool."}) for index in range(2)]
+    for job in jobs:
+        list(manager.events(job))
+    manager.stop()
+
+    assert [job.status for job in jobs] == ["succeeded", "succeeded"]
+    assert len(loops) == 2 and loops[0] is loops[1]
+    # The worker's clients are closed on its own loop before the loop itself.
+    assert closed == [loops[0]] and loops[0].is_closed()
@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+
+from autodev.agents import LazyAgentMap
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(statement, modules):
+    """Which of ``modules`` a fresh interpreter has imported after running ``statement``."""
+    probe = f"{statement}; import sys, json; print(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=PROJECT_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_imports_do_not_load_heavy_dependencies(tmp_path):
+    heavy = ["openai", "github", "asyncio", "autodev.agents.developer"]
+    for statement in ("import autodev", "import autodev.services", "import autodev.agents", "import main"):
+        assert loaded_modules(statement, heavy) == [], statement
+    # Importing main must not create the output directory as a side effect.
+    subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {PROJECT_DIR!r}); import main"],
+        cwd=tmp_path, check=True, capture_output=True,
+    )
+    assert not (tmp_path / "output").exists()
+
+
+def test_lazy_agent_map_builds_agents_on_first_lookup():
+    agent_map = LazyAgentMap()
+    assert "DeveloperAgent" in agent_map and "NoSuchAgent" not in agent_map
+    assert len(agent_map) == 8 and not agent_map._agents
+    developer = agent_map["DeveloperAgent"]
+    assert agent_map.get("DeveloperAgent") is developer
+    assert list(agent_map._agents) == ["DeveloperAgent"]
+    assert agent_map.get("NoSuchAgent") is None
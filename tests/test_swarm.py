@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from autodev.agents.deployment import DeploymentAgent
+from autodev.agents.developer import DeveloperAgent
+from autodev.agents.integration import IntegrationAgent
+from autodev.agents.project_manager import ProjectManagerAgent
+from autodev.agents.solution_architect import SolutionArchitectAgent
+from autodev.agents.task_decomposer import TaskDecomposerAgent
+from autodev.agents import testing
+from autodev.core.agent import Agent
+from autodev.core.swarm import Swarm
+from autodev.core.tracing import span, start_tracing, stop_tracing
+from autodev.core.types import Result
+
+from .test_agents import planned_context
+
+
+def pipeline_agents():
+    return {
+        "ProjectManagerAgent": ProjectManagerAgent(),
+        "TaskDecomposerAgent": TaskDecomposerAgent(),
+        "SolutionArchitectAgent": SolutionArchitectAgent(),
+        "DeveloperAgent": DeveloperAgent(),
+        "TestingAgent": testing.TestingAgent(),
+        "IntegrationAgent": IntegrationAgent(),
+        "DeploymentAgent": DeploymentAgent(),
+    }
+
+
+def test_run_merges_context_and_hands_off():
+    agent = Agent("Echo", "", functions=[lambda ctx: Result("done", "Next", {"seen": True})])
+    response = Swarm({"Echo": agent}).run("Echo", {"initial": 1})
+    assert response.agent == "Next"
+    assert response.context_variables == {"initial": 1, "seen": True}
+
+
+def test_unknown_agent_ends_the_run():
+    response = Swarm({}).run("Missing", {"initial": 1})
+    assert response.agent is None
+    assert response.context_variables == {"initial": 1}
+
+
+def test_failing_function_falls_through():
+    def broken(ctx):
+        raise RuntimeError("boom")
+
+    agent = Agent("Broken", "", functions=[broken])
+    response = Swarm({"Broken": agent}).run("Broken", {})
+    assert response.agent is None
+
+
+def test_aexecute_awaits_coroutines_and_offloads_sync_functions():
+    threads = {}
+
+    async def native(ctx):
+        threads["native"] = threading.get_ident()
+        return Result("native", None, {"native": True})
+
+    def blocking(ctx):
+        threads["blocking"] = threading.get_ident()
+        return Result("blocking", None, {"blocking": True})
+
+    async def run():
+        threads["loop"] = threading.get_ident()
+        native_result = await Agent("Native", "", functions=[blocking], async_functions=[native]).aexecute({})
+        sync_result = await Agent("Sync", "", functions=[blocking]).aexecute({})
+        return native_result, sync_result
+
+    native_result, sync_result = asyncio.run(run())
+    assert native_result.value == "native" and sync_result.value == "blocking"
+    assert threads["native"] == threads["loop"] != threads["blocking"]
+
+
+def test_async_agents_overlap_llm_calls(simulated_llm, tmp_path):
+    context_variables = planned_context(tmp_path)
+    context_variables.update(DeveloperAgent().implement_tasks(context_variables).context_variables)
+    simulated_llm.settings.latency_median = 0.1
+    simulated_llm.settings.latency_sigma = 0
+    tester = testing.TestingAgent()
+    started = time.monotonic()
+    result = asyncio.run(tester.aexecute(dict(context_variables, max_concurrency=5, force_regenerate=True)))
+    assert len(result.context_variables["tested_tasks"]) == simulated_llm.settings.tasks_per_project
+    # Five 0.1s calls take two rounds (the scheduler admits four at first), not five.
+    assert time.monotonic() - started < 0.45
+
+
+def run_pipeline(swarm, context_variables, use_async=False):
+    agent_name = "ProjectManagerAgent"
+    for _ in range(20):
+        if agent_name is None:
+            break
+        if use_async:
+            response = asyncio.run(swarm.arun(agent_name, context_variables))
+        else:
+            response = swarm.run(agent_name, context_variables)
+        context_variables, agent_name = response.context_variables, response.agent
+    return context_variables
+
+
+def test_pipeline_runs_end_to_end(simulated_llm, tmp_path):
+    context_variables = run_pipeline(Swarm(pipeline_agents()), {
+        "output_dir": str(tmp_path),
+        "project_name": "demo",
+        "project_description": "A command line todo list.",
+        "max_concurrency": 4,
+    })
+    tasks = simulated_llm.settings.tasks_per_project
+    assert len(context_variables["implemented_tasks"]) == tasks
+    assert len(context_variables["tested_tasks"]) == tasks
+    assert simulated_llm.stats()["completed"] == 2 + 2 * tasks
+
+
+def test_async_pipeline_runs_end_to_end(simulated_llm, tmp_path):
+    context_variables = run_pipeline(Swarm(pipeline_agents()), {
+        "output_dir": str(tmp_path),
+        "project_name": "demo",
+        "project_description": "A command line todo list.",
+        "max_concurrency": 4,
+    }, use_async=True)
+    assert len(context_variables["tested_tasks"]) == simulated_llm.settings.tasks_per_project
+
+
+def test_tracing_records_spans(simulated_llm, tmp_path):
+    tracer = start_tracing()
+    try:
+        run_pipeline(Swarm(pipeline_agents()), {
+            "output_dir": str(tmp_path),
+            "project_name": "demo",
+            "project_description": "A command line todo list.",
+        })
+    finally:
+        stop_tracing()
+    rows = {(row["category"], row["name"]): row for row in tracer.summary()}
+    assert rows[("agent", "DeveloperAgent")]["count"] == 1
+    llm = rows[("llm", "call_llm")]
+    assert llm["count"] == 2 + 2 * simulated_llm.settings.tasks_per_project
+    assert llm["prompt_tokens"] > 0 and llm["completion_tokens"] > 0
+    assert ("file", "write") in rows
+    assert any(category == "git" for category, _ in rows)
+
+    trace_file = tracer.export_chrome_trace(str(tmp_path / "trace.json"))
+    with open(trace_file, encoding="utf-8") as handle:
+        events = json.load(handle)["traceEvents"]
+    assert any(event.get("ph") == "X" and event["cat"] == "llm" for event in events)
+
+
+def test_spans_are_noops_when_disabled():
+    with span("anything", "app") as current:
+        current.set(ignored=True)
+    assert not current
+
+
+def test_failed_hop_is_resumable(simulated_llm, tmp_path, monkeypatch):
+    import main
+    from autodev.agents import LazyAgentMap
+    from autodev.core.checkpoint import RunJournal
+
+    implement_tasks = DeveloperAgent.implement_tasks
+    calls = []
+
+    def crash_once(self, context_variables):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        return implement_tasks(self, context_variables)
+
+    monkeypatch.setattr(DeveloperAgent, "implement_tasks", crash_once)
+    monkeypatch.setattr(main, "agent_map", LazyAgentMap())
+    initial = {"project_name": "demo", "project_description": "A command line todo list."}
+    context_variables = main.run_system(output_dir=str(tmp_path), initial_context=initial)
+    assert "implemented_tasks" not in context_variables
+
+    journal = RunJournal.for_output_dir(str(tmp_path))
+    run_id = context_variables["run_id"]
+    assert journal.run_status(run_id) == "failed"
+    assert journal.last_checkpoint(run_id)[1] == "DeveloperAgent"
+    assert journal.latest_run() == run_id
+
+    resumed = main.run_system(resume="latest", output_dir=str(tmp_path))
+    assert len(resumed["tested_tasks"]) == simulated_llm.settings.tasks_per_project
+    assert journal.run_status(run_id) == "completed"
+    assert journal.latest_run() is None
+
+
+def test_resumed_run_skips_journaled_tasks(simulated_llm, tmp_path, monkeypatch):
+    import main
+    from autodev.agents import LazyAgentMap
+
+    implement_tasks = DeveloperAgent.implement_tasks
+    calls = []
+
+    def crash_after_generating(self, context_variables):
+        result = implement_tasks(self, context_variables)
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("killed before the hop finished")
+        return result
+
+    monkeypatch.setattr(DeveloperAgent, "implement_tasks", crash_after_generating)
+    monkeypatch.setattr(main, "agent_map", LazyAgentMap())
+    initial = {"project_name": "demo", "project_description": "A command line todo list."}
+    main.run_system(output_dir=str(tmp_path), initial_context=initial)
+    # Without the manifest, only the journal knows which generations finished.
+    os.remove(os.path.join(tmp_path, "demo", ".autodev", "manifest.json"))
+    requests = simulated_llm.stats()["requests"]
+
+    resumed = main.run_system(resume="latest", output_dir=str(tmp_path))
+    tasks = simulated_llm.settings.tasks_per_project
+    assert len(resumed["tested_tasks"]) == tasks
+    # Only the testing stage called the LLM again.
+    assert simulated_llm.stats()["requests"] == requests + tasks
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from autodev.core.task_graph import (
+    DependencyFailed,
+    TaskGraph,
+    TaskGraphError,
+    normalize_dependencies,
+    run_graph,
+    run_graph_async,
+)
+
+
+def make_tasks(edges):
+    return [{"task_id": task_id, "depends_on": deps} for task_id, deps in edges]
+
+
+DIAMOND = make_tasks([(1, []), (2, [1]), (3, [1]), (4, [2, 3]), (5, [])])
+
+
+def ids(tasks):
+    return [task["task_id"] for task in tasks]
+
+
+def test_waves_and_critical_path():
+    graph = TaskGraph(DIAMOND)
+    assert [ids(wave) for wave in graph.waves()] == [[1, 5], [2, 3], [4]]
+    assert ids(graph.critical_path()) == [1, 2, 4]
+
+
+def test_cycles_are_detected_and_broken():
+    tasks = make_tasks([(1, [3]), (2, [1]), (3, [2])])
+    with pytest.raises(TaskGraphError, match="cycle"):
+        TaskGraph(tasks)
+    fixed = normalize_dependencies(tasks)
+    assert sum(len(task["depends_on"]) for task in fixed) == 2
+    TaskGraph(fixed)
+
+
+def test_unknown_and_self_dependencies_are_ignored():
+    fixed = normalize_dependencies(make_tasks([(1, [1, 9]), (2, 1)]))
+    assert [task["depends_on"] for task in fixed] == [[], [1]]
+
+
+def test_run_graph_passes_prerequisite_results_in_order():
+    finished = []
+
+    def build(task, prerequisites):
+        finished.append(task["task_id"])
+        return sorted(prerequisites)
+
+    results = run_graph(build, DIAMOND, max_workers=3)
+    assert ids(task for task, _, _ in results) == [1, 2, 3, 4, 5]
+    assert results[3][1] == [2, 3]
+    assert finished.index(4) > max(finished.index(2), finished.index(3))
+
+
+def test_failed_prerequisites_skip_dependents():
+    def build(task, prerequisites):
+        if task["task_id"] == 2:
+            raise ValueError("boom")
+        return task["task_id"]
+
+    errors = {task["task_id"]: error for task, _, error in run_graph(build, DIAMOND, 2)}
+    assert isinstance(errors[2], ValueError)
+    assert isinstance(errors[4], DependencyFailed)
+    assert errors[3] is None and errors[5] is None
+
+
+def test_independent_tasks_run_concurrently():
+    tasks = make_tasks([(task_id, []) for task_id in range(4)])
+    started = time.monotonic()
+    run_graph(lambda task, prerequisites: time.sleep(0.1), tasks, max_workers=4)
+    assert time.monotonic() - started < 0.3
+
+
+def test_run_graph_async():
+    async def build(task, prerequisites):
+        await asyncio.sleep(0)
+        return sorted(prerequisites)
+
+    results = asyncio.run(run_graph_async(build, DIAMOND, 4))
+    assert [result for _, result, _ in results] == [[], [1], [1], [2, 3], []]
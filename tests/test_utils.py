@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from autodev.core.utils import get_max_concurrency, run_bounded, run_bounded_async, sort_by_task_id
+
+
+def test_max_concurrency_from_context_or_environment(monkeypatch):
+    monkeypatch.delenv("AUTODEV_MAX_CONCURRENCY", raising=False)
+    assert get_max_concurrency({}) == 1
+    monkeypatch.setenv("AUTODEV_MAX_CONCURRENCY", "6")
+    assert get_max_concurrency({}) == 6
+    assert get_max_concurrency({"max_concurrency": 3}) == 3
+    assert get_max_concurrency({"max_concurrency": 0}) == 1
+    assert get_max_concurrency({"max_concurrency": "many"}) == 1
+
+
+class InFlight:
+    def __init__(self):
+        self.current = self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self.lock:
+            self.current -= 1
+
+
+def square(item):
+    if item == 3:
+        raise ValueError("three")
+    return item * item
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_run_bounded_keeps_order_and_errors(max_workers):
+    in_flight = InFlight()
+
+    def work(item):
+        with in_flight:
+            time.sleep(0.01)
+            return square(item)
+
+    results = run_bounded(work, range(8), max_workers)
+    assert [item for item, _, _ in results] == list(range(8))
+    assert [result for _, result, _ in results] == [0, 1, 4, None, 16, 25, 36, 49]
+    assert isinstance(results[3][2], ValueError)
+    assert in_flight.peak <= max_workers and (in_flight.peak > 1) == (max_workers > 1)
+
+
+def test_run_bounded_async_limits_in_flight_calls():
+    in_flight = InFlight()
+
+    async def work(item):
+        with in_flight:
+            await asyncio.sleep(0.01)
+            return square(item)
+
+    results = asyncio.run(run_bounded_async(work, range(8), 3))
+    assert [result for _, result, _ in results] == [0, 1, 4, None, 16, 25, 36, 49]
+    assert isinstance(results[3][2], ValueError)
+    assert in_flight.peak == 3
+
+
+def test_sort_by_task_id():
+    assert sort_by_task_id([{"task_id": 2}, {"task_id": 1}]) == [{"task_id": 1}, {"task_id": 2}]
+    mixed = [{"task_id": "b"}, {"task_id": 1}]
+    assert sort_by_task_id(mixed) == mixed